@@ -204,6 +204,74 @@ class LearningAgent(metaclass=ABCMeta):
                 "done": self._done,
                 "next_state": self._state}
 
+    def evaluate_policy_batch(self, states):
+        """ Evaluation of the policy for a batch of states at once
+        (i.e. the states of a BatchedEnvironment)
+
+            Args:
+                states -> np.ndarray [N, ...] of state representations
+
+            Returns:
+                pi -> the conditional probability distribution of actions
+                given each state [N, ...]
+        """
+        raise NotImplementedError("%s doesn't support batched environments" % type(self).__name__)
+
+    def sample_actions(self, conditional_policies, training):
+        """ Samples an action for each state from the policy distributions
+
+            Args:
+                conditional_policies -> pi(a|s) of each state [N, ...]
+                training -> whether agent is training
+            Returns:
+                actions -> np.ndarray of N actions within the action-space.
+        """
+        raise NotImplementedError("%s doesn't support batched environments" % type(self).__name__)
+
+    def act_in_env_batched(self, training):
+        """ Agent acts in every MDP of a BatchedEnvironment, evaluating
+        its policy once for all of them. Finished episodes are reset by
+        the environment, each counts as a trajectory.
+
+            Args:
+                training: whether the agent is training
+
+            Returns:
+                dict like act_in_env's with np.ndarray values [N, ...]
+        """
+        if self._done:
+            self._state = self._environment.reset()
+            self._done = False
+
+        prev_states = self._environment.states
+        conditional_policies = self.evaluate_policy_batch(prev_states)
+        actions = self.sample_actions(conditional_policies, training)
+        next_states, rewards, dones = self._environment.step(actions)
+
+        self._state = self._environment.states
+        self._total_steps += self._environment.num_envs
+        self._num_traj += int(np.count_nonzero(dones))
+
+        return {"state": prev_states,
+                "action": actions,
+                "reward": rewards,
+                "done": dones,
+                "next_state": next_states}
+
+    def act_for_trajs_batched(self, num_traj, training):
+        """ Generator: Agent acts in a BatchedEnvironment until
+        a specified number of trajectories finished (in any MDP)
+            Args:
+                num_traj: number of trajectories to act for
+                training: whether training
+            Yields:
+                return value of act_in_env_batched
+        """
+        target = self._num_traj + num_traj
+
+        while self._num_traj < target:
+            yield self.act_in_env_batched(training)
+
     def act_for_steps(self, num_steps, training):
         """ Generator: Agent acts in environment for num_steps
                 Args:
@@ -299,6 +367,22 @@ class OffPolicyValueAgent(LearningAgent, metaclass=ABCMeta):
         """
         return self._maximum_function
 
+    def _epsilon(self):
+        """ Current epsilon, validated
+
+            Returns:
+                epsilon in (0, 1.0]
+        """
+        eps = self.epsilon_func()
+
+        if not eps:
+            raise AttributeError("Subclass must set epsilon_func to valid callable")
+
+        if not 0. < eps <= 1.:
+            raise ValueError("Epsilon must be in (0, 1.0]")
+
+        return eps
+
     def _act_epsilon_greedily(self, sampled_action):
         """ Follows an epsilon-greedy policy
         for off-policy training
@@ -310,13 +394,7 @@ class OffPolicyValueAgent(LearningAgent, metaclass=ABCMeta):
                 possible-randomly chosen action
         """
 
-        eps = self.epsilon_func()
-
-        if not eps:
-            raise AttributeError("Subclass must set epsilon_func to valid callable")
-
-        if not 0. < eps <= 1.:
-            raise ValueError("Epsilon must be in (0, 1.0]")
+        eps = self._epsilon()
 
         prob = random.random()
 
@@ -336,6 +414,29 @@ class OffPolicyValueAgent(LearningAgent, metaclass=ABCMeta):
         sampled = self._maximum_function(conditional_policy)[0]
         return sampled if not training else self._act_epsilon_greedily(sampled)
 
+    def sample_actions(self, conditional_policies, training):
+        """ Samples an action for each state, epsilon-greedily
+        and independently per state when training
+
+            Args:
+                conditional_policies : pi(a|s) of each state [N, num_of_actions]
+                training: whether agent is training
+
+            Returns:
+                np.ndarray of N sampled actions
+        """
+        sampled = self._maximum_function(conditional_policies)
+
+        if not training:
+            return sampled
+
+        eps = self._epsilon()
+
+        explore = np.random.random_sample(sampled.shape[0]) <= eps
+        sampled[explore] = np.random.randint(self._num_of_actions, size=int(np.count_nonzero(explore)))
+
+        return sampled
+
 class PolicyGradientAgent(LearningAgent, metaclass=ABCMeta):
     """ Represents an RL Agent using Policy Gradients. The agent computes the
     gradient of the expected reward function and uses it to directly update the policy
@@ -1,3 +1,4 @@
+import numpy as np
 import tensorflow as tf
 from advantage.agents.base.base_agents import OffPolicyValueAgent
 from advantage.utils.value_agent import bellman_operator, decayed_epsilon
@@ -25,6 +26,8 @@ class DeepQAgent(OffPolicyValueAgent):
 
         self._copy = None
 
+        self._td_error = None
+
         super().__init__(policy=policy_q_network,
                          environment=environment,
                          graph=graph,
@@ -51,13 +54,24 @@ class DeepQAgent(OffPolicyValueAgent):
                                               name="action_taken_plh")
             self._target.add_target_placeholder(action_taken_plh)
 
+            # importance-sampling weights of each transition (ones unless prioritized)
+            weights_plh = tf.placeholder(shape=[None, 1],
+                                         dtype=tf.float32,
+                                         name="weights_plh")
+            self._target.add_target_placeholder(weights_plh)
+
             # extract the Q-value for the action taken
-            action_q = tf.reduce_sum(tf.one_hot(indices=action_taken_plh,
+            action_q = tf.reduce_sum(tf.one_hot(indices=tf.squeeze(action_taken_plh, axis=1),
                                                 depth=self.num_of_actions) * target_net,
-                                     axis=1)
+                                     axis=1,
+                                     keepdims=True)
+
+            # TD errors, fetched with the update for prioritized replay
+            self._td_error = tf.subtract(target_plh, action_q, name="DeepQAgent_td_error")
 
-            # the mean square error between target and network
-            loss = tf.reduce_mean(tf.square(target_plh - action_q), name="DeepQAgent_target_loss")
+            # the weighted mean square error between target and network
+            loss = tf.reduce_mean(weights_plh * tf.square(self._td_error),
+                                  name="DeepQAgent_target_loss")
 
         self._target.minimize(loss)
 
@@ -73,15 +87,24 @@ class DeepQAgent(OffPolicyValueAgent):
     def evaluate_policy(self, state):
         return self._policy.inference(self.session, {"policy_state_plh" : [state]})
 
+    def evaluate_policy_batch(self, states):
+        return self._policy.inference(self.session, {"policy_state_plh" : states})
+
     def improve_policy(self):
         """Policy is improved by copying target params to policy network
         """
         self._copy()
 
-    def improve_target(self, sarsa):
+    def improve_target(self, sarsa, weights=None):
         """ Trains the Target Q-Network on I.I.D samples batch from the Replay Buffer
                 Args:
                     Sarsa: object containing aggregated results
+                    weights: optional importance-sampling weights [batch, 1]
+                        (from a PrioritizedExperienceReplayBuffer)
+
+                Returns:
+                    np.ndarray of TD errors (before the update) if
+                    `weights` were given, else None
         """
 
         states, actions_taken, targets = bellman_operator(self.session,
@@ -92,6 +115,17 @@ class DeepQAgent(OffPolicyValueAgent):
 
         feed_dict_in = {"tgt_state_plh" : states}
 
-        feed_dict_target = {"target_plh" : targets, "action_taken_plh": actions_taken}
+        feed_dict_target = {"target_plh" : targets,
+                            "action_taken_plh": actions_taken,
+                            "weights_plh": weights}
+
+        if weights is None:
+            feed_dict_target["weights_plh"] = np.ones_like(targets, dtype=np.float32)
+            self._target.update(self.session, feed_dict_in, feed_dict_target)
+            return None
 
-        self._target.update(self.session, feed_dict_in, feed_dict_target)
+        _, (td_errors,) = self._target.update_and_fetch(self.session,
+                                                        feed_dict_in,
+                                                        feed_dict_target,
+                                                        [self._td_error])
+        return td_errors.ravel()
@@ -351,6 +351,11 @@ def deep_approximator(cls):
         @loggers.value(loggers.LogVarType.RETURNED_VALUE,
                        stdout=False,
                        tensorboard=True)
+        def _track_summary(self, summary):
+            """ Logs the summary of an update to tensorboard
+            """
+            return summary
+
         def update(self, session, runtime_inputs, runtime_targets):
             """ Perform a network parameter update
                     Args:
@@ -360,12 +365,30 @@ def deep_approximator(cls):
                     Returns:
                         tf summary
             """
+            summary, _ = self.update_and_fetch(session, runtime_inputs, runtime_targets, [])
+            return summary
+
+        def update_and_fetch(self, session, runtime_inputs, runtime_targets, fetches):
+            """ Perform a network parameter update, also evaluating
+            `fetches` in the same session run (so with the parameters
+            before the update)
+                    Args:
+                        session: current runtime session
+                        runtime_inputs: training batch inputs
+                        runtime_targets: training batch targets
+                        fetches: list of tensors to evaluate
+
+                    Returns:
+                        tuple (tf summary, list of values of `fetches`)
+            """
             runtime_batch = {}
             runtime_batch.update(self._produce_input_feed_dict(runtime_inputs))
             runtime_batch.update(self._produce_target_feed_dict(runtime_targets))
 
-            results = session.run(self._train_op, feed_dict=runtime_batch)
-            return results[0] # summary
+            results = session.run(self._train_op + list(fetches), feed_dict=runtime_batch)
+
+            summary = self._track_summary(results[0])
+            return summary, results[len(self._train_op):]
 
         def inference(self, session, runtime_tensor_inputs):
             """ Performs inference on runtime_tensor_inputs
@@ -1 +1,9 @@
 from .experience_replay_buffer import ExperienceReplayBuffer
+from .columnar_replay_buffer import ColumnarReplayBuffer
+from .prioritized_experience_replay_buffer import PrioritizedExperienceReplayBuffer
+from .memmap_replay_buffer import MemmapReplayBuffer
+from .aliased_replay_buffer import AliasedReplayBuffer
+from .shared_memory_replay_buffer import SharedMemoryReplayBuffer
+from .sequence_replay_buffer import SequenceReplayBuffer
+from .concurrent_replay_buffer import ConcurrentReplayBuffer
+from .replay_service import ReplayClientBuffer
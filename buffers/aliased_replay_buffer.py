@@ -0,0 +1,249 @@
+import numpy as np
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from advantage.buffers.index_set import IndexSet
+
+""" Columnar Replay Buffer storing each observation of a trajectory once
+"""
+
+class _ObservationColumn:
+    """ Column of the (stacked) observations of an AliasedReplayBuffer,
+    `shift` slots after the indexed one. Single frame observations
+    are read-only views, stacked ones are rebuilt (copied).
+    """
+
+    def __init__(self, buffer, states, shift):
+        """
+            Args:
+                buffer: AliasedReplayBuffer
+                states: read-only states column of `buffer`
+                shift: 0 for states, 1 for next states
+        """
+        self._buffer = buffer
+        self._states = states
+        self._shift = shift
+
+    def __getitem__(self, slot):
+        slot = (slot + self._shift) % self._buffer.buffer_size
+
+        if self._buffer.frame_stack == 1:
+            return self._states[slot]
+
+        # pylint: disable=protected-access
+        # reason-disabled: the column is owned by the buffer
+        return self._buffer._observations(np.array([slot]))[0]
+
+class AliasedReplayBuffer(ColumnarReplayBuffer):
+    """ Columnar buffer where `next_state` isn't stored. Slots are written
+    sequentially in trajectory order, so the `next_state` of the transition
+    in slot `i` is the observation in slot `i + 1`.
+
+    When a trajectory ends, its terminal observation takes one slot that
+    holds no transition, so the next trajectory starts in the slot after it.
+
+    With `frame_stack` > 1 observations are a stack of frames along their last
+    axis. Only the newest frame is stored per slot and stacks are rebuilt from
+    the previous `frame_stack` slots. The older frames of each trajectory's
+    first observation are written to slots (holding no transition) before it.
+
+    Slots holding a valid transition are tracked in an `IndexSet`. Popping
+    just removes slots from it; the data is overwritten as the ring wraps.
+    """
+
+    STATE_ATTR = "state"
+    NEXT_STATE_ATTR = "next_state"
+
+    def __init__(self, buffer_size, element_cls, dims, frame_stack=1, seed=None, storage=None):
+        """
+            Args:
+                buffer_size: number of slots to preallocate for. Each trajectory
+                    uses `frame_stack` slots more than its number of transitions
+                element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                dims: column dimensions from `Environment.dims`
+                frame_stack: number of frames stacked in the last axis of states
+                seed: seed for the sampling np.random.Generator
+                storage: per attr storage (see ColumnarReplayBuffer). Storage
+                    of `state` also applies to `next_state`
+
+            Raises:
+                ValueError: states don't have a last axis of `frame_stack`
+                    or are skipped
+        """
+        self._frame_stack = frame_stack
+
+        self._valid = IndexSet(buffer_size)
+
+        # next slot to write
+        self._write = 0
+
+        # slot of the latest observation if its trajectory hasn't ended
+        self._pending = None
+
+        super().__init__(buffer_size, element_cls, dims, seed, storage=storage)
+
+    @property
+    def frame_stack(self):
+        """ property for `_frame_stack`
+        """
+        return self._frame_stack
+
+    @property
+    def nbytes(self):
+        return super().nbytes + self._valid.nbytes
+
+    @classmethod
+    def estimate_transition_bytes(cls, element_cls, dims, frame_stack=1, storage=None, **options):
+        """ Bytes per slot. Each trajectory also takes
+        `frame_stack` slots more than its transitions.
+        """
+        row_bytes = cls._row_bytes(element_cls, dims, storage)
+        del row_bytes[cls.NEXT_STATE_ATTR]
+        row_bytes[cls.STATE_ATTR] //= frame_stack
+
+        # columns, sequence number and valid IndexSet
+        return sum(row_bytes.values()) + 3 * np.dtype(np.int64).itemsize
+
+    def _allocate_columns(self):
+        # next states are aliased to the states column
+        self._column_specs.pop(self.NEXT_STATE_ATTR, None)
+
+        if self.STATE_ATTR not in self._column_specs:
+            raise ValueError("%s can't be skipped" % self.STATE_ATTR)
+
+        if self._frame_stack > 1:
+            shape, dtype = self._column_specs[self.STATE_ATTR]
+
+            if len(shape) < 3 or shape[-1] != self._frame_stack:
+                raise ValueError("With frame_stack=%d states must have a last axis"
+                                 " of %d frames" % (self._frame_stack, self._frame_stack))
+
+            self._column_specs[self.STATE_ATTR] = (shape[:-1], dtype)
+
+        return super()._allocate_columns()
+
+    def _advance(self):
+        """ Claims the next slot for writing. Transitions whose
+        observations include this slot are no longer valid.
+
+                Returns:
+                    slot index
+        """
+        slot = self._write
+        self._write = (self._write + 1) % self._buffer_size
+
+        for offset in range(self._frame_stack):
+            self._valid.remove((slot + offset) % self._buffer_size)
+
+        self._cur_buffer_size = len(self._valid)
+
+        return slot
+
+    def _write_frame(self, observation):
+        """ Writes the newest frame of an observation into a new slot
+
+                Returns:
+                    slot index
+        """
+        slot = self._advance()
+
+        frame = observation[..., -1] if self._frame_stack > 1 else observation
+        self._columns[self.STATE_ATTR][slot] = frame
+
+        return slot
+
+    def _observations(self, slots):
+        """ Rebuilds the (possibly stacked) observations ending at `slots`
+
+                Args:
+                    slots: np.ndarray of slot indices
+
+                Returns:
+                    np.ndarray of observations [batch, ...]
+        """
+        states = self._columns[self.STATE_ATTR]
+
+        if self._frame_stack == 1:
+            return states[slots]
+
+        offsets = np.arange(1 - self._frame_stack, 1)
+        windows = (np.expand_dims(slots, axis=1) + offsets) % self._buffer_size
+
+        # [batch, frame_stack, ...] -> [batch, ..., frame_stack]
+        return np.moveaxis(states[windows], 1, -1)
+
+    def _continues_trajectory(self, state):
+        """ Whether `state` is the latest observation, so
+        the pushed transition continues the trajectory. It is
+        compared as stored, so narrower storage dtypes still match.
+        """
+        if self._pending is None:
+            return False
+
+        latest = self._observations(np.array([self._pending]))[0]
+
+        return np.array_equal(np.asarray(state).astype(latest.dtype, copy=False), latest)
+
+    def push(self, item):
+        """ Writes a transition. Its state is only written if it doesn't
+        continue the previous transition's trajectory.
+                Args:
+                    item: Element of type `element_cls`
+        """
+        state = getattr(item, self.STATE_ATTR)
+
+        if self._continues_trajectory(state):
+            slot = self._pending
+        else:
+            for frame in range(self._frame_stack - 1):
+                self._write_frame(state[..., frame:frame + 1])
+            slot = self._write_frame(state)
+
+        for name, column in self._columns.items():
+            if name != self.STATE_ATTR:
+                column[slot] = getattr(item, name)
+
+        next_slot = self._write_frame(getattr(item, self.NEXT_STATE_ATTR))
+
+        self._valid.add(slot)
+        self._cur_buffer_size = len(self._valid)
+        self._seqs[slot] = self._take_seq()
+
+        self._pending = None if np.any(item.done) else next_slot
+
+    def _gather(self, slots):
+        attrs = {name: column[slots] for name, column in self._columns.items()}
+
+        attrs[self.STATE_ATTR] = self._observations(slots)
+        attrs[self.NEXT_STATE_ATTR] = self._observations((slots + 1) % self._buffer_size)
+
+        return self._element_cls.make_element_from_dict_trusted(self._to_element_attrs(attrs, np.shape(slots)))
+
+    def _build_view_columns(self):
+        columns = super()._build_view_columns()
+
+        states = columns[self.STATE_ATTR]
+        columns[self.STATE_ATTR] = _ObservationColumn(self, states, 0)
+        columns[self.NEXT_STATE_ATTR] = _ObservationColumn(self, states, 1)
+
+        return columns
+
+    def _remove(self, slots):
+        self._valid.remove_many(slots)
+        self._cur_buffer_size = len(self._valid)
+
+    def _live_slots(self):
+        return np.array(self._valid.members)
+
+    def _load_rows(self, attrs, seqs):
+        # pushed one by one so trajectories are aliased again
+        for index, seq in enumerate(seqs):
+            self._next_seq = seq
+            self.push(self._element_cls.make_element_from_dict_trusted({name: value[index]
+                                                                        for name, value in attrs.items()}))
+
+    def _random_slots(self, num):
+        return self._valid.sample(self._rng, num)
+
+    def _ordered_slots(self, num):
+        # ring order starting at the oldest slot; O(buffer_size)
+        order = (self._write + np.arange(self._buffer_size)) % self._buffer_size
+        return order[self._valid.contains(order)][:num]
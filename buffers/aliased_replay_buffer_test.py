@@ -0,0 +1,160 @@
+import unittest
+import numpy as np
+from advantage.buffers.aliased_replay_buffer import AliasedReplayBuffer
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import DIMS, make_dims, make_sarsa
+
+STACKED_DIMS = make_dims((2, 3))
+
+def make_frames(values):
+    return np.stack([np.full((2,), value, dtype=np.float32) for value in values], axis=-1)
+
+def make_stacked_sarsa(step, done=False):
+    # frames are the step numbers, the first observation repeats frame 0
+    frames = [max(step + offset, 0) for offset in range(-2, 1)]
+    next_frames = [max(step + 1 + offset, 0) for offset in range(-2, 1)]
+    return Sarsa.make_element(state=make_frames(frames),
+                              action=np.array([1.], dtype=np.float32),
+                              reward=np.array([step], dtype=np.float32),
+                              done=np.array([done], dtype=np.bool_),
+                              next_state=make_frames(next_frames))
+
+class TestAliasedReplayBuffer(unittest.TestCase):
+    """ Tests for the various functionalities of the AliasedReplayBuffer """
+
+    def test_no_next_state_column(self):
+        ebuffer = AliasedReplayBuffer(8, Sarsa, DIMS)
+
+        self.assertNotIn("next_state", ebuffer.columns)
+        self.assertEqual(ebuffer.columns["state"].shape, (8, 2))
+
+    def test_trajectory_shares_observations(self):
+        ebuffer = AliasedReplayBuffer(8, Sarsa, DIMS)
+
+        for i in range(3):
+            ebuffer.push(make_sarsa(float(i)))
+
+        # 3 transitions + 1 trailing observation
+        self.assertEqual(ebuffer.len, 3)
+        self.assertEqual(ebuffer._write, 4)
+
+        batch = ebuffer.sample(3)
+        np.testing.assert_array_equal(batch.reward.ravel(), np.array([0., 1., 2.]))
+        np.testing.assert_array_equal(batch.next_state, batch.state + 1)
+
+    def test_narrow_storage_shares_observations(self):
+        ebuffer = AliasedReplayBuffer(32, Sarsa, DIMS, storage={"state": np.float16})
+
+        # not exact in float16
+        for i in range(10):
+            ebuffer.push(make_sarsa(i + 0.1))
+
+        self.assertEqual(ebuffer.len, 10)
+        self.assertEqual(ebuffer._write, 11)
+
+        uint8 = AliasedReplayBuffer(32, Sarsa, DIMS, storage={"state": np.uint8})
+        for i in range(10):
+            uint8.push(make_sarsa(float(i)))
+
+        self.assertEqual(uint8._write, 11)
+
+    def test_episode_boundaries(self):
+        ebuffer = AliasedReplayBuffer(8, Sarsa, DIMS)
+
+        ebuffer.push(make_sarsa(0.))
+        ebuffer.push(make_sarsa(1., done=True))
+        # next episode resets to an observation equal to the terminal one
+        ebuffer.push(make_sarsa(2.))
+
+        self.assertEqual(ebuffer.len, 3)
+        self.assertEqual(ebuffer._write, 5)
+
+        # a reset that doesn't follow `done` is also detected
+        ebuffer.push(make_sarsa(10.))
+        self.assertEqual(ebuffer._write, 7)
+
+        batch = ebuffer.random_sample(4)
+        np.testing.assert_array_equal(batch.next_state, batch.state + 1)
+
+    def test_wrap_invalidates_overwritten(self):
+        ebuffer = AliasedReplayBuffer(4, Sarsa, DIMS)
+
+        for i in range(5):
+            ebuffer.push(make_sarsa(float(i)))
+
+        # slots 0..3 hold observations 4, 5, 2, 3 so transition 1 is gone
+        self.assertEqual(ebuffer.len, 3)
+
+        batch = ebuffer.sample(3)
+        np.testing.assert_array_equal(batch.reward.ravel(), np.array([2., 3., 4.]))
+        np.testing.assert_array_equal(batch.next_state, batch.state + 1)
+
+    def test_random_sample_and_pop(self):
+        ebuffer = AliasedReplayBuffer(8, Sarsa, DIMS, seed=0)
+
+        for i in range(4):
+            ebuffer.push(make_sarsa(float(i)))
+
+        batch = ebuffer.random_sample_and_pop(2)
+        self.assertEqual(ebuffer.len, 2)
+
+        rest = ebuffer.sample(2)
+        self.assertEqual(set(batch.reward.ravel()) | set(rest.reward.ravel()), {0., 1., 2., 3.})
+
+        with self.assertRaises(ValueError):
+            ebuffer.random_sample(3)
+
+    def test_frame_stack(self):
+        ebuffer = AliasedReplayBuffer(16, Sarsa, STACKED_DIMS, frame_stack=3)
+
+        self.assertEqual(ebuffer.columns["state"].shape, (16, 2))
+
+        for step in range(4):
+            ebuffer.push(make_stacked_sarsa(step))
+
+        # 2 history frames + 4 states + 1 trailing observation
+        self.assertEqual(ebuffer._write, 7)
+
+        batch = ebuffer.sample(4)
+        self.assertEqual(batch.state.shape, (4, 2, 3))
+        for step in range(4):
+            expected = make_stacked_sarsa(step)
+            np.testing.assert_array_equal(batch.state[step], expected.state)
+            np.testing.assert_array_equal(batch.next_state[step], expected.next_state)
+
+    def test_transition_bytes(self):
+        ebuffer = AliasedReplayBuffer(16, Sarsa, STACKED_DIMS, frame_stack=3)
+        estimate = AliasedReplayBuffer.estimate_transition_bytes(Sarsa, STACKED_DIMS, frame_stack=3)
+
+        # a single frame of state, no next_state
+        full = sum(value.nbytes for value in Sarsa.make_element_zero(**STACKED_DIMS).unzip_to_dict().values())
+        self.assertEqual(estimate, full - 2 * 6 * 4 + 2 * 4 + 3 * 8)
+
+        self.assertEqual(ebuffer.nbytes, 16 * estimate)
+
+    def test_frame_stack_requires_stacked_states(self):
+        with self.assertRaises(ValueError):
+            AliasedReplayBuffer(8, Sarsa, DIMS, frame_stack=3)
+
+
+    def test_views(self):
+        ebuffer = AliasedReplayBuffer(8, Sarsa, DIMS)
+
+        for i in range(3):
+            ebuffer.push(make_sarsa(float(i)))
+
+        views = list(ebuffer.views())
+        self.assertEqual(len(views), 3)
+
+        np.testing.assert_array_equal(views[1].state, [1., 1.])
+        np.testing.assert_array_equal(views[1].next_state, [2., 2.])
+        self.assertTrue(np.shares_memory(views[1].next_state, ebuffer.columns["state"]))
+
+        stacked = AliasedReplayBuffer(16, Sarsa, STACKED_DIMS, frame_stack=3)
+        for step in range(3):
+            stacked.push(make_stacked_sarsa(step))
+
+        view = next(stacked.views())
+        np.testing.assert_array_equal(view.next_state, make_stacked_sarsa(0).next_state)
+
+unittest.main()
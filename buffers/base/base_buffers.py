@@ -0,0 +1,295 @@
+from abc import ABCMeta
+from abc import abstractmethod
+import os
+import numpy as np
+from advantage.buffers.segment_store import SegmentStore
+from advantage.buffers.eviction import FIFOEviction
+
+""" Interface shared by all Replay Buffers. Models only rely
+on this interface, so any buffer can be selected from the
+`Buffers` protobuf config.
+"""
+
+class ReplayBuffer(metaclass=ABCMeta):
+    """ Represents a buffer of Elements collected by an agent
+    while acting in an environment. Models push elements as
+    they are collected and sample batches for improvement.
+
+    Each pushed element gets an increasing sequence number. The checkpoint
+    system calls `save_checkpoint_state`, which only writes elements pushed
+    since the previous save, and `restore_checkpoint_state` on start up.
+
+    A `BufferStats` can be attached for instrumentation (see `stats`).
+    """
+
+    SEGMENTS_DIR = "replay_segments"
+
+    def __init__(self, buffer_size, seed=None, eviction=None):
+        """
+            Args:
+                buffer_size: maximum number of elements held
+                seed: seed for the sampling np.random.Generator
+                eviction: EvictionPolicy choosing the slot overwritten
+                    once full, FIFO if None
+
+            Raises:
+                ValueError: eviction not supported by the buffer
+        """
+        self._buffer_size = buffer_size
+
+        self._cur_buffer_size = 0
+
+        self._rng = np.random.default_rng(seed)
+
+        self._next_seq = 0
+        self._persisted_seq = 0
+
+        self._eviction = eviction or FIFOEviction()
+        self._eviction.bind(self)
+
+        self._stats = None
+
+    @property
+    def buffer_size(self):
+        """ property for `_buffer_size`
+        """
+        return self._buffer_size
+
+    @property
+    def len(self):
+        """ property for `_cur_buffer_size`
+        """
+        return self._cur_buffer_size
+
+    @property
+    def rng(self):
+        """ property for `_rng`
+        """
+        return self._rng
+
+    @property
+    def num_pushed(self):
+        """ number of elements pushed over the buffer's lifetime
+        """
+        return self._next_seq
+
+    @property
+    def eviction(self):
+        """ property for `_eviction`
+        """
+        return self._eviction
+
+    @property
+    def stats(self):
+        """ BufferStats instrumenting the buffer, None if disabled
+        """
+        return self._stats
+
+    @stats.setter
+    def stats(self, stats):
+        """ setter for `_stats`, called by `BufferStats.attach`
+        """
+        self._stats = stats
+
+    @property
+    def nbytes(self):
+        """ bytes of storage used by held elements
+        """
+        raise NotImplementedError("%s doesn't report its size" % self.__class__.__name__)
+
+    @property
+    def transition_bytes(self):
+        """ actual bytes of storage per element the buffer can hold
+        """
+        return self.nbytes / self._buffer_size
+
+    @classmethod
+    def estimate_transition_bytes(cls, element_cls, dims, **options):
+        """ Bytes of storage each element will take, used to size
+        a buffer from a byte budget
+
+                Args:
+                    element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                    dims: column dimensions from `Environment.dims`
+                    options: the buffer's other constructor arguments
+
+                Returns:
+                    bytes per element
+        """
+        raise NotImplementedError("%s can't be sized in bytes" % cls.__name__)
+
+    def _record_sample_age(self, slots):
+        """ Reports the ages of sampled slots to `stats` (if any)
+
+                Args:
+                    slots: np.ndarray of sampled slot indices
+        """
+        if self._stats is not None:
+            self._stats.record_ages(self._next_seq - self._seqs[slots])
+
+    def fifo_slot(self):
+        """ Slot of the oldest element, advancing the ring.
+        Used by FIFOEviction.
+
+                Returns:
+                    slot index
+        """
+        raise NotImplementedError("%s has no ring order" % self.__class__.__name__)
+
+    def _check_batch_size(self, batch_size, sample_less):
+        """ Validates a requested batch size
+
+                Args:
+                    batch_size: number of samples requested
+                    sample_less: whether to allow sampling less than requested amount
+
+                Returns:
+                    number of elements to actually sample
+
+                Raises:
+                    ValueError: invalid amount of samples requested
+                        and sample_less is False
+        """
+        if not sample_less and batch_size > self._cur_buffer_size:
+            raise ValueError("Specify sample_less=True to retrieve less than specified amount")
+
+        return min(batch_size, self._cur_buffer_size)
+
+    def _take_seq(self):
+        """ Assigns the next sequence number
+        """
+        seq = self._next_seq
+        self._next_seq += 1
+        return seq
+
+    def _rows_since(self, seq):
+        """ Collects the held elements pushed since `seq`
+
+                Args:
+                    seq: first sequence number to collect
+
+                Returns:
+                    tuple of (dict of attr name to np.ndarray [num, ...],
+                        np.ndarray of their sequence numbers)
+        """
+        raise NotImplementedError("%s can't be checkpointed" % self.__class__.__name__)
+
+    def _live_seqs(self):
+        """ Sequence numbers of all held elements
+
+                Returns:
+                    np.ndarray
+        """
+        raise NotImplementedError("%s can't be checkpointed" % self.__class__.__name__)
+
+    def _load_rows(self, attrs, seqs):
+        """ Pushes restored elements keeping their sequence numbers
+
+                Args:
+                    attrs: dict of attr name to np.ndarray [num, ...]
+                    seqs: np.ndarray of sequence numbers in insertion order
+        """
+        raise NotImplementedError("%s can't be checkpointed" % self.__class__.__name__)
+
+    def save_checkpoint_state(self, directory):
+        """ Writes elements pushed since the last save as a new segment
+
+                Args:
+                    directory: checkpoint directory
+        """
+        next_seq = self._next_seq
+
+        attrs, seqs = self._rows_since(self._persisted_seq)
+
+        store = SegmentStore(os.path.join(directory, self.SEGMENTS_DIR))
+        store.write(attrs, seqs, self._live_seqs(), next_seq)
+
+        self._persisted_seq = next_seq
+
+    def restore_checkpoint_state(self, directory):
+        """ Reloads the elements held at the last save (if any)
+
+                Args:
+                    directory: checkpoint directory
+
+                Raises:
+                    ValueError: restored elements don't fit the buffer
+        """
+        store = SegmentStore(os.path.join(directory, self.SEGMENTS_DIR))
+
+        saved = store.read()
+
+        if saved is None:
+            return
+
+        attrs, seqs, next_seq = saved
+
+        # newest elements win if the buffer shrunk
+        keep = slice(max(seqs.shape[0] - self._buffer_size, 0), None)
+
+        if seqs.shape[0]:
+            self._load_rows({name: value[keep] for name, value in attrs.items()}, seqs[keep])
+
+        self._next_seq = next_seq
+        self._persisted_seq = next_seq
+
+    def extend(self, attrs):
+        """ Bulk inserts elements (i.e. from an offline dataset) as if
+        pushed in order. Columnar buffers write each column at once.
+
+                Args:
+                    attrs: dict of every Element attr to np.ndarray [num, ...]
+        """
+        num = next(iter(attrs.values())).shape[0]
+
+        if not num:
+            return
+
+        seqs = np.arange(self._next_seq, self._next_seq + num)
+        self._load_rows(attrs, seqs)
+
+        self._next_seq = int(seqs[-1]) + 1
+
+    @abstractmethod
+    def push(self, item):
+        """ Appends an element to the buffer
+                Args:
+                    item: element to add
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def random_sample(self, batch_size, sample_less=False):
+        """ Randomly samples a batch of elements
+                Args:
+                    batch_size: number of samples to collect
+                    sample_less: whether to allow sampling less than requested amount
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def random_sample_and_pop(self, batch_size, sample_less=False):
+        """ Randomly samples a batch of elements and removes them
+                Args:
+                    batch_size: number of samples to collect
+                    sample_less: whether to allow sampling less than requested amount
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def sample(self, batch_size, sample_less=False):
+        """ Samples a deterministic batch of elements (oldest first)
+                Args:
+                    batch_size: number of samples to collect
+                    sample_less: whether to allow sampling less than requested amount
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def sample_and_pop(self, batch_size, sample_less=False):
+        """ Samples a deterministic batch of elements and removes them
+                Args:
+                    batch_size: number of samples to collect
+                    sample_less: whether to allow sampling less than requested amount
+        """
+        raise NotImplementedError()
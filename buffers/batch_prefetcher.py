@@ -0,0 +1,149 @@
+import queue
+import threading
+
+""" Assembles training batches on a worker thread so the
+learner doesn't wait on NumPy batch assembly.
+"""
+
+class BatchPrefetcher:
+    """ Runs `sample_fn` on a worker thread and hands its results to the
+    learner through a bounded queue of `depth` batches. The learner
+    `request`s the number of batches it will `get` for a burst of training
+    steps, so the worker never samples while the agent is pushing.
+
+    The worker holds `lock` while calling `sample_fn`. The learner must hold
+    it too for any other access to the buffer during a burst (i.e. updating
+    priorities). TensorFlow releases the GIL in `session.run`, so the worker
+    assembles the next batches while the current one trains.
+
+    An exception raised by `sample_fn` is handed to the learner in
+    order and raised by `get`.
+    """
+
+    # seconds between checks for `stop` while blocked
+    _POLL_SEC = 0.1
+
+    def __init__(self, sample_fn, depth, lock=None):
+        """
+            Args:
+                sample_fn: callable returning the next batch
+                depth: maximum number of batches assembled ahead
+                lock: threading.Lock guarding the buffer, a new one if None
+
+            Raises:
+                ValueError: depth less than 1
+        """
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+
+        self._sample_fn = sample_fn
+        self._lock = lock or threading.Lock()
+
+        self._queue = queue.Queue(maxsize=depth)
+
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def lock(self):
+        """ property for `_lock`
+        """
+        return self._lock
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run,
+                                        name="BatchPrefetcher",
+                                        daemon=True)
+        self._thread.start()
+
+    def _next_request(self):
+        """ Blocks until a batch is requested
+
+                Returns:
+                    False if stopped
+        """
+        with self._pending_cond:
+            while not self._pending and not self._stop_event.is_set():
+                self._pending_cond.wait(self._POLL_SEC)
+
+            if self._stop_event.is_set():
+                return False
+
+            self._pending -= 1
+            return True
+
+    def _put(self, item):
+        """ Blocks until there is room in the queue
+
+                Returns:
+                    False if stopped
+        """
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=self._POLL_SEC)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        """ Worker loop
+        """
+        while self._next_request():
+            try:
+                with self._lock:
+                    item = (self._sample_fn(), None)
+            except Exception as error: # pylint: disable=broad-except
+                # reason-disabled: re-raised by the learner in `get`
+                item = (None, error)
+
+                # the rest of the burst is abandoned
+                with self._pending_cond:
+                    self._pending = 0
+
+            if not self._put(item):
+                return
+
+    def request(self, num):
+        """ Asks the worker to assemble the next `num` batches
+
+                Args:
+                    num: number of batches the learner will `get`
+        """
+        if self._thread is None:
+            self._start()
+
+        with self._pending_cond:
+            self._pending += num
+            self._pending_cond.notify()
+
+    def get(self):
+        """ Next assembled batch, blocking until it is ready
+
+                Returns:
+                    return value of `sample_fn`
+
+                Raises:
+                    the exception raised by `sample_fn`
+        """
+        batch, error = self._queue.get()
+
+        if error is not None:
+            raise error
+
+        return batch
+
+    def stop(self):
+        """ Stops the worker. Batches not fetched are dropped.
+        """
+        self._stop_event.set()
+
+        with self._pending_cond:
+            self._pending_cond.notify()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,69 @@
+import unittest
+import threading
+from advantage.buffers.batch_prefetcher import BatchPrefetcher
+
+class TestBatchPrefetcher(unittest.TestCase):
+    """ Tests for the BatchPrefetcher """
+
+    def test_requested_batches_in_order(self):
+        calls = []
+        prefetcher = BatchPrefetcher(lambda: calls.append(len(calls)) or len(calls), 2)
+
+        prefetcher.request(5)
+        batches = [prefetcher.get() for _ in range(5)]
+        prefetcher.stop()
+
+        self.assertEqual(batches, [1, 2, 3, 4, 5])
+        # nothing sampled beyond the request
+        self.assertEqual(len(calls), 5)
+
+    def test_bounded_queue(self):
+        started = threading.Semaphore(0)
+
+        def sample():
+            started.release()
+            return 0
+
+        prefetcher = BatchPrefetcher(sample, 2)
+        prefetcher.request(10)
+
+        for _ in range(3):
+            started.acquire(timeout=5)
+
+        # 2 queued plus one blocked on `put`
+        self.assertFalse(started.acquire(timeout=0.3))
+        self.assertEqual(prefetcher.get(), 0)
+        self.assertTrue(started.acquire(timeout=5))
+
+        prefetcher.stop()
+
+    def test_exception_raised_by_get(self):
+        def sample():
+            raise ValueError("not enough elements")
+
+        prefetcher = BatchPrefetcher(sample, 2)
+        prefetcher.request(3)
+
+        with self.assertRaises(ValueError):
+            prefetcher.get()
+
+        prefetcher.stop()
+
+    def test_lock_held_while_sampling(self):
+        lock = threading.Lock()
+        held = []
+
+        prefetcher = BatchPrefetcher(lambda: held.append(lock.locked()), 1, lock)
+        self.assertIs(prefetcher.lock, lock)
+
+        prefetcher.request(1)
+        prefetcher.get()
+        prefetcher.stop()
+
+        self.assertEqual(held, [True])
+
+    def test_stop_without_start(self):
+        BatchPrefetcher(lambda: 0, 1).stop()
+
+
+unittest.main()
@@ -0,0 +1,252 @@
+import time
+import numpy as np
+
+""" Counters and timers describing how a Replay Buffer is used
+"""
+
+class BufferStats:
+    """ Instruments a Replay Buffer. `attach` wraps the buffer's push and
+    sampling methods on the instance, so a buffer without stats runs its
+    methods unwrapped and pays nothing but one `None` check per batch
+    (for sample ages). Pushes only increment a counter, the buffer's
+    `len` is read per pop and per read of `num_evictions`.
+
+    Tracks:
+        push rate: pushes per second between reads of `push_rate`
+        sample latency: seconds per sampling call, the latest
+            `window` calls are kept for percentiles
+        occupancy: fraction of `buffer_size` held
+        bytes used: `nbytes` of the buffer's storage
+        evictions: elements that left the buffer by a push
+            (overwritten, dropped, or invalidated)
+        sample age: number of pushes since each sampled element was
+            pushed, the latest `window` ages are kept
+    """
+
+    SAMPLE_METHODS = ("random_sample",
+                      "random_sample_and_pop",
+                      "sample",
+                      "sample_and_pop",
+                      "prioritized_sample")
+
+    def __init__(self, window=1024):
+        """
+            Args:
+                window: number of latest latencies and ages
+                    used for percentiles and means
+        """
+        self._buffer = None
+
+        self._num_pushes = 0
+        self._num_samples = 0
+
+        # elements held that weren't pushed (held on attach or restored)
+        # minus elements popped, so evictions = pushes + offset - len
+        self._len_offset = 0
+
+        self._latencies = np.zeros(window, dtype=np.float64)
+        self._num_latencies = 0
+
+        self._ages = np.zeros(window, dtype=np.float64)
+        self._num_ages = 0
+
+        self._rate_time = time.perf_counter()
+        self._rate_pushes = 0
+
+        # pushes made by `extend` are counted once by `extend`
+        self._extending = False
+
+    @property
+    def buffer(self):
+        """ property for `_buffer`
+        """
+        return self._buffer
+
+    @property
+    def num_pushes(self):
+        """ property for `_num_pushes`
+        """
+        return self._num_pushes
+
+    @property
+    def num_samples(self):
+        """ property for `_num_samples`
+        """
+        return self._num_samples
+
+    @property
+    def num_evictions(self):
+        """ elements that left the buffer by a push. Reads the
+        buffer's `len`, so it is only exact while no other thread
+        or process pushes to it.
+        """
+        return max(self._num_pushes + self._len_offset - self._buffer.len, 0)
+
+    def attach(self, buffer):
+        """ Starts instrumenting `buffer`
+
+                Args:
+                    buffer: ReplayBuffer
+
+                Raises:
+                    ValueError: already attached or `buffer` doesn't
+                        report its size (i.e. a ReplayClientBuffer)
+        """
+        if self._buffer is not None:
+            raise ValueError("BufferStats is already attached to a buffer")
+
+        try:
+            # pylint: disable=pointless-statement
+            # reason-disabled: only checks the buffer reports its size
+            buffer.nbytes
+        except NotImplementedError:
+            raise ValueError("%s can't be instrumented" % buffer.__class__.__name__)
+
+        self._buffer = buffer
+        buffer.stats = self
+
+        self._len_offset = buffer.len
+
+        push = buffer.push
+
+        def timed_push(item):
+            push(item)
+
+            if not self._extending:
+                self._num_pushes += 1
+
+        buffer.push = timed_push
+
+        extend = buffer.extend
+
+        def timed_extend(attrs):
+            self._extending = True
+            try:
+                extend(attrs)
+            finally:
+                self._extending = False
+
+            self._num_pushes += next(iter(attrs.values())).shape[0]
+
+        buffer.extend = timed_extend
+
+        restore_checkpoint_state = buffer.restore_checkpoint_state
+
+        def counted_restore_checkpoint_state(directory):
+            old_len = buffer.len
+            restore_checkpoint_state(directory)
+            self._len_offset += buffer.len - old_len
+
+        buffer.restore_checkpoint_state = counted_restore_checkpoint_state
+
+        for name in self.SAMPLE_METHODS:
+            if hasattr(buffer, name):
+                setattr(buffer, name, self._timed(getattr(buffer, name), name.endswith("_and_pop")))
+
+    def _timed(self, method, pops):
+        """ Wraps a bound sampling method to record its latency
+
+                Args:
+                    method: bound sampling method
+                    pops: whether `method` removes the sampled elements
+        """
+        def timed_method(*args, **kwargs):
+            old_len = self._buffer.len if pops else 0
+
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            self._record(self._latencies, self._num_latencies, [time.perf_counter() - start])
+            self._num_latencies += 1
+            self._num_samples += 1
+
+            if pops:
+                self._len_offset -= old_len - self._buffer.len
+
+            return result
+
+        return timed_method
+
+    @staticmethod
+    def _record(ring, num_recorded, values):
+        """ Writes values into a ring of the latest values
+        """
+        values = np.asarray(values, dtype=np.float64)[-ring.shape[0]:]
+        ring[(num_recorded + np.arange(values.shape[0])) % ring.shape[0]] = values
+
+    def record_ages(self, ages):
+        """ Called by the buffer with the ages of sampled elements
+
+                Args:
+                    ages: np.ndarray of pushes since each element was pushed
+        """
+        self._record(self._ages, self._num_ages, ages)
+        self._num_ages += np.size(ages)
+
+    @staticmethod
+    def _latest(ring, num_recorded):
+        return ring[:min(num_recorded, ring.shape[0])]
+
+    def push_rate(self):
+        """ Pushes per second since the previous call
+
+                Returns:
+                    float
+        """
+        now = time.perf_counter()
+        rate = (self._num_pushes - self._rate_pushes) / max(now - self._rate_time, 1e-9)
+
+        self._rate_time = now
+        self._rate_pushes = self._num_pushes
+
+        return rate
+
+    def sample_latency(self, percentile):
+        """ Percentile of the latest sampling latencies
+
+                Args:
+                    percentile: in [0, 100]
+
+                Returns:
+                    seconds, 0.0 before any sample
+        """
+        latencies = self._latest(self._latencies, self._num_latencies)
+        return float(np.percentile(latencies, percentile)) if latencies.shape[0] else 0.0
+
+    def sample_age(self):
+        """ Mean age of the latest sampled elements
+
+                Returns:
+                    pushes, 0.0 before any sample
+        """
+        ages = self._latest(self._ages, self._num_ages)
+        return float(np.mean(ages)) if ages.shape[0] else 0.0
+
+    def occupancy(self):
+        """ Fraction of the buffer in use
+
+                Returns:
+                    float in [0, 1]
+        """
+        return self._buffer.len / self._buffer.buffer_size
+
+    def bytes_used(self):
+        """ Bytes of storage used by the buffer
+
+                Returns:
+                    int
+        """
+        return self._buffer.nbytes
+
+    def summary(self):
+        """ Reads every stat (resets the push rate window)
+
+                Returns:
+                    dict of stat name to value
+        """
+        return {"push_rate": self.push_rate(),
+                "sample_latency_p50": self.sample_latency(50),
+                "sample_latency_p99": self.sample_latency(99),
+                "occupancy": self.occupancy(),
+                "bytes_used": self.bytes_used(),
+                "evictions": self.num_evictions,
+                "sample_age": self.sample_age()}
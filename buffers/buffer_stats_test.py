@@ -0,0 +1,162 @@
+import tempfile
+import unittest
+import numpy as np
+from advantage.buffers.buffer_stats import BufferStats
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from advantage.buffers.experience_replay_buffer import ExperienceReplayBuffer
+from advantage.buffers.aliased_replay_buffer import AliasedReplayBuffer
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import DIMS, make_sarsa
+
+class LenCountingBuffer(ColumnarReplayBuffer):
+    """ Counts reads of `len`, an RPC for some buffers """
+
+    num_len_reads = 0
+
+    @property
+    def len(self):
+        self.num_len_reads += 1
+        return self._cur_buffer_size
+
+class TestBufferStats(unittest.TestCase):
+    """ Tests for BufferStats """
+
+    def test_uninstrumented(self):
+        columnar = ColumnarReplayBuffer(4, Sarsa, DIMS, seed=0)
+        self.assertIsNone(columnar.stats)
+        self.assertNotIn("push", vars(columnar))
+
+    def test_counters(self):
+        columnar = ColumnarReplayBuffer(4, Sarsa, DIMS, seed=0)
+        stats = BufferStats()
+        stats.attach(columnar)
+
+        for value in range(6):
+            columnar.push(make_sarsa(value))
+
+        self.assertEqual(stats.num_pushes, 6)
+        self.assertEqual(stats.num_evictions, 2)
+        self.assertEqual(stats.occupancy(), 1.0)
+        self.assertEqual(stats.bytes_used(), columnar.nbytes)
+
+        columnar.random_sample_and_pop(2)
+        self.assertEqual(stats.num_samples, 1)
+        self.assertEqual(stats.occupancy(), 0.5)
+
+        # pops aren't evictions
+        columnar.push(make_sarsa(6))
+        self.assertEqual(stats.num_evictions, 2)
+
+    def test_push_doesnt_read_len(self):
+        ebuffer = LenCountingBuffer(4, Sarsa, DIMS, seed=0)
+        stats = BufferStats()
+        stats.attach(ebuffer)
+
+        num_len_reads = ebuffer.num_len_reads
+        for value in range(6):
+            ebuffer.push(make_sarsa(value))
+
+        self.assertEqual(ebuffer.num_len_reads, num_len_reads)
+        self.assertEqual(stats.num_evictions, 2)
+
+    def test_restore_isnt_evictions(self):
+        ebuffer = ColumnarReplayBuffer(4, Sarsa, DIMS, seed=0)
+        for value in range(3):
+            ebuffer.push(make_sarsa(value))
+
+        with tempfile.TemporaryDirectory() as directory:
+            ebuffer.save_checkpoint_state(directory)
+
+            restored = ColumnarReplayBuffer(4, Sarsa, DIMS, seed=0)
+            stats = BufferStats()
+            stats.attach(restored)
+            restored.restore_checkpoint_state(directory)
+
+        restored.push(make_sarsa(3))
+        self.assertEqual(stats.num_evictions, 0)
+
+        restored.push(make_sarsa(4))
+        self.assertEqual(stats.num_evictions, 1)
+
+    def test_extend(self):
+        ebuffer = ExperienceReplayBuffer(4, element_cls=Sarsa, seed=0)
+        stats = BufferStats()
+        stats.attach(ebuffer)
+
+        rows = [make_sarsa(value) for value in range(6)]
+        ebuffer.extend({name: np.stack([getattr(row, name) for row in rows])
+                        for name in rows[0].unzip_to_dict()})
+
+        # pushes made by extend aren't counted twice
+        self.assertEqual(stats.num_pushes, 6)
+        self.assertEqual(stats.num_evictions, 2)
+
+    def test_sample_age(self):
+        columnar = ColumnarReplayBuffer(4, Sarsa, DIMS, seed=0)
+        stats = BufferStats()
+        stats.attach(columnar)
+
+        for value in range(4):
+            columnar.push(make_sarsa(value))
+
+        # oldest two elements were pushed 4 and 3 pushes ago
+        columnar.sample(2)
+        self.assertAlmostEqual(stats.sample_age(), 3.5)
+
+    def test_experience_replay(self):
+        er_buffer = ExperienceReplayBuffer(3, seed=0)
+        stats = BufferStats()
+        stats.attach(er_buffer)
+
+        for value in range(3):
+            er_buffer.push(make_sarsa(value))
+
+        er_buffer.sample_and_pop(1)
+        self.assertAlmostEqual(stats.sample_age(), 3.0)
+        row_bytes = sum(value.nbytes for value in make_sarsa(0).unzip_to_dict().values())
+        self.assertEqual(stats.bytes_used(), 2 * row_bytes)
+
+    def test_aliased_invalidations(self):
+        aliased = AliasedReplayBuffer(4, Sarsa, DIMS, seed=0)
+        stats = BufferStats()
+        stats.attach(aliased)
+
+        # one trajectory of 3 transitions fills all 4 slots
+        for value in range(3):
+            aliased.push(make_sarsa(value))
+        self.assertEqual(stats.num_evictions, 0)
+
+        # a new trajectory needs 2 slots, invalidating 2 transitions
+        aliased.push(make_sarsa(10))
+        self.assertEqual(stats.num_evictions, 2)
+
+    def test_latency_and_rate(self):
+        columnar = ColumnarReplayBuffer(8, Sarsa, DIMS, seed=0)
+        stats = BufferStats(window=4)
+        stats.attach(columnar)
+
+        self.assertEqual(stats.sample_latency(50), 0.0)
+
+        for value in range(8):
+            columnar.push(make_sarsa(value))
+        for _ in range(6):
+            columnar.random_sample(2)
+
+        self.assertGreater(stats.push_rate(), 0.0)
+        self.assertEqual(stats.push_rate(), 0.0)
+        self.assertGreaterEqual(stats.sample_latency(99), stats.sample_latency(50))
+        self.assertGreater(stats.sample_latency(50), 0.0)
+
+        summary = stats.summary()
+        self.assertEqual(summary["evictions"], 0)
+        self.assertEqual(summary["occupancy"], 1.0)
+
+    def test_attach_once(self):
+        stats = BufferStats()
+        stats.attach(ColumnarReplayBuffer(2, Sarsa, DIMS))
+
+        with self.assertRaises(ValueError):
+            stats.attach(ColumnarReplayBuffer(2, Sarsa, DIMS))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import lzma
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+""" Codecs for compressing Element attrs held by Replay Buffers.
+zlib and lzma release the GIL while (de)compressing, so a thread
+pool decodes a batch in parallel.
+"""
+
+_COMPRESSORS = {
+    "ZLIB": (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    "LZMA": (lambda data, level: lzma.compress(data, preset=level), lzma.decompress)
+}
+
+class CompressedArray:
+    """ Compressed bytes of a np.ndarray with what is
+    needed to rebuild it
+    """
+    __slots__ = ("data", "shape", "dtype")
+
+    def __init__(self, data, shape, dtype):
+        self.data = data
+        self.shape = shape
+        self.dtype = dtype
+
+    @property
+    def nbytes(self):
+        """ size of the compressed data
+        """
+        return len(self.data)
+
+class ObservationCodec:
+    """ Compresses the observation attrs (`fields`) of Elements pushed
+    to a buffer and decompresses them at sample time. Keeps track of
+    raw and compressed bytes to report the compression ratio.
+    """
+
+    def __init__(self,
+                 codec,
+                 level,
+                 num_threads=4,
+                 fields=("state", "next_state"),
+                 expected_ratio=1.0):
+        """
+            Args:
+                codec: name of the codec, one of `_COMPRESSORS`
+                level: compression level (zlib level or lzma preset)
+                num_threads: threads decompressing a batch
+                fields: Element attrs to compress
+                expected_ratio: compression ratio assumed before any
+                    data is seen (i.e. to size a buffer in bytes)
+
+            Raises:
+                ValueError: unknown codec
+        """
+        if codec not in _COMPRESSORS:
+            raise ValueError("Codec %s does not exist" % codec)
+
+        self._compress, self._decompress = _COMPRESSORS[codec]
+        self._level = level
+        self._fields = tuple(fields)
+        self._expected_ratio = expected_ratio
+
+        self._pool = ThreadPoolExecutor(max_workers=num_threads) if num_threads > 1 else None
+
+        self._raw_bytes = 0
+        self._compressed_bytes = 0
+
+    @property
+    def fields(self):
+        """ property for `_fields`
+        """
+        return self._fields
+
+    @property
+    def expected_ratio(self):
+        """ property for `_expected_ratio`
+        """
+        return self._expected_ratio
+
+    @property
+    def compression_ratio(self):
+        """ raw bytes over compressed bytes of everything
+        encoded so far (1.0 before anything is encoded)
+        """
+        if not self._compressed_bytes:
+            return 1.0
+        return self._raw_bytes / self._compressed_bytes
+
+    def encode(self, array):
+        """ Compresses one array
+
+                Args:
+                    array: np.ndarray
+
+                Returns:
+                    CompressedArray
+        """
+        array = np.ascontiguousarray(array)
+
+        compressed = CompressedArray(self._compress(array.tobytes(), self._level),
+                                     array.shape,
+                                     array.dtype)
+
+        self._raw_bytes += array.nbytes
+        self._compressed_bytes += compressed.nbytes
+
+        return compressed
+
+    def decode(self, compressed):
+        """ Decompresses one array
+
+                Args:
+                    compressed: CompressedArray
+
+                Returns:
+                    np.ndarray
+        """
+        return np.frombuffer(self._decompress(compressed.data),
+                             dtype=compressed.dtype).reshape(compressed.shape)
+
+    def decode_many(self, compressed_list):
+        """ Decompresses arrays in the thread pool
+
+                Args:
+                    compressed_list: list of CompressedArray
+
+                Returns:
+                    list of np.ndarray in the same order
+        """
+        if self._pool is None or len(compressed_list) < 2:
+            return [self.decode(compressed) for compressed in compressed_list]
+
+        return list(self._pool.map(self.decode, compressed_list))
+
+    def shutdown(self):
+        """ Stops the decoding threads
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
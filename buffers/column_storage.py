@@ -0,0 +1,106 @@
+import numpy as np
+
+""" Storage formats for the columns of columnar Replay Buffers. An
+attr can be stored in a narrower dtype, bit-packed, or skipped, and
+is converted back to the Element's dtype on the sampled batch only.
+"""
+
+# attr isn't stored, sampled as the Element's default
+SKIP = "skip"
+
+# boolean attr of shape (1,) stored as one bit per element
+PACKED_BITS = "packed_bits"
+
+class PackedBitsColumn:
+    """ Column of one boolean per slot packed 8 to a byte. Supports
+    the indexing columnar buffers use: reading and writing an int
+    slot or an np.ndarray of slots. Rows read back with shape (1,).
+    """
+
+    def __init__(self, array):
+        """
+            Args:
+                array: np.ndarray like of np.uint8 holding the bits
+                    (i.e. a np.memmap), ceil(slots / 8) long
+        """
+        self._array = array
+
+    @staticmethod
+    def num_bytes(num_slots):
+        """ Bytes needed for `num_slots` bits
+        """
+        return -(-num_slots // 8)
+
+    @property
+    def array(self):
+        """ property for `_array`
+        """
+        return self._array
+
+    @property
+    def nbytes(self):
+        """ bytes of the packed array
+        """
+        return self._array.nbytes
+
+    def flush(self):
+        """ Flushes the packed array if it is a np.memmap
+        """
+        self._array.flush()
+
+    def __getitem__(self, slots):
+        slots = np.asarray(slots)
+        bits = (self._array[slots >> 3] >> (7 - (slots & 7)).astype(np.uint8)) & 1
+        return np.expand_dims(bits.astype(np.bool_), axis=-1)
+
+    def __setitem__(self, slots, values):
+        slots = np.ravel(slots)
+        values = np.broadcast_to(np.reshape(values, (-1,)), slots.shape).astype(np.bool_)
+
+        masks = (1 << (7 - (slots & 7))).astype(np.uint8)
+        indices = slots >> 3
+
+        # unbuffered, so slots sharing a byte all apply
+        np.bitwise_and.at(self._array, indices, ~masks)
+        np.bitwise_or.at(self._array, indices[values], masks[values])
+
+def column_spec(buffer_size, row_shape, dtype, storage):
+    """ Full column shape and dtype of an attr
+
+        Args:
+            buffer_size: number of slots
+            row_shape: shape of the attr of one element
+            dtype: np dtype of the attr
+            storage: np dtype to store it as, PACKED_BITS or
+                None to keep `dtype`
+
+        Returns:
+            tuple of (shape, dtype)
+
+        Raises:
+            ValueError: attr can't be bit-packed
+    """
+    if storage is None:
+        return (buffer_size,) + row_shape, dtype
+
+    if storage == PACKED_BITS:
+        if np.dtype(dtype) != np.bool_ or tuple(row_shape) != (1,):
+            raise ValueError("Only boolean attrs of shape (1,) can be bit-packed")
+        return (PackedBitsColumn.num_bytes(buffer_size),), np.dtype(np.uint8)
+
+    return (buffer_size,) + row_shape, np.dtype(storage)
+
+def row_bytes(row_shape, dtype, storage):
+    """ Bytes one element's attr takes in its column
+
+        Returns:
+            float (a fraction of a byte for PACKED_BITS)
+    """
+    if storage == SKIP:
+        return 0
+
+    if storage == PACKED_BITS:
+        return 1 / 8
+
+    dtype = dtype if storage is None else storage
+    return int(np.prod(row_shape)) * np.dtype(dtype).itemsize
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+from advantage.buffers.column_storage import PackedBitsColumn, column_spec, row_bytes, SKIP, PACKED_BITS
+
+class TestPackedBitsColumn(unittest.TestCase):
+    """ Tests for the PackedBitsColumn """
+
+    def setUp(self):
+        self.column = PackedBitsColumn(np.zeros(PackedBitsColumn.num_bytes(20), dtype=np.uint8))
+
+    def test_num_bytes(self):
+        self.assertEqual(self.column.nbytes, 3)
+        self.assertEqual(PackedBitsColumn.num_bytes(16), 2)
+
+    def test_set_and_get(self):
+        self.column[3] = np.array([True])
+        self.column[np.array([8, 9, 19])] = np.array([[True], [False], [True]])
+
+        self.assertEqual(self.column[3].shape, (1,))
+        self.assertTrue(self.column[3][0])
+
+        bits = self.column[np.arange(20)]
+        self.assertEqual(bits.shape, (20, 1))
+        np.testing.assert_array_equal(np.flatnonzero(bits[:, 0]), [3, 8, 19])
+
+        # slots sharing a byte
+        self.column[np.array([0, 1, 3])] = np.array([[True], [True], [False]])
+        np.testing.assert_array_equal(np.flatnonzero(self.column[np.arange(8)][:, 0]), [0, 1])
+
+    def test_windows(self):
+        self.column[np.arange(20)] = (np.arange(20) % 2 == 0).reshape(-1, 1)
+
+        windows = self.column[np.array([[0, 1, 2], [5, 6, 7]])]
+        self.assertEqual(windows.shape, (2, 3, 1))
+        np.testing.assert_array_equal(windows[..., 0], [[True, False, True], [False, True, False]])
+
+class TestColumnSpecs(unittest.TestCase):
+    """ Tests for column_spec and row_bytes """
+
+    def test_column_spec(self):
+        self.assertEqual(column_spec(10, (2,), np.float32, None), ((10, 2), np.float32))
+        self.assertEqual(column_spec(10, (2,), np.float32, np.float16), ((10, 2), np.float16))
+        self.assertEqual(column_spec(10, (1,), np.bool_, PACKED_BITS), ((2,), np.uint8))
+
+        with self.assertRaises(ValueError):
+            column_spec(10, (2,), np.bool_, PACKED_BITS)
+
+    def test_row_bytes(self):
+        self.assertEqual(row_bytes((84, 84), np.float32, np.uint8), 84 * 84)
+        self.assertEqual(row_bytes((2,), np.float32, None), 8)
+        self.assertEqual(row_bytes((1,), np.bool_, PACKED_BITS), 1 / 8)
+        self.assertEqual(row_bytes((1,), np.float32, SKIP), 0)
+
+if __name__ == "__main__":
+    unittest.main()
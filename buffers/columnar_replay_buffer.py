@@ -0,0 +1,484 @@
+import numpy as np
+from advantage.buffers.base.base_buffers import ReplayBuffer
+from advantage.buffers.eviction import FIFOEviction
+from advantage.buffers.column_storage import SKIP, PACKED_BITS, PackedBitsColumn, column_spec, row_bytes
+from advantage.elements.element_view import ElementView
+
+""" Replay Buffer storing each Element attr in its own
+preallocated contiguous np.ndarray (a `column`).
+"""
+
+class ColumnarReplayBuffer(ReplayBuffer):
+    """ Replay Buffer that preallocates one np.ndarray per Element attr
+    and writes elements into a ring. Samples are gathered with fancy indexing
+    and returned as one already stacked Element (each attr is [batch, ...]).
+    This avoids an object per element and re-stacking on every batch.
+
+    Live elements are always kept dense in slots [0, len). When full the
+    eviction policy chooses the slot overwritten, by default the oldest
+    (`_cursor`). Popped slots are filled by swapping in elements from the
+    end of the dense region.
+
+    `storage` can store attrs in a narrower dtype (i.e. uint8 pixels),
+    bit-packed (`PACKED_BITS`) or not at all (`SKIP`). Sampled batches
+    are converted back to the Element's dtypes. Skipped attrs get the
+    Element's defaults (see `Element.default_attrs`), so only attrs
+    that are always their default (i.e. next_action) should be skipped.
+    """
+
+    def __init__(self, buffer_size, element_cls, dims, seed=None, eviction=None, storage=None):
+        """
+            Args:
+                buffer_size: number of elements to preallocate for
+                element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                dims: column dimensions from `Environment.dims`
+                seed: seed for the sampling np.random.Generator
+                eviction: EvictionPolicy once full, FIFO if None
+                storage: dict of attr name to the np dtype it is stored as,
+                    PACKED_BITS or SKIP. Other attrs keep their dtype.
+
+            Raises:
+                ValueError: invalid storage
+        """
+        super().__init__(buffer_size, seed, eviction)
+
+        self._element_cls = element_cls
+
+        self._cursor = 0
+
+        # insertion sequence number of each slot
+        self._seqs = np.zeros(buffer_size, dtype=np.int64)
+
+        self._storage = dict(storage or {})
+
+        # shape and dtype of each attr of one element
+        self._row_specs = self._element_row_specs(element_cls, dims)
+
+        unknown = set(self._storage) - set(self._row_specs)
+        if unknown:
+            raise ValueError("storage has unknown attrs %s" % sorted(unknown))
+
+        # values of skipped attrs, i.e. a one-step discount_exponent
+        self._skipped_defaults = {}
+        if SKIP in self._storage.values():
+            self._skipped_defaults = {name: default
+                                      for name, default in element_cls.default_attrs(**dims).items()
+                                      if self._storage.get(name) == SKIP}
+
+        self._column_specs = {name: column_spec(buffer_size, shape, dtype, self._storage.get(name))
+                              for name, (shape, dtype) in self._row_specs.items()
+                              if self._storage.get(name) != SKIP}
+
+        self._columns = self._wrap_columns(self._allocate_columns())
+
+        # read-only columns backing ElementViews and the `_columns` they view
+        self._view_columns = None
+        self._viewed_columns = None
+
+    @property
+    def element_cls(self):
+        """ property for `_element_cls`
+        """
+        return self._element_cls
+
+    @property
+    def columns(self):
+        """ property for `_columns`
+        """
+        return self._columns
+
+    @property
+    def storage(self):
+        """ property for `_storage`
+        """
+        return self._storage
+
+    @staticmethod
+    def _element_row_specs(element_cls, dims):
+        """ Shape and dtype of each attr of one element
+
+                Returns:
+                    dict of attr name to (shape, dtype)
+        """
+        return {name: (value.shape, value.dtype)
+                for name, value in element_cls.make_element_zero(**dims).unzip_to_dict().items()}
+
+    def _wrap_columns(self, columns):
+        """ Wraps the arrays of bit-packed attrs in PackedBitsColumn
+
+                Args:
+                    columns: dict of attr name to column array
+
+                Returns:
+                    dict of attr name to column
+        """
+        return {name: PackedBitsColumn(column) if self._storage.get(name) == PACKED_BITS else column
+                for name, column in columns.items()}
+
+    def _to_element_attrs(self, attrs, batch_shape):
+        """ Converts gathered columns back to the Element's dtypes
+        and adds the defaults of skipped attrs, in place
+
+                Args:
+                    attrs: dict of attr name to gathered np.ndarray
+                    batch_shape: leading shape of the gathered slots
+
+                Returns:
+                    `attrs`
+        """
+        for name, (shape, dtype) in self._row_specs.items():
+            if name not in attrs:
+                attrs[name] = np.broadcast_to(self._skipped_defaults[name], batch_shape + shape).copy()
+            elif attrs[name].dtype != dtype:
+                attrs[name] = attrs[name].astype(dtype)
+
+        return attrs
+
+    def _allocate_columns(self):
+        """ Allocates all columns from `_column_specs`
+
+                Returns:
+                    dict of attr name to column
+        """
+        return {name: self._make_column(name, shape, dtype)
+                for name, (shape, dtype) in self._column_specs.items()}
+
+    def _make_column(self, name, shape, dtype):
+        """ Allocates storage for one Element attr. Subclasses
+        override this to change where columns live.
+
+                Args:
+                    name: attr name
+                    shape: full column shape (buffer_size first)
+                    dtype: np dtype of the attr
+
+                Returns:
+                    np.ndarray like column
+        """
+        return np.zeros(shape, dtype=dtype)
+
+    @property
+    def nbytes(self):
+        """ bytes of the preallocated columns
+        """
+        return sum(column.nbytes for column in self._columns.values()) + self._seqs.nbytes
+
+    @classmethod
+    def _row_bytes(cls, element_cls, dims, storage=None):
+        """ Bytes of one element in each column
+
+                Args:
+                    storage: as passed to the constructor
+
+                Returns:
+                    dict of attr name to bytes
+        """
+        storage = storage or {}
+        return {name: row_bytes(shape, dtype, storage.get(name))
+                for name, (shape, dtype) in cls._element_row_specs(element_cls, dims).items()}
+
+    @classmethod
+    def estimate_transition_bytes(cls, element_cls, dims, storage=None, **options):
+        # columns plus the sequence number
+        return sum(cls._row_bytes(element_cls, dims, storage).values()) + np.dtype(np.int64).itemsize
+
+    def fifo_slot(self):
+        slot = self._cursor
+        self._cursor = (self._cursor + 1) % self._buffer_size
+        return slot
+
+    def _next_slot(self):
+        """ Determines which slot the next pushed element is written to
+        and assigns it the next sequence number
+
+                Returns:
+                    slot index or None if the element is dropped
+        """
+        if self._cur_buffer_size < self._buffer_size:
+            slot = self._cur_buffer_size
+            self._cur_buffer_size += 1
+        else:
+            slot = self._eviction.victim(self)
+
+        seq = self._take_seq()
+
+        if slot is not None:
+            self._seqs[slot] = seq
+        return slot
+
+    def _next_slots(self, num):
+        """ `_next_slot` for `num` elements. With FIFO eviction the slots
+        are computed at once: the free slots in order, then the ring
+        from the cursor.
+
+                Returns:
+                    np.ndarray of slot indices, -1 where an element is dropped
+        """
+        if not isinstance(self._eviction, FIFOEviction):
+            return np.array([-1 if slot is None else slot
+                             for slot in (self._next_slot() for _ in range(num))], dtype=np.int64)
+
+        free = min(num, self._buffer_size - self._cur_buffer_size)
+        slots = np.concatenate([np.arange(self._cur_buffer_size, self._cur_buffer_size + free),
+                                (self._cursor + np.arange(num - free)) % self._buffer_size])
+
+        self._cur_buffer_size += free
+        self._cursor = (self._cursor + num - free) % self._buffer_size
+        self._next_seq += num
+
+        return slots
+
+    def push(self, item):
+        """ Writes an element into the ring
+                Args:
+                    item: Element of type `element_cls`
+        """
+        slot = self._next_slot()
+
+        if slot is None:
+            return
+
+        for name, column in self._columns.items():
+            column[slot] = getattr(item, name)
+
+    def _gather(self, slots):
+        """ Gathers slots into one stacked Element
+
+                Args:
+                    slots: np.ndarray of slot indices
+
+                Returns:
+                    stacked Element
+        """
+        attrs = {name: column[slots] for name, column in self._columns.items()}
+        return self._element_cls.make_element_from_dict_trusted(self._to_element_attrs(attrs, np.shape(slots)))
+
+    @staticmethod
+    def _read_only(column):
+        """ Read-only view of a np.ndarray column, other columns
+        (i.e. PackedBitsColumn) already return copies
+        """
+        if not isinstance(column, np.ndarray):
+            return column
+
+        view = column.view()
+        view.flags.writeable = False
+        return view
+
+    def _build_view_columns(self):
+        """ Builds the read-only columns backing ElementViews. Skipped
+        attrs are zero-stride columns of their defaults.
+
+                Returns:
+                    dict of every attr name (in Element order) to a column
+        """
+        columns = {}
+
+        for name, (shape, _) in self._row_specs.items():
+            if name in self._columns:
+                columns[name] = self._read_only(self._columns[name])
+            elif name in self._skipped_defaults:
+                columns[name] = np.broadcast_to(self._skipped_defaults[name], (self._buffer_size,) + shape)
+            else:
+                # not stored separately (i.e. aliased), set by the subclass
+                columns[name] = None
+
+        return columns
+
+    def view(self, slot):
+        """ Zero-copy, read-only view of the element in `slot`
+
+                Args:
+                    slot: slot index (i.e. from `prioritized_sample`)
+
+                Returns:
+                    ElementView
+        """
+        # columns are replaced when reopened (i.e. MemmapReplayBuffer.open)
+        if self._viewed_columns is not self._columns:
+            self._view_columns = self._build_view_columns()
+            self._viewed_columns = self._columns
+
+        return ElementView(self._view_columns, slot)
+
+    def views(self):
+        """ Zero-copy views of all held elements, i.e. for inspecting
+        or relabeling them without constructing Elements
+
+                Returns:
+                    generator of ElementView
+        """
+        for slot in self._live_slots():
+            yield self.view(int(slot))
+
+    def _remove(self, slots):
+        """ Removes slots by moving elements from the end of the
+        dense region into the holes.
+
+                Args:
+                    slots: np.ndarray of unique slot indices
+        """
+        new_len = self._cur_buffer_size - slots.shape[0]
+
+        tail = np.arange(new_len, self._cur_buffer_size)
+        movers = tail[np.isin(tail, slots, invert=True)]
+        holes = np.sort(slots[slots < new_len])
+
+        if holes.shape[0]:
+            self._move(movers, holes)
+
+        self._cur_buffer_size = new_len
+
+        if self._cursor >= new_len:
+            self._cursor = 0
+
+    def _move(self, sources, destinations):
+        """ Copies elements between slots
+
+                Args:
+                    sources: np.ndarray of slots to copy from
+                    destinations: np.ndarray of slots to copy to
+        """
+        for column in self._columns.values():
+            column[destinations] = column[sources]
+
+        self._seqs[destinations] = self._seqs[sources]
+
+    def _live_slots(self):
+        """ Slots currently holding an element
+
+                Returns:
+                    np.ndarray of slot indices
+        """
+        return np.arange(self._cur_buffer_size)
+
+    def _rows_since(self, seq):
+        slots = self._live_slots()
+        slots = slots[self._seqs[slots] >= seq]
+        return self._gather(slots).unzip_to_dict(), self._seqs[slots]
+
+    def _live_seqs(self):
+        return self._seqs[self._live_slots()]
+
+    def _load_rows(self, attrs, seqs):
+        """ Writes restored elements with one bulk write per column
+
+                Returns:
+                    np.ndarray of slots written
+        """
+        slots = self._next_slots(seqs.shape[0])
+
+        rows = np.flatnonzero(slots >= 0)
+        slots = slots[rows]
+
+        # a slot chosen again later in the batch keeps its last row
+        _, last = np.unique(slots[::-1], return_index=True)
+        unique = np.sort(slots.shape[0] - 1 - last)
+        rows, slots = rows[unique], slots[unique]
+
+        for name, column in self._columns.items():
+            column[slots] = attrs[name][rows]
+
+        self._seqs[slots] = seqs[rows]
+
+        return slots
+
+    def _ordered_slots(self, num):
+        """ Slots in (approximate) insertion order starting at the oldest
+
+                Args:
+                    num: number of slots
+
+                Returns:
+                    np.ndarray of slot indices
+        """
+        if not num:
+            return np.arange(0)
+        return (self._cursor + np.arange(num)) % self._cur_buffer_size
+
+    def _random_slots(self, num):
+        """ Uniformly chooses distinct slots
+
+                Args:
+                    num: number of slots
+
+                Returns:
+                    np.ndarray of slot indices
+        """
+        return self._rng.choice(self._cur_buffer_size, size=num, replace=False)
+
+    def random_sample(self, batch_size, sample_less=False):
+        """Randomly samples a batch of elements
+            Args:
+                batch_size: number of samples to collect
+                sample_less: whether to allow sampling less than requested amount
+
+            Raises:
+                ValueError: invalid amount of samples requested
+                    and sample_less is False
+
+            Returns:
+                stacked Element
+        """
+        num = self._check_batch_size(batch_size, sample_less)
+        slots = self._random_slots(num)
+        self._record_sample_age(slots)
+        return self._gather(slots)
+
+    def random_sample_and_pop(self, batch_size, sample_less=False):
+        """ Randomly samples a batch of elements and removes them
+                Args:
+                    batch_size: number of samples to collect
+                    sample_less: whether to allow sampling less than requested amount
+
+                Raises:
+                    ValueError: invalid amount of samples requested
+                        and sample_less is False
+
+                Returns:
+                    stacked Element
+        """
+        num = self._check_batch_size(batch_size, sample_less)
+        slots = self._random_slots(num)
+        self._record_sample_age(slots)
+        batch = self._gather(slots)
+        self._remove(slots)
+        return batch
+
+    def sample(self, batch_size, sample_less=False):
+        """Sample a deterministic batch of elements (oldest first)
+            Args:
+                batch_size: number of samples to collect
+                sample_less: whether to allow sampling less than requested amount
+
+            Raises:
+                ValueError: invalid amount of samples requested
+                    and sample_less is False
+
+            Returns:
+                stacked Element
+        """
+        num = self._check_batch_size(batch_size, sample_less)
+        slots = self._ordered_slots(num)
+        self._record_sample_age(slots)
+        return self._gather(slots)
+
+    def sample_and_pop(self, batch_size, sample_less=False):
+        """ Sample a deterministic batch of elements and removes them
+                Args:
+                    batch_size: number of samples to collect
+                    sample_less: whether to allow sampling less than requested amount
+
+                Raises:
+                    ValueError: invalid amount of samples requested
+                        and sample_less is False
+
+                Returns:
+                    stacked Element
+        """
+        num = self._check_batch_size(batch_size, sample_less)
+        slots = self._ordered_slots(num)
+        self._record_sample_age(slots)
+        batch = self._gather(slots)
+        self._remove(slots)
+        return batch
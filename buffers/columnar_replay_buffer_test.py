@@ -0,0 +1,203 @@
+import unittest
+import numpy as np
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from advantage.buffers.column_storage import SKIP, PACKED_BITS
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import DIMS, make_sarsa, stack_sarsas
+
+class TestColumnarReplayBuffer(unittest.TestCase):
+    """ Tests for the various functionalities of the ColumnarReplayBuffer """
+
+    def setUp(self):
+        self.BUFFER_SIZE = 4
+        self.ebuffer = ColumnarReplayBuffer(self.BUFFER_SIZE, Sarsa, DIMS)
+
+    def test_preallocated_columns(self):
+        columns = self.ebuffer.columns
+        self.assertEqual(columns["state"].shape, (self.BUFFER_SIZE, 2))
+        self.assertEqual(columns["done"].shape, (self.BUFFER_SIZE, 1))
+        self.assertEqual(columns["done"].dtype, np.bool_)
+        self.assertEqual(columns["next_action"].shape, (self.BUFFER_SIZE, 1))
+
+    def test_push_and_ring_overwrite(self):
+        for i in range(self.BUFFER_SIZE + 2):
+            self.ebuffer.push(make_sarsa(float(i)))
+
+        self.assertEqual(self.ebuffer.len, self.BUFFER_SIZE)
+
+        batch = self.ebuffer.sample(self.BUFFER_SIZE)
+
+        np.testing.assert_array_equal(batch.reward, np.array([[2.], [3.], [4.], [5.]]))
+
+    def test_sample_is_stacked(self):
+        for i in range(3):
+            self.ebuffer.push(make_sarsa(float(i)))
+
+        batch = self.ebuffer.random_sample(2)
+
+        self.assertEqual(batch.state.shape, (2, 2))
+        self.assertEqual(batch.done.shape, (2, 1))
+        np.testing.assert_array_equal(batch.next_state, batch.state + 1)
+
+        stacked = Sarsa.stack(batch)
+        np.testing.assert_array_equal(stacked.state, batch.state)
+
+    def test_sample_less(self):
+        self.ebuffer.push(make_sarsa(0.))
+
+        with self.assertRaises(ValueError):
+            self.ebuffer.random_sample(2)
+
+        batch = self.ebuffer.random_sample(2, sample_less=True)
+        self.assertEqual(batch.state.shape, (1, 2))
+
+    def test_random_sample_and_pop(self):
+        for i in range(self.BUFFER_SIZE):
+            self.ebuffer.push(make_sarsa(float(i)))
+
+        batch = self.ebuffer.random_sample_and_pop(3)
+
+        self.assertEqual(self.ebuffer.len, 1)
+
+        rest = self.ebuffer.sample(1)
+
+        seen = np.concatenate([batch.reward, rest.reward]).ravel()
+        np.testing.assert_array_equal(np.sort(seen), np.array([0., 1., 2., 3.]))
+
+        self.ebuffer.push(make_sarsa(9.))
+        self.assertEqual(self.ebuffer.len, 2)
+
+    def test_sample_and_pop(self):
+        for i in range(self.BUFFER_SIZE):
+            self.ebuffer.push(make_sarsa(float(i)))
+
+        batch = self.ebuffer.sample_and_pop(2)
+
+        np.testing.assert_array_equal(batch.reward, np.array([[0.], [1.]]))
+        self.assertEqual(self.ebuffer.len, 2)
+
+        batch = self.ebuffer.sample_and_pop(2)
+        np.testing.assert_array_equal(np.sort(batch.reward.ravel()), np.array([2., 3.]))
+        self.assertEqual(self.ebuffer.len, 0)
+
+    def test_transition_bytes(self):
+        estimate = ColumnarReplayBuffer.estimate_transition_bytes(Sarsa, DIMS)
+
+        self.assertEqual(estimate * self.BUFFER_SIZE, self.ebuffer.nbytes)
+        self.assertEqual(self.ebuffer.transition_bytes, estimate)
+
+
+    def test_storage(self):
+        storage = {"state": np.float16, "action": np.int16, "done": PACKED_BITS, "next_action": SKIP}
+        ebuffer = ColumnarReplayBuffer(10, Sarsa, DIMS, storage=storage)
+
+        self.assertEqual(ebuffer.columns["state"].dtype, np.float16)
+        self.assertEqual(ebuffer.columns["done"].nbytes, 2)
+        self.assertNotIn("next_action", ebuffer.columns)
+        self.assertLess(ebuffer.nbytes, self.ebuffer.nbytes * 10 / self.BUFFER_SIZE)
+
+        for i in range(10):
+            item = make_sarsa(i + 0.5)
+            item.done[0] = i % 3 == 0
+            ebuffer.push(item)
+
+        batch = ebuffer.sample(10)
+
+        # upcast to the Element's dtypes
+        self.assertEqual(batch.state.dtype, np.float32)
+        self.assertEqual(batch.action.dtype, np.float32)
+        np.testing.assert_array_equal(batch.state[:, 0], np.arange(10) + 0.5)
+        np.testing.assert_array_equal(batch.done[:, 0], np.arange(10) % 3 == 0)
+        np.testing.assert_array_equal(batch.next_action, np.zeros((10, 1)))
+
+        ebuffer.random_sample_and_pop(4)
+        batch = ebuffer.sample(6)
+        np.testing.assert_array_equal(batch.done[:, 0], batch.state[:, 0] % 3 == 0.5)
+
+        estimate = ColumnarReplayBuffer.estimate_transition_bytes(Sarsa, DIMS, storage)
+        self.assertAlmostEqual(estimate * 10, ebuffer.nbytes, delta=1)
+
+    def test_invalid_storage(self):
+        with self.assertRaises(ValueError):
+            ColumnarReplayBuffer(4, Sarsa, DIMS, storage={"state": PACKED_BITS})
+
+        with self.assertRaises(ValueError):
+            ColumnarReplayBuffer(4, Sarsa, DIMS, storage={"logits": np.float16})
+
+    def test_views(self):
+        for i in range(3):
+            self.ebuffer.push(make_sarsa(float(i)))
+
+        views = list(self.ebuffer.views())
+        self.assertEqual([view.slot for view in views], [0, 1, 2])
+
+        view = views[1]
+        np.testing.assert_array_equal(view.state, [1., 1.])
+        self.assertEqual(list(view.unzip_to_dict()), list(make_sarsa(0.).unzip_to_dict()))
+        self.assertEqual(len(view.unzip_to_tuple()), 7)
+
+        # zero-copy and read-only
+        self.assertTrue(np.shares_memory(view.state, self.ebuffer.columns["state"]))
+        with self.assertRaises(ValueError):
+            view.state[0] = 5.
+
+        self.ebuffer.columns["reward"][1] = 7.
+        self.assertEqual(view.reward[0], 7.)
+
+        with self.assertRaises(AttributeError):
+            view.logits
+
+    def test_skip_uses_defaults(self):
+        ebuffer = ColumnarReplayBuffer(4, Sarsa, DIMS, storage={"discount_exponent": SKIP})
+        ebuffer.push(make_sarsa(1.))
+
+        # one-step transitions, not gamma^0
+        np.testing.assert_array_equal(ebuffer.sample(1).discount_exponent, [[1.]])
+        np.testing.assert_array_equal(ebuffer.view(0).discount_exponent, [1.])
+
+    def test_views_of_compact_storage(self):
+        ebuffer = ColumnarReplayBuffer(4, Sarsa, DIMS, storage={"done": PACKED_BITS, "next_action": SKIP})
+
+        item = make_sarsa(1.)
+        item.done[0] = True
+        ebuffer.push(item)
+
+        view = ebuffer.view(0)
+        self.assertTrue(view.done[0])
+        np.testing.assert_array_equal(view.next_action, [0.])
+
+    def test_extend_overwrites_slots_again(self):
+        ebuffer = ColumnarReplayBuffer(4, Sarsa, DIMS, storage={"done": PACKED_BITS})
+
+        rows = [make_sarsa(float(i), done=i == 0) for i in range(6)]
+        ebuffer.extend({name: np.stack([getattr(row, name) for row in rows])
+                        for name in rows[0].unzip_to_dict()})
+
+        # slots 0 and 1 are written twice, the later rows win
+        batch = ebuffer.sample(4)
+        np.testing.assert_array_equal(batch.reward.ravel(), [2., 3., 4., 5.])
+        self.assertFalse(batch.done.any())
+        self.assertEqual(ebuffer.num_pushed, 6)
+
+    def test_extend_matches_pushes(self):
+        pushed, extended = [ColumnarReplayBuffer(4, Sarsa, DIMS) for _ in range(2)]
+
+        for ebuffer in (pushed, extended):
+            for i in range(3):
+                ebuffer.push(make_sarsa(float(i)))
+
+        # fills the free slot then wraps around the ring
+        for i in range(10, 16):
+            pushed.push(make_sarsa(float(i)))
+        extended.extend(stack_sarsas(range(10, 16)))
+
+        # the next push overwrites the same oldest slot
+        pushed.push(make_sarsa(20.))
+        extended.push(make_sarsa(20.))
+
+        self.assertEqual(extended.len, pushed.len)
+        self.assertEqual(extended.num_pushed, pushed.num_pushed)
+        np.testing.assert_array_equal(extended.columns["reward"], pushed.columns["reward"])
+        np.testing.assert_array_equal(extended.sample(4).reward, pushed.sample(4).reward)
+
+unittest.main()
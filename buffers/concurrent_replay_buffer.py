@@ -0,0 +1,324 @@
+import itertools
+import os
+import threading
+import numpy as np
+from advantage.buffers.base.base_buffers import ReplayBuffer
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+
+""" Replay Buffer that acting threads push to while
+a learner thread samples, without a global lock
+"""
+
+class ConcurrentReplayBuffer(ReplayBuffer):
+    """ Splits the buffer into `num_shards` ColumnarReplayBuffers, each
+    guarded by its own lock. Elements are spread round robin over the
+    shards, so the buffer fills to `buffer_size` whatever the number of
+    pushing threads (i.e. a single acting thread). Each thread keeps its
+    own position in the round, starting on a different shard (assigned
+    on its first push), so actors pushing at the same rate mostly take
+    different locks and only contend with the learner on the shards it
+    samples. `extend` splits its rows over the shards the same way.
+
+    Sampling draws distinct indices uniformly over the elements of all
+    shards (from a snapshot of their lengths) and gathers each shard's
+    share under that shard's lock, so samples stay uniform across shards.
+    A shard only grows or overwrites while pushing, so its snapshot
+    length stays valid. Only one thread may sample or pop at a time.
+
+    Each shard is FIFO over its own elements.
+    """
+
+    SHARD_DIR = "shard_%d"
+
+    def __init__(self, buffer_size, element_cls, dims, num_shards=1, seed=None, storage=None):
+        """
+            Args:
+                buffer_size: total number of elements, split
+                    evenly between the shards
+                element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                dims: column dimensions from `Environment.dims`
+                num_shards: number of independently locked shards, usually
+                    the number of acting threads
+                seed: seed for the sampling np.random.Generator
+                storage: per attr storage of each shard (see ColumnarReplayBuffer)
+
+            Raises:
+                ValueError: shards would be empty
+        """
+        if not 0 < num_shards <= buffer_size:
+            raise ValueError("num_shards must be in [1, buffer_size]")
+
+        super().__init__(buffer_size, seed)
+
+        self._element_cls = element_cls
+
+        shard_size = buffer_size // num_shards
+
+        self._shards = [ColumnarReplayBuffer(shard_size, element_cls, dims, storage=storage)
+                        for _ in range(num_shards)]
+        self._locks = [threading.Lock() for _ in range(num_shards)]
+
+        # shard of each pushing thread
+        self._thread_shard = threading.local()
+        self._shard_counter = itertools.count()
+
+    @property
+    def num_shards(self):
+        """ number of shards
+        """
+        return len(self._shards)
+
+    @property
+    def shards(self):
+        """ property for `_shards`
+        """
+        return self._shards
+
+    @property
+    def len(self):
+        return sum(shard.len for shard in self._shards)
+
+    @property
+    def num_pushed(self):
+        return sum(shard.num_pushed for shard in self._shards)
+
+    @property
+    def nbytes(self):
+        return sum(shard.nbytes for shard in self._shards)
+
+    @classmethod
+    def estimate_transition_bytes(cls, element_cls, dims, storage=None, **options):
+        return ColumnarReplayBuffer.estimate_transition_bytes(element_cls, dims, storage)
+
+    def _next_shards(self, num):
+        """ Takes the calling thread's next `num` positions in the round,
+        a thread's first position is assigned round robin on its first push
+
+                Returns:
+                    index of the first shard
+        """
+        index = getattr(self._thread_shard, "index", None)
+
+        if index is None:
+            # `next` on itertools.count is atomic under the GIL
+            index = next(self._shard_counter) % len(self._shards)
+
+        self._thread_shard.index = (index + num) % len(self._shards)
+
+        return index
+
+    def push(self, item):
+        """ Appends an element to the calling thread's next shard
+                Args:
+                    item: Element of type `element_cls`
+        """
+        index = self._next_shards(1)
+
+        with self._locks[index]:
+            self._shards[index].push(item)
+
+    def extend(self, attrs):
+        """ Bulk inserts elements, row i into the calling thread's
+        i-th next shard, each shard's rows under its lock at once
+                Args:
+                    attrs: dict of every Element attr to np.ndarray [num, ...]
+        """
+        num = next(iter(attrs.values())).shape[0] if attrs else 0
+        num_shards = len(self._shards)
+
+        start = self._next_shards(num)
+
+        for offset in range(min(num, num_shards)):
+            index = (start + offset) % num_shards
+
+            with self._locks[index]:
+                self._shards[index].extend({name: value[offset::num_shards]
+                                            for name, value in attrs.items()})
+
+    def views(self):
+        """ Zero-copy views of the elements of all shards (see
+        ColumnarReplayBuffer.views). Views aren't guarded by the
+        shard locks, so concurrent pushes may overwrite them.
+
+                Returns:
+                    generator of ElementView
+        """
+        for shard in self._shards:
+            yield from shard.views()
+
+    def _split(self, indices, lens):
+        """ Maps global indices into the concatenated shards to
+        the local indices of each shard
+
+                Args:
+                    indices: np.ndarray in [0, lens.sum())
+                    lens: np.ndarray of shard lengths
+
+                Returns:
+                    list of (shard index, np.ndarray of local indices)
+        """
+        bounds = np.cumsum(lens)
+        shard_indices = np.searchsorted(bounds, indices, side="right")
+        local = indices - (bounds[shard_indices] - lens[shard_indices])
+
+        return [(index, local[shard_indices == index])
+                for index in np.unique(shard_indices)]
+
+    def _ordered_split(self, num, lens):
+        """ Splits `num` between the shards proportional to their
+        lengths, taking the oldest elements of each
+
+                Returns:
+                    list of (shard index, np.ndarray of local indices)
+        """
+        total = lens.sum()
+        if not total:
+            return []
+
+        counts = np.floor(num * lens / total).astype(np.int64)
+
+        # largest remainders take the leftover
+        leftover = num - counts.sum()
+        remainders = num * lens / total - counts
+        counts[np.argsort(-remainders, kind="stable")[:leftover]] += 1
+
+        return [(index, np.arange(count)) for index, count in enumerate(counts) if count]
+
+    def _collect(self, splits, ordered, pop):
+        """ Gathers (and removes) the split indices from each
+        shard under its lock and concatenates them
+
+                Args:
+                    splits: as returned by `_split` or `_ordered_split`
+                    ordered: whether local indices are ring positions
+                        (oldest first) rather than slots
+                    pop: whether to remove the gathered elements
+
+                Returns:
+                    stacked Element
+        """
+        parts = []
+
+        # pylint: disable=protected-access
+        # reason-disabled: shards are owned by this buffer
+        for index, local in splits:
+            shard = self._shards[index]
+
+            with self._locks[index]:
+                slots = shard._ordered_slots(local.shape[0]) if ordered else local
+
+                # shard ages scaled to (approximate) pushes to all shards
+                if self._stats is not None:
+                    self._stats.record_ages((shard.num_pushed - shard._seqs[slots]) * len(self._shards))
+
+                parts.append(shard._gather(slots).unzip_to_dict())
+
+                if pop:
+                    shard._remove(slots)
+
+        if not parts:
+            return self._shards[0]._gather(np.zeros(0, dtype=np.int64))
+
+        return self._element_cls.make_element_from_dict_trusted({name: np.concatenate([part[name]
+                                                                                       for part in parts])
+                                                                 for name in parts[0]})
+
+    def _random_splits(self, batch_size, sample_less):
+        lens = np.array([shard.len for shard in self._shards])
+        self._cur_buffer_size = int(lens.sum())
+
+        num = self._check_batch_size(batch_size, sample_less)
+        indices = self._rng.choice(self._cur_buffer_size, size=num, replace=False)
+
+        return self._split(indices, lens)
+
+    def _ordered_splits(self, batch_size, sample_less):
+        lens = np.array([shard.len for shard in self._shards])
+        self._cur_buffer_size = int(lens.sum())
+
+        num = self._check_batch_size(batch_size, sample_less)
+
+        return self._ordered_split(num, lens)
+
+    def random_sample(self, batch_size, sample_less=False):
+        """Uniformly samples a batch of elements across all shards
+            Args:
+                batch_size: number of samples to collect
+                sample_less: whether to allow sampling less than requested amount
+
+            Raises:
+                ValueError: invalid amount of samples requested
+                    and sample_less is False
+
+            Returns:
+                stacked Element
+        """
+        return self._collect(self._random_splits(batch_size, sample_less), False, False)
+
+    def random_sample_and_pop(self, batch_size, sample_less=False):
+        """ Uniformly samples a batch of elements across all shards
+        and removes them
+                Args:
+                    batch_size: number of samples to collect
+                    sample_less: whether to allow sampling less than requested amount
+
+                Raises:
+                    ValueError: invalid amount of samples requested
+                        and sample_less is False
+
+                Returns:
+                    stacked Element
+        """
+        return self._collect(self._random_splits(batch_size, sample_less), False, True)
+
+    def sample(self, batch_size, sample_less=False):
+        """ Samples the oldest elements of each shard, split
+        between shards proportional to their lengths
+            Args:
+                batch_size: number of samples to collect
+                sample_less: whether to allow sampling less than requested amount
+
+            Raises:
+                ValueError: invalid amount of samples requested
+                    and sample_less is False
+
+            Returns:
+                stacked Element
+        """
+        return self._collect(self._ordered_splits(batch_size, sample_less), True, False)
+
+    def sample_and_pop(self, batch_size, sample_less=False):
+        """ Samples the oldest elements of each shard (see `sample`)
+        and removes them
+                Args:
+                    batch_size: number of samples to collect
+                    sample_less: whether to allow sampling less than requested amount
+
+                Raises:
+                    ValueError: invalid amount of samples requested
+                        and sample_less is False
+
+                Returns:
+                    stacked Element
+        """
+        return self._collect(self._ordered_splits(batch_size, sample_less), True, True)
+
+    def save_checkpoint_state(self, directory):
+        """ Saves each shard under its own sub directory
+
+                Args:
+                    directory: checkpoint directory
+        """
+        for index, (shard, lock) in enumerate(zip(self._shards, self._locks)):
+            with lock:
+                shard.save_checkpoint_state(os.path.join(directory, self.SHARD_DIR % index))
+
+    def restore_checkpoint_state(self, directory):
+        """ Restores each shard saved by `save_checkpoint_state`
+
+                Args:
+                    directory: checkpoint directory
+        """
+        for index, (shard, lock) in enumerate(zip(self._shards, self._locks)):
+            with lock:
+                shard.restore_checkpoint_state(os.path.join(directory, self.SHARD_DIR % index))
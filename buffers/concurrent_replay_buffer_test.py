@@ -0,0 +1,157 @@
+import tempfile
+import threading
+import unittest
+import numpy as np
+from advantage.buffers.concurrent_replay_buffer import ConcurrentReplayBuffer
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import DIMS, make_sarsa
+
+def push_from_thread(buffer, values):
+    thread = threading.Thread(target=lambda: [buffer.push(make_sarsa(value)) for value in values])
+    thread.start()
+    thread.join()
+
+class TestConcurrentReplayBuffer(unittest.TestCase):
+    """ Tests for the ConcurrentReplayBuffer """
+
+    def test_pushes_spread_over_shards(self):
+        buffer = ConcurrentReplayBuffer(8, Sarsa, DIMS, num_shards=2, seed=0)
+
+        push_from_thread(buffer, range(3))
+        self.assertEqual([list(shard.sample(shard.len).reward[:, 0]) for shard in buffer.shards],
+                         [[0, 2], [1]])
+
+        # a second thread starts on the second shard
+        push_from_thread(buffer, range(10, 12))
+        self.assertEqual([shard.len for shard in buffer.shards], [3, 2])
+        self.assertEqual(buffer.len, 5)
+        self.assertEqual(buffer.num_pushed, 5)
+
+    def test_single_thread_fills_buffer(self):
+        buffer = ConcurrentReplayBuffer(8, Sarsa, DIMS, num_shards=2, seed=0)
+
+        for value in range(20):
+            buffer.push(make_sarsa(value))
+
+        self.assertEqual(buffer.len, 8)
+
+    def test_extend_spreads_over_shards(self):
+        buffer = ConcurrentReplayBuffer(8, Sarsa, DIMS, num_shards=3, seed=0)
+
+        values = np.arange(5, dtype=np.float32)
+        buffer.extend({"state": np.stack([values, values], axis=1),
+                       "action": np.ones((5, 1), dtype=np.float32),
+                       "reward": values[:, None],
+                       "done": np.zeros((5, 1), dtype=np.bool_),
+                       "next_state": np.stack([values + 1, values + 1], axis=1),
+                       "next_action": np.zeros((5, 1), dtype=np.float32),
+                       "discount_exponent": np.ones((5, 1), dtype=np.float32)})
+
+        self.assertEqual([list(shard.sample(shard.len).reward[:, 0]) for shard in buffer.shards],
+                         [[0, 3], [1, 4], [2]])
+
+        # the round continues after the extend
+        buffer.push(make_sarsa(5))
+        self.assertEqual([shard.len for shard in buffer.shards], [2, 2, 2])
+
+    def test_random_sample_across_shards(self):
+        buffer = ConcurrentReplayBuffer(8, Sarsa, DIMS, num_shards=2, seed=0)
+
+        push_from_thread(buffer, range(4))
+        push_from_thread(buffer, range(10, 14))
+
+        batch = buffer.random_sample(8)
+        self.assertEqual(sorted(batch.reward[:, 0]), [0, 1, 2, 3, 10, 11, 12, 13])
+
+        popped = buffer.random_sample_and_pop(3)
+        self.assertEqual(popped.reward.shape, (3, 1))
+        self.assertEqual(buffer.len, 5)
+
+        rest = buffer.random_sample(5)
+        self.assertFalse(set(popped.reward[:, 0]) & set(rest.reward[:, 0]))
+
+        with self.assertRaises(ValueError):
+            buffer.random_sample(6)
+
+    def test_uniform(self):
+        # an uneven split must not bias sampling towards the smaller shard
+        buffer = ConcurrentReplayBuffer(20, Sarsa, DIMS, num_shards=2, seed=0)
+
+        for value in range(9):
+            buffer.shards[0].push(make_sarsa(value))
+        buffer.shards[1].push(make_sarsa(100))
+
+        counts = np.zeros(2)
+        for _ in range(2000):
+            reward = buffer.random_sample(1).reward[0, 0]
+            counts[int(reward == 100)] += 1
+
+        self.assertAlmostEqual(counts[1] / counts.sum(), 0.1, delta=0.03)
+
+    def test_sample_oldest(self):
+        buffer = ConcurrentReplayBuffer(8, Sarsa, DIMS, num_shards=2, seed=0)
+
+        push_from_thread(buffer, range(4))
+        push_from_thread(buffer, range(10, 12))
+
+        # shards hold [0, 2, 11] and [1, 3, 10]
+        batch = buffer.sample_and_pop(3)
+        self.assertEqual(sorted(batch.reward[:, 0]), [0, 1, 2])
+        self.assertEqual(buffer.len, 3)
+
+        self.assertEqual(buffer.sample(0).reward.shape, (0, 1))
+
+    def test_concurrent_push_and_sample(self):
+        buffer = ConcurrentReplayBuffer(64, Sarsa, DIMS, num_shards=4, seed=0)
+
+        push_from_thread(buffer, range(4))
+
+        errors = []
+        stop = threading.Event()
+
+        def act(offset):
+            for value in range(500):
+                buffer.push(make_sarsa(offset + value))
+
+        def learn():
+            try:
+                while not stop.is_set():
+                    batch = buffer.random_sample(4, sample_less=True)
+                    # elements aren't torn
+                    np.testing.assert_array_equal(batch.state[:, 0], batch.reward[:, 0])
+            except AssertionError as error:
+                errors.append(error)
+
+        learner = threading.Thread(target=learn)
+        learner.start()
+
+        actors = [threading.Thread(target=act, args=(1000 * index,)) for index in range(4)]
+        for actor in actors:
+            actor.start()
+        for actor in actors:
+            actor.join()
+
+        stop.set()
+        learner.join()
+
+        self.assertFalse(errors)
+        self.assertEqual(buffer.len, 64)
+        self.assertEqual(buffer.num_pushed, 2004)
+
+    def test_checkpoint(self):
+        buffer = ConcurrentReplayBuffer(8, Sarsa, DIMS, num_shards=2, seed=0)
+
+        push_from_thread(buffer, range(3))
+        push_from_thread(buffer, range(10, 12))
+
+        with tempfile.TemporaryDirectory() as directory:
+            buffer.save_checkpoint_state(directory)
+
+            restored = ConcurrentReplayBuffer(8, Sarsa, DIMS, num_shards=2, seed=0)
+            restored.restore_checkpoint_state(directory)
+
+        self.assertEqual([shard.len for shard in restored.shards], [3, 2])
+        self.assertEqual(sorted(restored.random_sample(5).reward[:, 0]), [0, 1, 2, 10, 11])
+
+if __name__ == "__main__":
+    unittest.main()
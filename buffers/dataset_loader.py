@@ -0,0 +1,220 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import os
+import numpy as np
+
+""" Streams logged transitions from sharded files into
+Replay Buffers, i.e. to (pre)train offline
+"""
+
+class DatasetLoader:
+    """ Reads a dataset of transitions sharded over `.npz`/`.npy` files
+    (in sorted path order) and bulk inserts it with `ReplayBuffer.extend`.
+
+    Each shard holds `num` transitions as either:
+        `.npz`: one array [num, ...] per Element attr (i.e. `np.savez`)
+        `.npy`: a structured array [num] with one field per attr
+
+    `.npy` shards are memory-mapped and read `chunk_size` rows at a time,
+    `.npz` shards are read whole. Reads run on `num_workers` threads, a few
+    chunks ahead of the inserts. Attrs missing from a shard (i.e.
+    next_action) get the Element's defaults (see `Element.default_attrs`,
+    a one-step discount_exponent for Sarsa), the others are cast to the
+    Element's dtypes.
+    """
+
+    EXTENSIONS = (".npz", ".npy")
+
+    def __init__(self, path, element_cls, dims, chunk_size=4096, num_workers=4, limit=None):
+        """
+            Args:
+                path: a shard, a directory of shards or a glob pattern
+                element_cls: the Element type of the transitions (i.e. Sarsa)
+                dims: column dimensions from `Environment.dims`
+                chunk_size: maximum transitions per insert
+                num_workers: number of reader threads
+                limit: maximum transitions to load, all if None
+
+            Raises:
+                ValueError: no shards found
+        """
+        self._shards = self._find_shards(path)
+
+        if not self._shards:
+            raise ValueError("No %s shards found at %s" % (" or ".join(self.EXTENSIONS), path))
+
+        # filled in for attrs missing from a shard
+        self._defaults = element_cls.default_attrs(**dims)
+
+        self._chunk_size = chunk_size
+        self._num_workers = num_workers
+        self._limit = limit
+
+    @classmethod
+    def from_config(cls, config, environment, element_cls):
+        """ Builds the DatasetLoader from the `Dataset` protobuf
+
+                Args:
+                    config: Dataset protobuf config
+                    environment: `Environment` the transitions were collected from
+                    element_cls: the Element type of the transitions
+
+                Returns:
+                    DatasetLoader
+        """
+        return cls(config.path,
+                   element_cls,
+                   environment.dims,
+                   config.chunk_size,
+                   config.num_workers,
+                   config.limit if config.HasField("limit") else None)
+
+    @property
+    def shards(self):
+        """ property for `_shards`
+        """
+        return self._shards
+
+    @classmethod
+    def _find_shards(cls, path):
+        """ Shard files at `path`
+
+                Returns:
+                    sorted list of paths
+        """
+        if os.path.isdir(path):
+            paths = [os.path.join(path, name) for name in os.listdir(path)]
+        else:
+            paths = glob.glob(path)
+
+        return sorted(path for path in paths if path.endswith(cls.EXTENSIONS))
+
+    def _reads(self):
+        """ Reads to schedule in order, `.npy` shards are split in chunks
+
+                Returns:
+                    generator of (path, start, stop), stop is None
+                    to read the whole shard
+        """
+        for path in self._shards:
+            if path.endswith(".npz"):
+                yield path, 0, None
+                continue
+
+            num = np.load(path, mmap_mode="r").shape[0]
+
+            for start in range(0, num, self._chunk_size):
+                yield path, start, min(start + self._chunk_size, num)
+
+    def _read(self, path, start, stop):
+        """ Reads (part of) a shard, run on the reader threads
+
+                Returns:
+                    list of chunks, dicts of attr name to np.ndarray
+        """
+        if stop is None:
+            with np.load(path) as shard:
+                attrs = {name: shard[name] for name in shard.files}
+        else:
+            rows = np.load(path, mmap_mode="r")[start:stop]
+
+            if rows.dtype.names is None:
+                raise ValueError("%s isn't a structured array with a field per attr" % path)
+
+            attrs = {name: np.array(rows[name]) for name in rows.dtype.names}
+
+        attrs = self._to_element_attrs(attrs, path)
+        num = next(iter(attrs.values())).shape[0]
+
+        return [{name: value[begin:begin + self._chunk_size] for name, value in attrs.items()}
+                for begin in range(0, num, self._chunk_size)]
+
+    def _to_element_attrs(self, attrs, path):
+        """ Converts a shard's arrays to the Element's attrs
+
+                Args:
+                    attrs: dict of attr name to np.ndarray [num, ...]
+                    path: shard path, for errors
+
+                Returns:
+                    dict of every attr to np.ndarray [num, ...]
+
+                Raises:
+                    ValueError: arrays don't match the Element
+        """
+        nums = {value.shape[0] for value in attrs.values()}
+
+        if len(nums) != 1:
+            raise ValueError("Arrays of %s have different lengths %s" % (path, sorted(nums)))
+
+        (num,) = nums
+
+        element_attrs = {}
+
+        for name, default in self._defaults.items():
+            shape, dtype = default.shape, default.dtype
+
+            if name not in attrs:
+                element_attrs[name] = np.repeat(default[None], num, axis=0)
+                continue
+
+            value = attrs[name]
+
+            # i.e. rewards saved as [num] for attrs of shape (1,)
+            if value.shape[1:] != shape:
+                if value[0:1].size != int(np.prod(shape)):
+                    raise ValueError("%s of %s has shape %s but the Element expects %s"
+                                     % (name, path, value.shape[1:], shape))
+                value = value.reshape((num,) + shape)
+
+            element_attrs[name] = value.astype(dtype, copy=False)
+
+        return element_attrs
+
+    def chunks(self):
+        """ Reads the dataset on the reader threads
+
+                Returns:
+                    generator of dicts of every attr to
+                    np.ndarray [num <= chunk_size, ...]
+        """
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self._num_workers) as pool:
+            try:
+                for read in self._reads():
+                    pending.append(pool.submit(self._read, *read))
+
+                    # bounds the chunks held in memory
+                    if len(pending) > 2 * self._num_workers:
+                        yield from pending.popleft().result()
+
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def load_into(self, buffer):
+        """ Bulk inserts the dataset (up to `limit` transitions)
+
+                Args:
+                    buffer: ReplayBuffer
+
+                Returns:
+                    number of transitions inserted
+        """
+        loaded = 0
+
+        for attrs in self.chunks():
+            if self._limit is not None:
+                attrs = {name: value[:self._limit - loaded] for name, value in attrs.items()}
+
+            buffer.extend(attrs)
+            loaded += next(iter(attrs.values())).shape[0]
+
+            if loaded == self._limit:
+                break
+
+        return loaded
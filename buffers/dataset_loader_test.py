@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from advantage.buffers.dataset_loader import DatasetLoader
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from advantage.buffers.experience_replay_buffer import ExperienceReplayBuffer
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import DIMS
+
+def make_attrs(values):
+    values = np.asarray(values, dtype=np.float64)
+    return {"state": np.stack([values, values], axis=1),
+            "action": np.ones((values.shape[0], 1)),
+            "reward": values,
+            "done": values % 5 == 4,
+            "next_state": np.stack([values + 1, values + 1], axis=1)}
+
+class TestDatasetLoader(unittest.TestCase):
+    """ Tests for the DatasetLoader """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        # shard_0.npz: 0..9, shard_1.npy: 10..24
+        np.savez(os.path.join(self.directory.name, "shard_0.npz"), **make_attrs(range(10)))
+
+        attrs = make_attrs(range(10, 25))
+        rows = np.zeros(15, dtype=[(name, value.dtype, value.shape[1:]) for name, value in attrs.items()])
+        for name, value in attrs.items():
+            rows[name] = value
+        np.save(os.path.join(self.directory.name, "shard_1.npy"), rows)
+
+    def test_load_into_columnar(self):
+        loader = DatasetLoader(self.directory.name, Sarsa, DIMS, chunk_size=4, num_workers=2)
+        ebuffer = ColumnarReplayBuffer(32, Sarsa, DIMS)
+
+        self.assertEqual(loader.load_into(ebuffer), 25)
+        self.assertEqual(ebuffer.len, 25)
+        self.assertEqual(ebuffer.num_pushed, 25)
+
+        batch = ebuffer.sample(25)
+        np.testing.assert_array_equal(batch.reward[:, 0], np.arange(25))
+        np.testing.assert_array_equal(batch.done[:, 0], np.arange(25) % 5 == 4)
+        self.assertEqual(batch.state.dtype, np.float32)
+        np.testing.assert_array_equal(batch.next_action, np.zeros((25, 1)))
+        # missing attrs get the Element's defaults, one-step transitions
+        np.testing.assert_array_equal(batch.discount_exponent, np.ones((25, 1)))
+
+    def test_chunks(self):
+        loader = DatasetLoader(self.directory.name, Sarsa, DIMS, chunk_size=4, num_workers=2)
+
+        sizes = [chunk["reward"].shape[0] for chunk in loader.chunks()]
+        self.assertEqual(sizes, [4, 4, 2, 4, 4, 4, 3])
+
+    def test_limit_and_ring(self):
+        loader = DatasetLoader(os.path.join(self.directory.name, "*.np?"),
+                               Sarsa,
+                               DIMS,
+                               chunk_size=4,
+                               limit=18)
+        ebuffer = ColumnarReplayBuffer(8, Sarsa, DIMS)
+
+        self.assertEqual(loader.load_into(ebuffer), 18)
+        np.testing.assert_array_equal(ebuffer.sample(8).reward[:, 0], np.arange(10, 18))
+
+    def test_load_into_experience_replay(self):
+        loader = DatasetLoader(os.path.join(self.directory.name, "shard_0.npz"), Sarsa, DIMS)
+        ebuffer = ExperienceReplayBuffer(16, element_cls=Sarsa)
+
+        loader.load_into(ebuffer)
+
+        batch = ebuffer.sample(10)
+        self.assertEqual(len(batch), 10)
+        self.assertEqual(batch[3].reward[0], 3)
+        self.assertEqual(ebuffer.num_pushed, 10)
+
+    def test_mismatched_shapes(self):
+        path = os.path.join(self.directory.name, "bad", "shard.npz")
+        os.makedirs(os.path.dirname(path))
+
+        attrs = make_attrs(range(3))
+        attrs["state"] = np.zeros((3, 5))
+        np.savez(path, **attrs)
+
+        with self.assertRaises(ValueError):
+            DatasetLoader(os.path.dirname(path), Sarsa, DIMS).load_into(ColumnarReplayBuffer(4, Sarsa, DIMS))
+
+        with self.assertRaises(ValueError):
+            DatasetLoader(os.path.join(self.directory.name, "missing"), Sarsa, DIMS)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+from abc import ABCMeta
+from abc import abstractmethod
+
+""" Policies choosing which slot a full Replay Buffer overwrites.
+Policies only work with slot indices, never with the stored elements.
+"""
+
+class EvictionPolicy(metaclass=ABCMeta):
+    """ Chooses the slot a new element replaces once a buffer is full
+    """
+
+    def bind(self, buffer):
+        """ Validates the policy can be used with `buffer`
+
+                Args:
+                    buffer: ReplayBuffer using the policy
+
+                Raises:
+                    ValueError: buffer doesn't support the policy
+        """
+        pass
+
+    @abstractmethod
+    def victim(self, buffer):
+        """ Chooses the slot to overwrite. O(1) or O(log N)
+
+                Args:
+                    buffer: full ReplayBuffer
+
+                Returns:
+                    slot index or None to drop the new element
+        """
+        raise NotImplementedError()
+
+
+class FIFOEviction(EvictionPolicy):
+    """ Overwrites the oldest element (ring order)
+    """
+
+    def victim(self, buffer):
+        return buffer.fifo_slot()
+
+
+class ReservoirEviction(EvictionPolicy):
+    """ Reservoir sampling (Vitter's algorithm R). The i-th pushed element
+    (0 based) replaces a uniformly chosen slot with probability capacity / (i + 1),
+    so the buffer stays a uniform sample of everything ever pushed.
+    """
+
+    def victim(self, buffer):
+        index = int(buffer.rng.integers(buffer.num_pushed + 1))
+        return index if index < buffer.buffer_size else None
+
+
+class LowestPriorityEviction(EvictionPolicy):
+    """ Overwrites the element with the lowest priority
+    (prioritized buffers only)
+    """
+
+    def bind(self, buffer):
+        if not hasattr(buffer, "lowest_priority_slot"):
+            raise ValueError("%s has no priorities to evict by" % buffer.__class__.__name__)
+
+    def victim(self, buffer):
+        return buffer.lowest_priority_slot()
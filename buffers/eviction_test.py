@@ -0,0 +1,118 @@
+import unittest
+import numpy as np
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from advantage.buffers.experience_replay_buffer import ExperienceReplayBuffer
+from advantage.buffers.prioritized_experience_replay_buffer import PrioritizedExperienceReplayBuffer
+from advantage.buffers.eviction import FIFOEviction, ReservoirEviction, LowestPriorityEviction
+from advantage.buffers.sum_tree import MinTree
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import DIMS, make_sarsa, stack_sarsas
+
+class TestEviction(unittest.TestCase):
+    """ Tests for the eviction policies """
+
+    def test_fifo_default(self):
+        ebuffer = ColumnarReplayBuffer(4, Sarsa, DIMS)
+        self.assertIsInstance(ebuffer.eviction, FIFOEviction)
+
+        for i in range(6):
+            ebuffer.push(make_sarsa(float(i)))
+
+        self.assertEqual(ebuffer.num_pushed, 6)
+        self.assertEqual(sorted(ebuffer.sample(4).reward.ravel().tolist()), [2., 3., 4., 5.])
+
+    def test_reservoir_uniform(self):
+        capacity = 10
+        num_pushed = 100
+        counts = np.zeros(num_pushed)
+
+        for seed in range(300):
+            ebuffer = ColumnarReplayBuffer(capacity, Sarsa, DIMS, seed=seed, eviction=ReservoirEviction())
+            for i in range(num_pushed):
+                ebuffer.push(make_sarsa(float(i)))
+
+            self.assertEqual(ebuffer.len, capacity)
+            counts[ebuffer.sample(capacity).reward.ravel().astype(np.int64)] += 1
+
+        # every element is kept with probability capacity / num_pushed
+        expected = 300 * capacity / num_pushed
+        self.assertLess(abs(counts[:50].mean() - expected), 0.2 * expected)
+        self.assertLess(abs(counts[50:].mean() - expected), 0.2 * expected)
+
+    def test_reservoir_experience_replay_buffer(self):
+        ebuffer = ExperienceReplayBuffer(4, seed=0, eviction=ReservoirEviction())
+
+        for i in range(50):
+            ebuffer.push(make_sarsa(float(i)))
+
+        self.assertEqual(ebuffer.len, 4)
+        self.assertEqual(len(set(float(s.reward[0]) for s in ebuffer.sample(4))), 4)
+
+    def test_lowest_priority(self):
+        ebuffer = PrioritizedExperienceReplayBuffer(4, Sarsa, DIMS, 1.0, 0.4, 0.001, 0.,
+                                                    eviction=LowestPriorityEviction())
+        for i in range(4):
+            ebuffer.push(make_sarsa(float(i)))
+
+        ebuffer.update_priorities(np.arange(4), np.array([3., 1., 4., 2.]))
+
+        self.assertEqual(ebuffer.lowest_priority_slot(), 1)
+
+        ebuffer.push(make_sarsa(10.))
+        np.testing.assert_array_equal(ebuffer.columns["reward"].ravel(), np.array([0., 10., 2., 3.]))
+
+        # the new element has the max priority, 2 is the lowest now
+        ebuffer.push(make_sarsa(11.))
+        np.testing.assert_array_equal(ebuffer.columns["reward"].ravel(), np.array([0., 10., 2., 11.]))
+
+    def test_lowest_priority_extend(self):
+        ebuffer = PrioritizedExperienceReplayBuffer(4, Sarsa, DIMS, 1.0, 0.4, 0.001, 0.,
+                                                    eviction=LowestPriorityEviction())
+        for i in range(4):
+            ebuffer.push(make_sarsa(float(i)))
+
+        ebuffer.update_priorities(np.arange(4), np.array([3., 1., 4., 2.]))
+
+        ebuffer.extend(stack_sarsas([10., 11., 12.]))
+
+        # each new element evicts the next lowest priority, not the same slot
+        self.assertEqual(ebuffer.num_pushed, 7)
+        np.testing.assert_array_equal(ebuffer.columns["reward"].ravel(), np.array([12., 10., 2., 11.]))
+
+    def test_extend_full_matches_pushes(self):
+        make_evictions = {"fifo": FIFOEviction,
+                          "reservoir": ReservoirEviction,
+                          "lowest_priority": LowestPriorityEviction}
+
+        for name, make_eviction in make_evictions.items():
+            with self.subTest(eviction=name):
+                pushed, extended = [PrioritizedExperienceReplayBuffer(4, Sarsa, DIMS, 1.0, 0.4, 0.001, 0.,
+                                                                      seed=0, eviction=make_eviction())
+                                    for _ in range(2)]
+
+                for ebuffer in (pushed, extended):
+                    for i in range(4):
+                        ebuffer.push(make_sarsa(float(i)))
+                    ebuffer.update_priorities(np.arange(4), np.array([3., 1., 4., 2.]))
+
+                for i in range(10, 16):
+                    pushed.push(make_sarsa(float(i)))
+                extended.extend(stack_sarsas(range(10, 16)))
+
+                self.assertEqual(extended.num_pushed, pushed.num_pushed)
+                self.assertEqual(extended.len, 4)
+                np.testing.assert_array_equal(extended.columns["reward"], pushed.columns["reward"])
+                np.testing.assert_array_equal(extended.sum_tree.get(np.arange(4)),
+                                              pushed.sum_tree.get(np.arange(4)))
+
+    def test_lowest_priority_needs_priorities(self):
+        with self.assertRaises(ValueError):
+            ColumnarReplayBuffer(4, Sarsa, DIMS, eviction=LowestPriorityEviction())
+
+    def test_min_tree_argmin(self):
+        tree = MinTree(5)
+        tree.update(np.arange(5), np.array([5., 3., 7., 1., 9.]))
+        self.assertEqual(tree.argmin(), 3)
+
+
+unittest.main()
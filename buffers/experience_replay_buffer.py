@@ -1,21 +1,36 @@
-import collections
-import random
+import sys
+import numpy as np
+from advantage.buffers.base.base_buffers import ReplayBuffer
+from advantage.buffers.codecs import CompressedArray
 
-# TODO maybe make an Interface for buffers?
-class ExperienceReplayBuffer(object):
+class ExperienceReplayBuffer(ReplayBuffer):
     """Allows for collecting various SARSA(usually but not required) tuples taken by an agent.
     This buffer is commonly used in many approximate RL algorithms to
     allow for I.I.D data to training non-linear approximators (i.e. NN)
+
+    Elements are kept in a fixed size list used as a ring. Index 0 is the
+    oldest element (at slot `_start`). All sampling costs O(batch_size).
+
+    With a `codec` the observation attrs of each element are compressed on
+    push and decompressed (in the codec's thread pool) when sampled.
     """
 
-    def __init__(self, buffer_size):
+    def __init__(self, buffer_size, codec=None, element_cls=None, seed=None, eviction=None):
         """
             Args:
-                buffer_size: size of deque
-                buffer_type: type of elements to be pushed to buffer
+                buffer_size: size of ring
+                codec: optional ObservationCodec compressing observations
+                element_cls: Element type rebuilt when restoring from a
+                    checkpoint or extending
+                seed: seed for the sampling np.random.Generator
+                eviction: EvictionPolicy once full, FIFO if None
         """
 
-        self._buffer_size =  buffer_size
+        super().__init__(buffer_size, seed, eviction)
+
+        self._codec = codec
+
+        self._element_cls = element_cls
 
         #self._buffer_type = buffer_type -> keeping type safe seems unecessary
         """
@@ -25,21 +40,130 @@ class ExperienceReplayBuffer(object):
 
         self._template_item = None
         """
-        self._cur_buffer_size = 0
+        self._buffer = [None] * buffer_size
+
+        # insertion sequence number of each slot
+        self._seqs = np.zeros(buffer_size, dtype=np.int64)
+
+        self._start = 0
+
+    @property
+    def codec(self):
+        """ property for `_codec`
+        """
+        return self._codec
 
-        self._buffer = collections.deque([], maxlen=buffer_size)
+    def close(self):
+        """ Stops the codec's decoding threads (if any). Called by
+        the model when training shuts down.
+        """
+        if self._codec:
+            self._codec.shutdown()
 
+    @property
+    def compression_ratio(self):
+        """ raw over compressed observation bytes (1.0 without a codec)
+        """
+        return self._codec.compression_ratio if self._codec else 1.0
 
     @property
-    def buffer_size(self):
-        return self._buffer_size
+    def nbytes(self):
+        """ bytes of the held elements' arrays, estimated
+        from the newest element (exact without a codec if all
+        elements have the same shapes)
+        """
+        if not self._cur_buffer_size:
+            return 0
+
+        newest = self._buffer[self._slot(self._cur_buffer_size - 1)]
+
+        if self._codec:
+            _, attrs, compressed = newest
+            entry_bytes = (sum(np.asarray(value).nbytes for value in attrs.values())
+                           + sum(array.nbytes for array in compressed.values()))
+        else:
+            entry_bytes = sum(np.asarray(value).nbytes for value in newest.unzip_to_dict().values())
+
+        return self._cur_buffer_size * entry_bytes
 
     @property
-    def len(self):
-        return self._cur_buffer_size
+    def transition_bytes(self):
+        """ array bytes per held element (0.0 when empty)
+        """
+        return self.nbytes / self._cur_buffer_size if self._cur_buffer_size else 0.0
+
+    @classmethod
+    def estimate_transition_bytes(cls, element_cls, dims, codec=None, **options):
+        """ Includes the Python objects holding each element. Codec
+        fields are assumed to compress by the codec's `expected_ratio`.
+        """
+        element = element_cls.make_element_zero(**dims)
+        attrs = element.unzip_to_dict()
+
+        # element (or encoded entry) object, list slot and sequence number
+        total = (sys.getsizeof(element) + sys.getsizeof(getattr(element, "__dict__", {}))
+                 + 2 * np.dtype(np.int64).itemsize)
+
+        fields = codec.fields if codec else ()
+
+        for name, value in attrs.items():
+            if name in fields:
+                total += (sys.getsizeof(CompressedArray(b"", value.shape, value.dtype))
+                          + sys.getsizeof(b"") + value.nbytes / codec.expected_ratio)
+            else:
+                # array header and its data
+                total += sys.getsizeof(value)
+
+        return int(np.ceil(total))
+
+    def _encode(self, item):
+        """ Compresses the codec fields of an element
+
+                Args:
+                    item: element to push
+
+                Returns:
+                    tuple of (element type, dict of uncompressed attrs,
+                        dict of CompressedArray attrs)
+        """
+        attrs = item.unzip_to_dict()
+        compressed = {field: self._codec.encode(attrs.pop(field)) for field in self._codec.fields}
+        return (type(item), attrs, compressed)
+
+    def _decode(self, entries):
+        """ Rebuilds elements from encoded entries, decompressing
+        all of their fields at once
+
+                Args:
+                    entries: list of entries returned by `_encode`
+
+                Returns:
+                    list of elements
+        """
+        if not self._codec:
+            return entries
+
+        fields = self._codec.fields
+        arrays = iter(self._codec.decode_many([compressed[field]
+                                               for _, _, compressed in entries
+                                               for field in fields]))
+        batch = []
+        for element_cls, attrs, _ in entries:
+            attrs = dict(attrs)
+            for field in fields:
+                attrs[field] = next(arrays)
+            batch.append(element_cls.make_element_from_dict(attrs))
+
+        return batch
+
+    def _slot(self, index):
+        """ Converts an index (0 is oldest) into a slot of the ring
+        """
+        return (self._start + index) % self._buffer_size
 
     def push(self, item):
-        """Appends and element to the buffer
+        """Appends and element to the buffer. When full the eviction
+        policy chooses the element overwritten (the oldest by default)
             Args:
                 item: item to add of type 'buffer_type'
         """
@@ -56,9 +180,55 @@ class ExperienceReplayBuffer(object):
         if not self._are_compatible(self._template_item, item):
             raise ValueError("item is not compatible other items in buffer")
         """
-        self._cur_buffer_size = self._cur_buffer_size + 1 if self._cur_buffer_size < self._buffer_size else self._cur_buffer_size
+        if self._codec:
+            item = self._encode(item)
+
+        if self._cur_buffer_size < self._buffer_size:
+            slot = self._slot(self._cur_buffer_size)
+            self._cur_buffer_size += 1
+        else:
+            slot = self._eviction.victim(self)
+
+        seq = self._take_seq()
+
+        if slot is None:
+            return
+
+        self._buffer[slot] = item
+        self._seqs[slot] = seq
+
+    def fifo_slot(self):
+        slot = self._start
+        self._start = (self._start + 1) % self._buffer_size
+        return slot
+
+    def _rows_since(self, seq):
+        slots = self._slot(np.arange(self._cur_buffer_size))
+        slots = slots[self._seqs[slots] >= seq]
+
+        elements = self._decode([self._buffer[slot] for slot in slots])
+        names = elements[0].unzip_to_dict().keys() if elements else ()
+
+        return ({name: np.stack([getattr(element, name) for element in elements])
+                 for name in names},
+                self._seqs[slots])
+
+    def _live_seqs(self):
+        return self._seqs[self._slot(np.arange(self._cur_buffer_size))]
 
-        self._buffer.append(item)
+    def _load_rows(self, attrs, seqs):
+        if self._element_cls is None:
+            raise ValueError("ExperienceReplayBuffer needs `element_cls` to restore or extend elements")
+
+        for index, seq in enumerate(seqs):
+            self._next_seq = seq
+            self.push(self._element_cls.make_element_from_dict_trusted({name: value[index]
+                                                                        for name, value in attrs.items()}))
+
+    def _random_indices(self, num):
+        """ Draws `num` distinct indices uniformly in O(num)
+        """
+        return self._rng.choice(self._cur_buffer_size, size=num, replace=False)
 
     def random_sample(self, batch_size, sample_less=False):
         """Randomly samples a batch of Sarsa tuples
@@ -73,11 +243,16 @@ class ExperienceReplayBuffer(object):
             Returns:
                 list of a Sarsa tuples
         """
-        random.shuffle(self._buffer)
-        return self.sample(batch_size, sample_less=sample_less)
+        num = self._check_batch_size(batch_size, sample_less)
+
+        slots = self._slot(self._random_indices(num))
+        self._record_sample_age(slots)
+
+        return self._decode([self._buffer[slot] for slot in slots])
 
     def random_sample_and_pop(self, batch_size, sample_less=False):
-        """ Sample a random batch of Sarsa tuple and remove them
+        """ Sample a random batch of Sarsa tuple and remove them. Each
+        removed element is replaced by the newest element (swap-remove).
                 Args:
                     batch_size: number of samples to collect
                     sample_less: whether to allow sampling less than requested amount
@@ -89,8 +264,26 @@ class ExperienceReplayBuffer(object):
                 Returns:
                     list of Sarsa tuples
         """
-        random.shuffle(self._buffer)
-        return self.sample_and_pop(batch_size, sample_less=sample_less)
+        num = self._check_batch_size(batch_size, sample_less)
+
+        indices = self._random_indices(num)
+        self._record_sample_age(self._slot(indices))
+
+        batch = []
+        # descending, so a newer sampled element is removed before
+        # it could be swapped into an older sampled index
+        for index in sorted(indices, reverse=True):
+            slot = self._slot(index)
+            last_slot = self._slot(self._cur_buffer_size - 1)
+
+            batch.append(self._buffer[slot])
+
+            self._buffer[slot] = self._buffer[last_slot]
+            self._buffer[last_slot] = None
+            self._seqs[slot] = self._seqs[last_slot]
+            self._cur_buffer_size -= 1
+
+        return self._decode(batch)
 
     def sample(self, batch_size, sample_less=False):
         """Sample a determinstic batch of Sarsa tuples
@@ -105,16 +298,12 @@ class ExperienceReplayBuffer(object):
             Returns:
                 list of Sarsa tuples
         """
+        num = self._check_batch_size(batch_size, sample_less)
 
-        if not sample_less and batch_size > self._cur_buffer_size:
-            raise ValueError("Specify sample_less=True to retrieve less than specified amount")
-
-        if not sample_less:
-            batch = list(self._buffer)[:batch_size]
-        else:
-            batch = list(self._buffer)
+        slots = self._slot(np.arange(num))
+        self._record_sample_age(slots)
 
-        return batch
+        return self._decode([self._buffer[slot] for slot in slots])
 
     def sample_and_pop(self, batch_size, sample_less=False):
         """ Sample a determinstic batch of Sarsa tuple and remove them
@@ -129,17 +318,17 @@ class ExperienceReplayBuffer(object):
                 Returns:
                     list of Sarsa tuples
         """
-        if not sample_less and batch_size > self._cur_buffer_size:
-            raise ValueError("Specify sample_less=True to retrieve less than specified amount")
+        num = self._check_batch_size(batch_size, sample_less)
+
+        self._record_sample_age(self._slot(np.arange(num)))
 
         batch = []
-        if not sample_less:
-            for _ in range(batch_size):
-                batch.append(self._buffer.popleft())
-        else:
-            for _ in range(self._cur_buffer_size):
-                batch.append(self._buffer.popleft())
+        for index in range(num):
+            slot = self._slot(index)
+            batch.append(self._buffer[slot])
+            self._buffer[slot] = None
 
-        self._cur_buffer_size -= batch_size if batch_size <= self._cur_buffer_size else self._cur_buffer_size
+        self._start = self._slot(num)
+        self._cur_buffer_size -= num
 
-        return batch
+        return self._decode(batch)
@@ -1,7 +1,9 @@
 import unittest
 import numpy as np
 from advantage.buffers.experience_replay_buffer import ExperienceReplayBuffer
+from advantage.buffers.codecs import ObservationCodec
 from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import make_sarsa, stack_sarsas
 
 def pad(er_buffer, amt, **kwargs):
     for _ in range(amt):
@@ -277,6 +279,102 @@ class TestExperienceReplayBuffer(unittest.TestCase):
         for b in batch:
             np.testing.assert_array_equal(b.state, np.array([0.0]))
 
+    def test_random_sample_seeded(self):
+        ebuffer_one = ExperienceReplayBuffer(16, seed=3)
+        ebuffer_two = ExperienceReplayBuffer(16, seed=3)
+        pad(ebuffer_one, 16, state_col_dim=1,
+                            action_col_dim=1,
+                            reward_col_dim=1,
+                            next_state_col_dim=1)
+        for item in ebuffer_one.sample(16):
+            ebuffer_two.push(item)
+
+        for act, exp in zip(ebuffer_one.random_sample(8), ebuffer_two.random_sample(8)):
+            self.assertIs(act, exp)
+
+        self.assertEqual(ebuffer_one.len, 16)
+
+    def test_random_sample_and_pop_swap_remove(self):
+        ebuffer = ExperienceReplayBuffer(8, seed=0)
+        sarsas = [self.sarsa_one, self.sarsa_two, self.sarsa_three] * 2
+        for sarsa in sarsas:
+            ebuffer.push(sarsa)
+
+        batch = ebuffer.random_sample_and_pop(4)
+
+        self.assertEqual(len(batch), 4)
+        self.assertEqual(ebuffer.len, 2)
+
+        rest = ebuffer.sample(2)
+
+        popped = sorted(float(b.state[0]) for b in batch + rest)
+        self.assertEqual(popped, sorted(float(s.state[0]) for s in sarsas))
+
+        ebuffer.push(self.sarsa_one)
+        self.assertEqual(ebuffer.len, 3)
+        self.assertEqual(len(ebuffer.random_sample(3)), 3)
+
+    def test_compressed_observations(self):
+        for codec in ("ZLIB", "LZMA"):
+            ebuffer = ExperienceReplayBuffer(8, codec=ObservationCodec(codec, 1, num_threads=2), seed=0)
+
+            image = np.zeros((16, 16), dtype=np.float32)
+            for i in range(4):
+                ebuffer.push(Sarsa.make_element(state=image + i,
+                                                action=np.array([2.], dtype=np.float32),
+                                                reward=np.array([i], dtype=np.float32),
+                                                done=np.array([False], dtype=np.bool_),
+                                                next_state=image + i + 1))
+
+            self.assertGreater(ebuffer.compression_ratio, 1.)
+
+            batch = ebuffer.random_sample_and_pop(3)
+            self.assertEqual(ebuffer.len, 1)
+
+            for sarsa in batch + ebuffer.sample(1):
+                self.assertIsInstance(sarsa, Sarsa)
+                np.testing.assert_array_equal(sarsa.state, image + sarsa.reward[0])
+                np.testing.assert_array_equal(sarsa.next_state, sarsa.state + 1)
+
+            ebuffer.close()
+            self.assertIsNone(ebuffer.codec._pool)
+
+    def test_transition_bytes(self):
+        dims = {"state_col_dim": (16, 16),
+                "action_col_dim": 1,
+                "reward_col_dim": 1,
+                "next_state_col_dim": (16, 16)}
+
+        raw = ExperienceReplayBuffer.estimate_transition_bytes(Sarsa, dims)
+        self.assertGreater(raw, 2 * 16 * 16 * 4)
+
+        codec = ObservationCodec("ZLIB", 1, num_threads=1, expected_ratio=4.)
+        compressed = ExperienceReplayBuffer.estimate_transition_bytes(Sarsa, dims, codec=codec)
+        self.assertLess(compressed, raw - 16 * 16 * 4)
+
+        ebuffer = ExperienceReplayBuffer(4)
+        ebuffer.push(Sarsa.make_element_zero(**dims))
+        self.assertEqual(ebuffer.transition_bytes,
+                         sum(value.nbytes for value in Sarsa.make_element_zero(**dims).unzip_to_dict().values()))
+
+    def test_no_codec_compression_ratio(self):
+        ebuffer = ExperienceReplayBuffer(self.BUFFER_SIZE)
+        ebuffer.push(self.sarsa_one)
+        self.assertEqual(ebuffer.compression_ratio, 1.)
+        self.assertIs(ebuffer.sample(1)[0], self.sarsa_one)
+
+    def test_extend(self):
+        ebuffer = ExperienceReplayBuffer(4, element_cls=Sarsa)
+        ebuffer.push(make_sarsa(0.))
+        ebuffer.extend(stack_sarsas(range(1, 6)))
+
+        batch = ebuffer.sample(4)
+        self.assertIsInstance(batch[0], Sarsa)
+        self.assertEqual([element.reward[0] for element in batch], [2., 3., 4., 5.])
+        self.assertEqual(ebuffer.num_pushed, 6)
+
+        with self.assertRaises(ValueError):
+            ExperienceReplayBuffer(4).extend(stack_sarsas(range(2)))
 
 
 unittest.main()
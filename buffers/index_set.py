@@ -0,0 +1,92 @@
+import numpy as np
+
+""" Array-backed set of slot indices used by buffers whose
+live elements aren't kept dense.
+"""
+
+class IndexSet:
+    """ Set of integers in [0, capacity). Members are kept dense in
+    `_members` with their position in `_positions`, giving O(1)
+    add/remove and O(batch) uniform sampling.
+    """
+
+    def __init__(self, capacity):
+        """
+            Args:
+                capacity: exclusive upper bound of members
+        """
+        self._members = np.zeros(capacity, dtype=np.int64)
+        self._positions = np.full(capacity, -1, dtype=np.int64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, index):
+        return self._positions[index] >= 0
+
+    @property
+    def nbytes(self):
+        """ bytes of the member and position arrays
+        """
+        return self._members.nbytes + self._positions.nbytes
+
+    @property
+    def members(self):
+        """ View of all members (in no particular order)
+        """
+        return self._members[:self._size]
+
+    def contains(self, indices):
+        """ Vectorized membership
+
+                Args:
+                    indices: np.ndarray of indices
+
+                Returns:
+                    np.ndarray of bools
+        """
+        return self._positions[indices] >= 0
+
+    def add(self, index):
+        """ Adds `index` if not a member
+        """
+        if self._positions[index] >= 0:
+            return
+
+        self._members[self._size] = index
+        self._positions[index] = self._size
+        self._size += 1
+
+    def remove(self, index):
+        """ Removes `index` if a member by moving
+        the last member into its position
+        """
+        position = self._positions[index]
+        if position < 0:
+            return
+
+        last = self._members[self._size - 1]
+        self._members[position] = last
+        self._positions[last] = position
+        self._positions[index] = -1
+        self._size -= 1
+
+    def remove_many(self, indices):
+        """ Removes all `indices` that are members
+        """
+        for index in indices:
+            self.remove(index)
+
+    def sample(self, rng, num, replace=False):
+        """ Uniformly samples members
+
+                Args:
+                    rng: np.random.Generator
+                    num: number of members to sample
+                    replace: whether to sample with replacement
+
+                Returns:
+                    np.ndarray of members
+        """
+        return self._members[rng.choice(self._size, size=num, replace=replace)]
@@ -0,0 +1,157 @@
+import json
+import os
+import numpy as np
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+
+""" Columnar Replay Buffer whose columns live on disk
+"""
+
+class MemmapReplayBuffer(ColumnarReplayBuffer):
+    """ Columnar buffer where each Element attr is stored in a `.npy`
+    file opened with `numpy.memmap`. Only the index (number of elements,
+    ring cursor and number pushed) is kept in RAM, so capacity is bounded
+    by disk instead of host memory. The page cache keeps hot rows in memory.
+    The insertion sequence numbers of the slots are a column file too, so
+    eviction and sample ages stay correct after reopening.
+
+    Columns are created (or reopened) by `open`, which the checkpoint
+    system calls with the checkpoint directory. The index is written
+    on `flush` so a restarted run continues from the last flush.
+    """
+
+    INDEX_FILE = "index.json"
+
+    # column file of `_seqs`, can't clash with attr names
+    SEQS_COLUMN = "_seqs"
+
+    def __init__(self, buffer_size, element_cls, dims, sub_dir, seed=None, eviction=None, storage=None):
+        """
+            Args:
+                buffer_size: number of elements to allocate on disk
+                element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                dims: column dimensions from `Environment.dims`
+                sub_dir: directory, relative to the one passed to `open`,
+                    holding the column files
+                seed: seed for the sampling np.random.Generator
+                eviction: EvictionPolicy once full, FIFO if None
+                storage: per attr storage (see ColumnarReplayBuffer)
+        """
+        self._sub_dir = sub_dir
+        self._directory = None
+
+        super().__init__(buffer_size, element_cls, dims, seed, eviction, storage)
+
+    @property
+    def directory(self):
+        """ property for `_directory`
+        """
+        return self._directory
+
+    def _allocate_columns(self):
+        # deferred until `open`
+        return {}
+
+    def _column_path(self, name):
+        """ File path for the column of attr `name`
+        """
+        return os.path.join(self._directory, name + ".npy")
+
+    def _open_column(self, name, shape, dtype):
+        """ Reopens an existing column file or creates it
+
+                Args:
+                    name: attr name
+                    shape: full column shape (buffer_size first)
+                    dtype: np dtype the attr is stored as
+
+                Returns:
+                    np.memmap
+
+                Raises:
+                    ValueError: existing file doesn't match the configuration
+        """
+        path = self._column_path(name)
+
+        if not os.path.exists(path):
+            return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+        column = np.lib.format.open_memmap(path, mode="r+")
+
+        if column.shape != shape or column.dtype != dtype:
+            raise ValueError("Column file %s has shape %s and dtype %s but the buffer"
+                             " expects shape %s and dtype %s" % (path,
+                                                                 column.shape,
+                                                                 column.dtype,
+                                                                 shape,
+                                                                 dtype))
+        return column
+
+    def open(self, directory):
+        """ Opens column files under `directory`, reopening an existing
+        file set (and its index) if a previous run left one.
+
+                Args:
+                    directory: usually the checkpoint directory
+        """
+        self._directory = os.path.join(directory, self._sub_dir)
+
+        os.makedirs(self._directory, exist_ok=True)
+
+        self._columns = self._wrap_columns({name: self._open_column(name, shape, dtype)
+                                            for name, (shape, dtype) in self._column_specs.items()})
+
+        self._seqs = self._open_column(self.SEQS_COLUMN, self._seqs.shape, self._seqs.dtype)
+
+        index_path = os.path.join(self._directory, self.INDEX_FILE)
+
+        if os.path.exists(index_path):
+            with open(index_path, "r") as index_file:
+                index = json.load(index_file)
+            self._cur_buffer_size = min(index["len"], self._buffer_size)
+            self._cursor = index["cursor"] if self._cur_buffer_size else 0
+            # indices written before `next_seq` was kept
+            self._next_seq = index.get("next_seq", self._cur_buffer_size)
+
+    def flush(self):
+        """ Flushes columns to disk and then atomically writes the index
+        """
+        if not self._directory:
+            return
+
+        for column in self._columns.values():
+            column.flush()
+
+        self._seqs.flush()
+
+        index_path = os.path.join(self._directory, self.INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+
+        with open(tmp_path, "w") as index_file:
+            json.dump({"len": self._cur_buffer_size,
+                       "cursor": self._cursor,
+                       "next_seq": self._next_seq}, index_file)
+
+        os.replace(tmp_path, index_path)
+
+    def save_checkpoint_state(self, directory):
+        """ Columns already live on disk, so only flushes
+        """
+        self.flush()
+
+    def restore_checkpoint_state(self, directory):
+        """ Opens the column files under the checkpoint directory
+        """
+        self.open(directory)
+
+    def push(self, item):
+        """ Writes an element into the ring on disk
+                Args:
+                    item: Element of type `element_cls`
+
+                Raises:
+                    ValueError: `open` wasn't called
+        """
+        if not self._directory:
+            raise ValueError("MemmapReplayBuffer must be opened with `open` before use")
+
+        super().push(item)
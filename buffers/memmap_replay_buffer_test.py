@@ -0,0 +1,73 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from advantage.buffers.memmap_replay_buffer import MemmapReplayBuffer
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import make_dims, make_sarsa
+
+DIMS = make_dims((2, 2))
+
+class TestMemmapReplayBuffer(unittest.TestCase):
+    """ Tests for the various functionalities of the MemmapReplayBuffer """
+
+    def setUp(self):
+        self.BUFFER_SIZE = 4
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def make_buffer(self):
+        ebuffer = MemmapReplayBuffer(self.BUFFER_SIZE, Sarsa, DIMS, "replay")
+        ebuffer.open(self.tmp_dir)
+        return ebuffer
+
+    def test_push_requires_open(self):
+        ebuffer = MemmapReplayBuffer(self.BUFFER_SIZE, Sarsa, DIMS, "replay")
+        with self.assertRaises(ValueError):
+            ebuffer.push(make_sarsa(0., dims=DIMS))
+
+    def test_columns_on_disk(self):
+        ebuffer = self.make_buffer()
+
+        for i in range(3):
+            ebuffer.push(make_sarsa(float(i), dims=DIMS))
+
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, "replay", "state.npy")))
+        self.assertEqual(ebuffer.columns["state"].shape, (self.BUFFER_SIZE, 2, 2))
+
+        batch = ebuffer.random_sample(3)
+        self.assertEqual(batch.state.shape, (3, 2, 2))
+        np.testing.assert_array_equal(batch.next_state, batch.state + 1)
+
+    def test_reopen(self):
+        ebuffer = self.make_buffer()
+
+        for i in range(self.BUFFER_SIZE + 1):
+            ebuffer.push(make_sarsa(float(i), dims=DIMS))
+
+        ebuffer.flush()
+        del ebuffer
+
+        reopened = self.make_buffer()
+
+        self.assertEqual(reopened.len, self.BUFFER_SIZE)
+
+        batch = reopened.sample(self.BUFFER_SIZE)
+        np.testing.assert_array_equal(batch.reward.ravel(), np.array([1., 2., 3., 4.]))
+
+        # sequence numbers survive, i.e. for reservoir eviction and sample ages
+        self.assertEqual(reopened.num_pushed, self.BUFFER_SIZE + 1)
+        np.testing.assert_array_equal(np.sort(reopened._seqs), np.arange(1, self.BUFFER_SIZE + 1))
+
+    def test_reopen_mismatch(self):
+        self.make_buffer()
+
+        other = MemmapReplayBuffer(self.BUFFER_SIZE + 1, Sarsa, DIMS, "replay")
+        with self.assertRaises(ValueError):
+            other.open(self.tmp_dir)
+
+
+unittest.main()
@@ -0,0 +1,117 @@
+from collections import deque
+import numpy as np
+
+""" Aggregates one-step Sarsas into n-step transitions
+before they are pushed to a Replay Buffer
+"""
+
+class NStepAccumulator:
+    """ Keeps a rolling window of the last `n` one-step Sarsas of each
+    trajectory. Once a window is full its oldest Sarsa is emitted as the
+    n-step transition
+
+        (s_t, a_t, sum_i gamma^i r_{t+i}, done, s_{t+n}, k=n)
+
+    When a trajectory ends (`done`) every Sarsa left in its window is
+    emitted with the rewards up to the end and k the number of rewards.
+    """
+
+    def __init__(self, n_step, gamma):
+        """
+            Args:
+                n_step: maximum number of rewards per transition
+                gamma: one-step discount factor
+
+            Raises:
+                ValueError: n_step less than 1
+        """
+        if n_step < 1:
+            raise ValueError("n_step must be at least 1")
+
+        self._n_step = n_step
+        self._gamma = gamma
+
+        self._windows = {}
+
+    @property
+    def n_step(self):
+        """ property for `_n_step`
+        """
+        return self._n_step
+
+    def _emit(self, window, num):
+        """ Builds the transitions starting at the first `num` Sarsas
+        in `window`, each bootstrapping from the last Sarsa's next_state
+
+                Args:
+                    window: deque of one-step Sarsas
+                    num: number of transitions
+
+                Returns:
+                    list of Sarsa
+        """
+        length = len(window)
+
+        rewards = np.stack([sarsa.reward for sarsa in window])
+
+        # discounts[i, j] = gamma^(j - i) for j >= i
+        exponents = np.arange(length)[None, :] - np.arange(num)[:, None]
+        discounts = np.where(exponents >= 0, self._gamma ** np.maximum(exponents, 0), 0.)
+
+        returns = np.tensordot(discounts, rewards, axes=1).astype(np.float32)
+
+        last = window[-1]
+
+        transitions = []
+        for index in range(num):
+            first = window[index]
+            # attrs come from validated Sarsa or are built float32
+            transitions.append(first.make_element_trusted(state=first.state,
+                                                          action=first.action,
+                                                          reward=returns[index],
+                                                          done=last.done,
+                                                          next_state=last.next_state,
+                                                          next_action=last.next_action,
+                                                          discount_exponent=np.array([length - index],
+                                                                                     dtype=np.float32)))
+        return transitions
+
+    def push(self, sarsa, trajectory=0):
+        """ Adds the next one-step Sarsa of a trajectory
+
+                Args:
+                    sarsa: one-step Sarsa
+                    trajectory: key of the trajectory (i.e. environment index)
+
+                Returns:
+                    list of n-step Sarsas that are complete
+        """
+        window = self._windows.setdefault(trajectory, deque(maxlen=self._n_step))
+        window.append(sarsa)
+
+        if np.any(sarsa.done):
+            return self.flush(trajectory)
+
+        if len(window) < self._n_step:
+            return []
+
+        transition = self._emit(window, 1)
+        window.popleft()
+        return transition
+
+    def flush(self, trajectory=0):
+        """ Emits everything left in a trajectory's window, i.e.
+        when it ends or is cut off
+
+                Args:
+                    trajectory: key of the trajectory
+
+                Returns:
+                    list of Sarsas
+        """
+        window = self._windows.pop(trajectory, None)
+
+        if not window:
+            return []
+
+        return self._emit(window, len(window))
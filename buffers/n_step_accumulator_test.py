@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+from advantage.buffers.n_step_accumulator import NStepAccumulator
+from advantage.elements.sarsa import Sarsa
+
+def make_sarsa(step, reward, done=False):
+    return Sarsa.make_element(state=np.array([step], dtype=np.float32),
+                              action=np.array([1.], dtype=np.float32),
+                              reward=np.array([reward], dtype=np.float32),
+                              done=np.array([done], dtype=np.bool_),
+                              next_state=np.array([step + 1], dtype=np.float32))
+
+class TestNStepAccumulator(unittest.TestCase):
+    """ Tests for the NStepAccumulator """
+
+    def test_one_step_passthrough(self):
+        accumulator = NStepAccumulator(1, 0.9)
+
+        transitions = accumulator.push(make_sarsa(0, 2.))
+
+        self.assertEqual(len(transitions), 1)
+        np.testing.assert_array_equal(transitions[0].reward, np.array([2.]))
+        np.testing.assert_array_equal(transitions[0].discount_exponent, np.array([1.]))
+
+    def test_n_step_returns(self):
+        gamma = 0.5
+        accumulator = NStepAccumulator(3, gamma)
+
+        self.assertEqual(accumulator.push(make_sarsa(0, 1.)), [])
+        self.assertEqual(accumulator.push(make_sarsa(1, 2.)), [])
+
+        transitions = accumulator.push(make_sarsa(2, 4.))
+        self.assertEqual(len(transitions), 1)
+
+        transition = transitions[0]
+        np.testing.assert_array_equal(transition.state, np.array([0.]))
+        np.testing.assert_allclose(transition.reward, np.array([1. + gamma * 2. + gamma ** 2 * 4.]))
+        np.testing.assert_array_equal(transition.next_state, np.array([3.]))
+        np.testing.assert_array_equal(transition.discount_exponent, np.array([3.]))
+        self.assertFalse(transition.done[0])
+
+    def test_flush_on_done(self):
+        gamma = 0.5
+        accumulator = NStepAccumulator(3, gamma)
+
+        accumulator.push(make_sarsa(0, 1.))
+        accumulator.push(make_sarsa(1, 1.))
+        accumulator.push(make_sarsa(2, 1.))
+
+        transitions = accumulator.push(make_sarsa(3, 1., done=True))
+
+        # window held steps 1, 2, 3
+        self.assertEqual(len(transitions), 3)
+        np.testing.assert_array_equal(np.stack([t.state for t in transitions]).ravel(),
+                                      np.array([1., 2., 3.]))
+        np.testing.assert_allclose(np.stack([t.reward for t in transitions]).ravel(),
+                                   np.array([1.75, 1.5, 1.]))
+        np.testing.assert_array_equal(np.stack([t.discount_exponent for t in transitions]).ravel(),
+                                      np.array([3., 2., 1.]))
+        for transition in transitions:
+            self.assertTrue(transition.done[0])
+            np.testing.assert_array_equal(transition.next_state, np.array([4.]))
+
+        # next trajectory starts with an empty window
+        self.assertEqual(accumulator.push(make_sarsa(0, 1.)), [])
+
+    def test_trajectories_kept_apart(self):
+        accumulator = NStepAccumulator(2, 1.)
+
+        accumulator.push(make_sarsa(0, 1.), trajectory=0)
+        accumulator.push(make_sarsa(10, 5.), trajectory=1)
+
+        transitions = accumulator.push(make_sarsa(1, 1.), trajectory=0)
+        np.testing.assert_array_equal(transitions[0].reward, np.array([2.]))
+
+        transitions = accumulator.flush(trajectory=1)
+        np.testing.assert_array_equal(transitions[0].reward, np.array([5.]))
+        np.testing.assert_array_equal(transitions[0].discount_exponent, np.array([1.]))
+
+
+unittest.main()
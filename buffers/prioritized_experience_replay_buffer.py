@@ -0,0 +1,229 @@
+import numpy as np
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from advantage.buffers.sum_tree import SumTree, MinTree
+
+""" Prioritized Experience Replay (Schaul et al. 2015) using
+proportional prioritization
+"""
+
+class PrioritizedExperienceReplayBuffer(ColumnarReplayBuffer):
+    """ Columnar buffer where each slot has a priority p_i. Batches
+    are sampled with probability P(i) = p_i / sum_k p_k using a
+    sum-tree (O(log N) per sample). Importance-sampling weights
+    correct for the non-uniform sampling.
+    """
+
+    # pylint: disable=too-many-arguments
+    # reason-disabled: argument format acceptable
+    def __init__(self,
+                 buffer_size,
+                 element_cls,
+                 dims,
+                 alpha,
+                 beta,
+                 beta_increment,
+                 epsilon,
+                 seed=None,
+                 eviction=None,
+                 storage=None):
+        """
+            Args:
+                buffer_size: number of elements to preallocate for
+                element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                dims: column dimensions from `Environment.dims`
+                alpha: how much prioritization is used (0 is uniform)
+                beta: initial importance-sampling correction exponent
+                beta_increment: amount beta is annealed towards 1 per sample
+                epsilon: added to absolute TD errors so no priority is zero
+                seed: seed for the sampling np.random.Generator
+                eviction: EvictionPolicy once full, FIFO if None
+                storage: per attr storage (see ColumnarReplayBuffer)
+        """
+        self._sum_tree = SumTree(buffer_size)
+        self._min_tree = MinTree(buffer_size)
+
+        self._alpha = alpha
+        self._beta = beta
+        self._beta_increment = beta_increment
+        self._epsilon = epsilon
+
+        self._max_priority = 1.0
+
+        super().__init__(buffer_size, element_cls, dims, seed, eviction, storage)
+
+    @property
+    def beta(self):
+        """ property for `_beta`
+        """
+        return self._beta
+
+    @property
+    def sum_tree(self):
+        """ property for `_sum_tree`
+        """
+        return self._sum_tree
+
+    @property
+    def nbytes(self):
+        return super().nbytes + self._sum_tree.nbytes + self._min_tree.nbytes
+
+    @classmethod
+    def estimate_transition_bytes(cls, element_cls, dims, storage=None, **options):
+        # two float64 trees of up to 4 nodes per slot (leaves are a power of 2)
+        return super().estimate_transition_bytes(element_cls, dims, storage) + 2 * 4 * np.dtype(np.float64).itemsize
+
+    def lowest_priority_slot(self):
+        """ Slot with the lowest priority. Used by LowestPriorityEviction.
+        O(log N)
+
+                Returns:
+                    slot index
+        """
+        return self._min_tree.argmin()
+
+    def _set_priorities(self, slots, priorities):
+        """ Writes already exponentiated priorities to the trees
+
+                Args:
+                    slots: np.ndarray of slot indices
+                    priorities: np.ndarray of priorities
+        """
+        self._sum_tree.update(slots, priorities)
+        self._min_tree.update(slots, priorities)
+
+    def _next_slot(self):
+        """ Gives the slot of a new element the maximum priority seen so
+        far so it is sampled at least once. It is set as soon as the slot
+        is chosen, so the next element of a bulk insert doesn't evict
+        it again (see LowestPriorityEviction).
+        """
+        slot = super()._next_slot()
+
+        if slot is not None:
+            self._set_priorities(np.array([slot]), np.array([self._max_priority]))
+
+        return slot
+
+    def _next_slots(self, num):
+        slots = super()._next_slots(num)
+
+        # slots chosen one by one by `_next_slot` already have it
+        written = np.unique(slots[slots >= 0])
+        self._set_priorities(written, np.full(written.shape, self._max_priority))
+
+        return slots
+
+    def _remove(self, slots):
+        old_len = self._cur_buffer_size
+
+        super()._remove(slots)
+
+        tail = np.arange(self._cur_buffer_size, old_len)
+        self._sum_tree.update(tail, np.zeros(tail.shape))
+        self._min_tree.update(tail, np.full(tail.shape, np.inf))
+
+    def _move(self, sources, destinations):
+        super()._move(sources, destinations)
+        self._set_priorities(destinations, self._sum_tree.get(sources))
+
+    def _proportional_slots(self, num):
+        """ Samples slots proportional to priority. The total priority
+        is split into `num` equal segments and one slot is drawn from each.
+
+                Args:
+                    num: number of slots
+
+                Returns:
+                    np.ndarray of slot indices (may contain repeats)
+        """
+        if not num:
+            return np.arange(0)
+
+        total = self._sum_tree.total
+        bounds = np.arange(num) * (total / num)
+        prefix_sums = bounds + self._rng.uniform(0.0, total / num, size=num)
+        slots = self._sum_tree.find_prefix_sum(prefix_sums)
+        return np.minimum(slots, self._cur_buffer_size - 1)
+
+    def _random_slots(self, num):
+        return np.unique(self._proportional_slots(num))
+
+    def _importance_weights(self, slots):
+        """ Computes normalized importance-sampling weights
+        w_i = (N * P(i)) ^ -beta / max_k w_k
+
+                Args:
+                    slots: np.ndarray of sampled slot indices
+
+                Returns:
+                    np.ndarray of shape [batch, 1] and dtype np.float32
+        """
+        total = self._sum_tree.total
+        num = self._cur_buffer_size
+
+        probabilities = self._sum_tree.get(slots) / total
+        min_probability = self._min_tree.min / total
+
+        weights = (num * probabilities) ** -self._beta
+        max_weight = (num * min_probability) ** -self._beta
+
+        self._beta = min(1.0, self._beta + self._beta_increment)
+
+        return np.expand_dims(weights / max_weight, axis=1).astype(np.float32)
+
+    def random_sample(self, batch_size, sample_less=False):
+        """Samples a batch of elements proportional to their priority
+            Args:
+                batch_size: number of samples to collect
+                sample_less: whether to allow sampling less than requested amount
+
+            Raises:
+                ValueError: invalid amount of samples requested
+                    and sample_less is False
+
+            Returns:
+                stacked Element
+        """
+        num = self._check_batch_size(batch_size, sample_less)
+        slots = self._proportional_slots(num)
+        self._record_sample_age(slots)
+        return self._gather(slots)
+
+    def prioritized_sample(self, batch_size, sample_less=False):
+        """ Samples a batch proportional to priority along with
+        what is needed to later update priorities.
+
+            Args:
+                batch_size: number of samples to collect
+                sample_less: whether to allow sampling less than requested amount
+
+            Raises:
+                ValueError: invalid amount of samples requested
+                    and sample_less is False
+
+            Returns:
+                stacked Element
+                np.ndarray of sampled slots (pass to `update_priorities`)
+                np.ndarray of importance-sampling weights [batch, 1]
+        """
+        num = self._check_batch_size(batch_size, sample_less)
+        slots = self._proportional_slots(num)
+        self._record_sample_age(slots)
+        return self._gather(slots), slots, self._importance_weights(slots)
+
+    def update_priorities(self, slots, td_errors):
+        """ Updates priorities of a sampled batch from its TD errors
+        p_i = (|td_i| + epsilon) ^ alpha
+
+            Args:
+                slots: np.ndarray as returned by `prioritized_sample`
+                td_errors: np.ndarray of TD errors for each slot
+        """
+        if not np.size(td_errors):
+            return
+
+        priorities = (np.abs(np.ravel(td_errors)) + self._epsilon) ** self._alpha
+
+        self._max_priority = max(self._max_priority, float(np.max(priorities)))
+
+        self._set_priorities(slots, priorities)
@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from advantage.buffers.prioritized_experience_replay_buffer import PrioritizedExperienceReplayBuffer
+from advantage.buffers.sum_tree import SumTree, MinTree
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import DIMS, make_sarsa
+
+class TestSumTree(unittest.TestCase):
+    """ Tests for the segment trees """
+
+    def test_total_and_min(self):
+        sum_tree = SumTree(5)
+        min_tree = MinTree(5)
+        sum_tree.update(np.arange(5), np.array([1., 2., 3., 4., 5.]))
+        min_tree.update(np.arange(5), np.array([1., 2., 3., 4., 5.]))
+
+        self.assertEqual(sum_tree.total, 15.)
+        self.assertEqual(min_tree.min, 1.)
+
+        sum_tree.update(np.array([0]), np.array([0.]))
+        self.assertEqual(sum_tree.total, 14.)
+
+    def test_find_prefix_sum(self):
+        sum_tree = SumTree(4)
+        sum_tree.update(np.arange(4), np.array([1., 0., 2., 1.]))
+
+        leaves = sum_tree.find_prefix_sum(np.array([0.0, 0.99, 1.0, 2.5, 3.5]))
+
+        np.testing.assert_array_equal(leaves, np.array([0, 0, 2, 2, 3]))
+
+
+class TestPrioritizedExperienceReplayBuffer(unittest.TestCase):
+    """ Tests for the various functionalities of the PrioritizedExperienceReplayBuffer """
+
+    def setUp(self):
+        self.BUFFER_SIZE = 8
+        self.ebuffer = PrioritizedExperienceReplayBuffer(self.BUFFER_SIZE,
+                                                         Sarsa,
+                                                         DIMS,
+                                                         alpha=1.0,
+                                                         beta=0.5,
+                                                         beta_increment=0.1,
+                                                         epsilon=0.0)
+        for i in range(self.BUFFER_SIZE):
+            self.ebuffer.push(make_sarsa(float(i)))
+
+    def test_transition_bytes(self):
+        estimate = PrioritizedExperienceReplayBuffer.estimate_transition_bytes(Sarsa, DIMS)
+        self.assertGreaterEqual(estimate * self.BUFFER_SIZE, self.ebuffer.nbytes)
+
+    def test_new_elements_max_priority(self):
+        self.assertEqual(self.ebuffer.sum_tree.total, float(self.BUFFER_SIZE))
+
+    def test_proportional_sampling(self):
+        priorities = np.zeros(self.BUFFER_SIZE)
+        priorities[3] = 1.0
+        self.ebuffer.update_priorities(np.arange(self.BUFFER_SIZE), priorities)
+
+        batch, slots, weights = self.ebuffer.prioritized_sample(4)
+
+        np.testing.assert_array_equal(slots, np.array([3, 3, 3, 3]))
+        np.testing.assert_array_equal(batch.reward, np.full((4, 1), 3.))
+        self.assertEqual(weights.shape, (4, 1))
+        self.assertEqual(weights.dtype, np.float32)
+
+    def test_importance_weights(self):
+        priorities = np.ones(self.BUFFER_SIZE)
+        priorities[0] = 4.0
+        self.ebuffer.update_priorities(np.arange(self.BUFFER_SIZE), priorities)
+
+        weights = self.ebuffer._importance_weights(np.array([0, 1]))
+
+        # rarest slot has weight 1, most likely slot is down weighted
+        np.testing.assert_allclose(weights, np.array([[0.5], [1.0]]))
+        self.assertAlmostEqual(self.ebuffer.beta, 0.6)
+
+    def test_pop_moves_priorities(self):
+        priorities = np.ones(self.BUFFER_SIZE)
+        priorities[self.BUFFER_SIZE - 1] = 5.0
+        self.ebuffer.update_priorities(np.arange(self.BUFFER_SIZE), priorities)
+
+        self.ebuffer.sample_and_pop(1)
+
+        self.assertEqual(self.ebuffer.len, self.BUFFER_SIZE - 1)
+        self.assertEqual(self.ebuffer.sum_tree.total, 11.0)
+        self.assertEqual(self.ebuffer.sum_tree.get(np.array([0]))[0], 5.0)
+
+
+unittest.main()
@@ -0,0 +1,682 @@
+import multiprocessing
+import os
+import socket
+import socketserver
+import struct
+import threading
+import numpy as np
+from advantage.buffers.base.base_buffers import ReplayBuffer
+
+""" Replay Buffer served by its own process over a local
+socket, so many actor processes can share one buffer
+"""
+
+# request ops
+_INSERT = 1
+_SAMPLE = 2
+_LEN = 3
+
+# response ops
+_OK = 0
+_ERROR = 255
+
+# sample modes (index into `_SAMPLE_METHODS`)
+_SAMPLE_METHODS = ("random_sample",
+                   "random_sample_and_pop",
+                   "sample",
+                   "sample_and_pop")
+
+# error kinds raised again by the client, others become RuntimeError
+_ERRORS = (ValueError, TimeoutError, RuntimeError)
+
+# frame header: op, payload length
+_HEADER = struct.Struct("!BQ")
+
+_SAMPLE_REQUEST = struct.Struct("!IBB")
+_LEN_RESPONSE = struct.Struct("!Q")
+
+def encode_arrays(arrays):
+    """ Packs a dict of np.ndarrays into the wire format
+
+        [count: u16] then per array [name len: u8][name][dtype len: u8][dtype]
+        [ndim: u8][shape: u64 * ndim][raw C-order bytes]
+
+        Args:
+            arrays: dict of name to np.ndarray
+
+        Returns:
+            bytes
+    """
+    parts = [struct.pack("!H", len(arrays))]
+
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        name = name.encode()
+        dtype = array.dtype.str.encode()
+
+        parts.append(struct.pack("!B", len(name)) + name
+                     + struct.pack("!B", len(dtype)) + dtype
+                     + struct.pack("!B%dQ" % array.ndim, array.ndim, *array.shape))
+        parts.append(array.tobytes())
+
+    return b"".join(parts)
+
+def decode_arrays(payload):
+    """ Unpacks `encode_arrays`. Arrays are views into `payload`
+
+        Args:
+            payload: bytes like
+
+        Returns:
+            dict of name to np.ndarray
+    """
+    view = memoryview(payload)
+    (count,), offset = struct.unpack_from("!H", view), 2
+
+    arrays = {}
+    for _ in range(count):
+        (length,), offset = struct.unpack_from("!B", view, offset), offset + 1
+        name, offset = bytes(view[offset:offset + length]).decode(), offset + length
+
+        (length,), offset = struct.unpack_from("!B", view, offset), offset + 1
+        dtype, offset = np.dtype(bytes(view[offset:offset + length]).decode()), offset + length
+
+        (ndim,), offset = struct.unpack_from("!B", view, offset), offset + 1
+        shape, offset = struct.unpack_from("!%dQ" % ndim, view, offset), offset + 8 * ndim
+
+        num = int(np.prod(shape))
+        arrays[name] = np.frombuffer(view, dtype=dtype, count=num, offset=offset).reshape(shape)
+        offset += num * dtype.itemsize
+
+    return arrays
+
+def _recv_exactly(sock, num):
+    """ Reads exactly `num` bytes
+
+        Returns:
+            bytearray or None if the peer closed the connection
+    """
+    data = bytearray(num)
+    view = memoryview(data)
+    received = 0
+
+    while received < num:
+        read = sock.recv_into(view[received:])
+        if not read:
+            return None
+        received += read
+
+    return data
+
+def send_frame(sock, op, payload=b""):
+    """ Sends one framed message
+    """
+    sock.sendall(_HEADER.pack(op, len(payload)) + payload)
+
+def recv_frame(sock):
+    """ Receives one framed message
+
+        Returns:
+            tuple of (op, bytearray payload) or None if the
+                peer closed the connection
+    """
+    header = _recv_exactly(sock, _HEADER.size)
+
+    if header is None:
+        return None
+
+    op, length = _HEADER.unpack(header)
+    payload = _recv_exactly(sock, length)
+
+    if payload is None:
+        return None
+
+    return op, payload
+
+def parse_address(address):
+    """ Converts an address into a socket family and address
+
+        Args:
+            address: "unix:<path>" for a Unix domain socket,
+                "<host>:<port>" or a (host, port) tuple for TCP
+
+        Returns:
+            tuple of (socket family, address)
+    """
+    if isinstance(address, tuple):
+        return socket.AF_INET, address
+
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+
+    host, port = address.rsplit(":", 1)
+    return socket.AF_INET, (host, int(port))
+
+def _stack_batch(batch):
+    """ Converts a sampled batch (list of elements or
+    a stacked element) into a dict of stacked arrays
+    """
+    if isinstance(batch, list):
+        if not batch:
+            return {}
+        return {name: np.stack([getattr(element, name) for element in batch])
+                for name in batch[0].unzip_to_dict()}
+
+    return batch.unzip_to_dict()
+
+class RateLimiter:
+    """ Keeps the number of sampled elements per inserted element near
+    `samples_per_insert` (Reverb's SampleToInsertRatio). Once
+    `min_size_to_sample` elements were inserted
+
+        min_size_to_sample * samples_per_insert +- error_buffer
+
+    bounds `inserts * samples_per_insert - samples`: inserts block when
+    the learner falls behind and samples block when actors fall behind.
+    A `samples_per_insert` of 0 only waits for `min_size_to_sample`.
+    """
+
+    def __init__(self, samples_per_insert=0., min_size_to_sample=1, error_buffer=0.):
+        """
+            Args:
+                samples_per_insert: target ratio, 0 disables it
+                min_size_to_sample: inserts before sampling is allowed
+                error_buffer: allowed deviation in sampled elements
+
+            Raises:
+                ValueError: error_buffer can't fit one insert
+        """
+        if samples_per_insert and 2 * error_buffer < samples_per_insert:
+            raise ValueError("error_buffer must be at least samples_per_insert / 2")
+
+        self._samples_per_insert = samples_per_insert
+        self._min_size_to_sample = min_size_to_sample
+
+        center = min_size_to_sample * samples_per_insert
+        self._min_diff = center - error_buffer
+        self._max_diff = center + error_buffer
+
+        self._inserts = 0
+        self._samples = 0
+
+    @property
+    def inserts(self):
+        """ property for `_inserts`
+        """
+        return self._inserts
+
+    @property
+    def samples(self):
+        """ property for `_samples`
+        """
+        return self._samples
+
+    def _diff(self, inserts, samples):
+        return inserts * self._samples_per_insert - samples
+
+    def can_insert(self, num=1):
+        """ Whether `num` more elements can be inserted. Below
+        `min_size_to_sample` inserts a batch is always allowed, since
+        nothing can be sampled to make room for it.
+        """
+        if not self._samples_per_insert or self._inserts < self._min_size_to_sample:
+            return True
+        return self._diff(self._inserts + num, self._samples) <= self._max_diff
+
+    def can_sample(self, num):
+        """ Whether `num` more elements can be sampled
+        """
+        if self._inserts < self._min_size_to_sample:
+            return False
+        if not self._samples_per_insert:
+            return True
+        return self._diff(self._inserts, self._samples + num) >= self._min_diff
+
+    def check_insert_size(self, num):
+        """ Validates the size of an inserted batch
+
+            Raises:
+                ValueError: `num` inserts could never be allowed
+        """
+        if self._samples_per_insert and num * self._samples_per_insert > self._max_diff - self._min_diff:
+            raise ValueError("Inserting %d elements at once needs an error_buffer of at least %g"
+                             % (num, num * self._samples_per_insert / 2))
+
+    def check_sample_size(self, num):
+        """ Validates a requested batch size
+
+            Raises:
+                ValueError: `num` samples could never be allowed
+        """
+        if self._samples_per_insert and num > self._max_diff - self._min_diff - self._samples_per_insert:
+            raise ValueError("Sampling %d elements at once needs an error_buffer of at least %g"
+                             % (num, (num + self._samples_per_insert) / 2))
+
+    def inserted(self, num=1):
+        """ Records `num` inserted elements
+        """
+        self._inserts += num
+
+    def sampled(self, num):
+        """ Records `num` sampled elements
+        """
+        self._samples += num
+
+class _ReplayRequestHandler(socketserver.BaseRequestHandler):
+    """ Serves requests of one client connection until it closes
+    """
+
+    def setup(self):
+        if self.request.family != socket.AF_UNIX:
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        while True:
+            frame = recv_frame(self.request)
+
+            if frame is None:
+                return
+
+            try:
+                response = self.server.replay_server.handle(*frame)
+                send_frame(self.request, _OK, response)
+            except Exception as error: # pylint: disable=broad-except
+                # reason-disabled: raised again by the client
+                kind = next((index for index, cls in enumerate(_ERRORS) if isinstance(error, cls)),
+                            _ERRORS.index(RuntimeError))
+                send_frame(self.request, _ERROR, struct.pack("!B", kind) + str(error).encode())
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class ReplayServer:
+    """ Serves a Replay Buffer to `ReplayClientBuffer`s. Each connection
+    gets a thread, requests are applied to the buffer under one condition
+    variable that also enforces the RateLimiter. Inserted batches are
+    written with the buffer's `extend`.
+    """
+
+    def __init__(self, buffer, element_cls, address, rate_limiter=None, timeout=None):
+        """
+            Args:
+                buffer: ReplayBuffer served (an ExperienceReplayBuffer
+                    needs its `element_cls` to `extend`)
+                element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                address: see `parse_address`
+                rate_limiter: RateLimiter, unlimited if None
+                timeout: seconds a request waits on the rate limiter
+                    before failing with a TimeoutError, forever if None
+        """
+        self._buffer = buffer
+        self._element_cls = element_cls
+        self._attr_names = {attr.name for attr in element_cls.__attrs_attrs__ if "np_attr" in attr.metadata}
+        self._limiter = rate_limiter or RateLimiter()
+        self._timeout = timeout
+
+        self._cond = threading.Condition()
+
+        family, address = parse_address(address)
+
+        server_cls = _UnixServer if family == socket.AF_UNIX else _TCPServer
+
+        self._server = server_cls(address, _ReplayRequestHandler)
+        self._server.replay_server = self
+
+    @property
+    def address(self):
+        """ bound address in the format of `parse_address`
+        """
+        address = self._server.server_address
+
+        if self._server.address_family == socket.AF_UNIX:
+            return "unix:" + address
+        return "%s:%d" % address[:2]
+
+    def _wait(self, predicate):
+        if not self._cond.wait_for(predicate, self._timeout):
+            raise TimeoutError("Timed out waiting on the replay rate limiter")
+
+    def _insert(self, payload):
+        # copied out of the payload, buffers may keep views of the rows
+        attrs = {name: value.copy() for name, value in decode_arrays(payload).items()}
+        num = next(iter(attrs.values())).shape[0] if attrs else 0
+
+        if not num:
+            return b""
+
+        missing = self._attr_names - set(attrs)
+        if missing:
+            raise ValueError("Inserted batch is missing attrs %s" % sorted(missing))
+
+        if any(value.shape[0] != num for value in attrs.values()):
+            raise ValueError("Inserted attrs must have the same number of rows")
+
+        self._limiter.check_insert_size(num)
+
+        # the batch is inserted whole or (on a timeout) not at all
+        with self._cond:
+            self._wait(lambda: self._limiter.can_insert(num))
+
+            self._buffer.extend(attrs)
+
+            self._limiter.inserted(num)
+            self._cond.notify_all()
+
+        return b""
+
+    def _sample(self, payload):
+        batch_size, mode, sample_less = _SAMPLE_REQUEST.unpack(payload)
+        sample = getattr(self._buffer, _SAMPLE_METHODS[mode])
+
+        self._limiter.check_sample_size(batch_size)
+
+        with self._cond:
+            self._wait(lambda: self._limiter.can_sample(batch_size))
+
+            attrs = _stack_batch(sample(batch_size, sample_less=bool(sample_less)))
+
+            self._limiter.sampled(next(iter(attrs.values())).shape[0] if attrs else 0)
+            self._cond.notify_all()
+
+        return encode_arrays(attrs)
+
+    def handle(self, op, payload):
+        """ Applies one request
+
+            Args:
+                op: request op
+                payload: request payload
+
+            Returns:
+                response payload
+
+            Raises:
+                ValueError: invalid request (or from the buffer)
+                TimeoutError: rate limiter timed out
+        """
+        if op == _INSERT:
+            return self._insert(payload)
+
+        if op == _SAMPLE:
+            return self._sample(payload)
+
+        if op == _LEN:
+            with self._cond:
+                return _LEN_RESPONSE.pack(self._buffer.len)
+
+        raise ValueError("Unknown replay request op %d" % op)
+
+    def serve_forever(self, poll_interval=0.1):
+        """ Serves until `shutdown`
+        """
+        self._server.serve_forever(poll_interval)
+
+    def shutdown(self):
+        """ Stops `serve_forever` (from another thread)
+        """
+        self._server.shutdown()
+
+    def close(self):
+        """ Closes the listening socket
+        """
+        self._server.server_close()
+
+        if self._server.address_family == socket.AF_UNIX:
+            os.unlink(self._server.server_address)
+
+def _run_service(make_buffer, element_cls, address, limiter_args, timeout, ready, stop):
+    """ Entry point of the service process
+    """
+    server = ReplayServer(make_buffer(),
+                          element_cls,
+                          address,
+                          RateLimiter(*limiter_args) if limiter_args else None,
+                          timeout)
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    ready.send(server.address)
+    ready.close()
+
+    stop.wait()
+
+    server.shutdown()
+    thread.join()
+    server.close()
+
+class ReplayService:
+    """ Runs a ReplayServer in its own process
+    """
+
+    def __init__(self,
+                 make_buffer,
+                 element_cls,
+                 address,
+                 samples_per_insert=0.,
+                 min_size_to_sample=1,
+                 error_buffer=0.,
+                 timeout=None,
+                 context=None):
+        """
+            Args:
+                make_buffer: picklable callable building the
+                    ReplayBuffer in the service process
+                element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                address: see `parse_address`, TCP port 0 binds a free port
+                samples_per_insert: see RateLimiter
+                min_size_to_sample: see RateLimiter
+                error_buffer: see RateLimiter
+                timeout: see ReplayServer
+                context: multiprocessing context, the default if None
+        """
+        # checked here so errors are raised in the calling process
+        limiter_args = (samples_per_insert, min_size_to_sample, error_buffer)
+        RateLimiter(*limiter_args)
+
+        self._context = context or multiprocessing.get_context()
+        self._args = (make_buffer, element_cls, address, limiter_args, timeout)
+
+        self._process = None
+        self._stop = None
+        self._address = None
+
+    @property
+    def address(self):
+        """ address clients connect to, once started
+        """
+        return self._address
+
+    def start(self):
+        """ Starts the service process and waits until it accepts connections
+
+            Returns:
+                bound address
+        """
+        receiver, sender = self._context.Pipe(duplex=False)
+        self._stop = self._context.Event()
+
+        self._process = self._context.Process(target=_run_service,
+                                              args=self._args + (sender, self._stop),
+                                              name="ReplayService",
+                                              daemon=True)
+        self._process.start()
+        sender.close()
+
+        try:
+            self._address = receiver.recv()
+        except EOFError:
+            self._process.join()
+            raise RuntimeError("Replay service failed to start")
+        finally:
+            receiver.close()
+
+        return self._address
+
+    def stop(self):
+        """ Stops the service process
+        """
+        if self._process is None:
+            return
+
+        self._stop.set()
+        self._process.join()
+        self._process = None
+
+class ReplayClientBuffer(ReplayBuffer):
+    """ ReplayBuffer interface to a ReplayService. Pushes are batched
+    into one insert request every `insert_batch` elements (and before
+    any other request). Samples come back as one stacked Element.
+
+    The service owns the elements, so clients aren't checkpointed.
+    """
+
+    def __init__(self, buffer_size, address, element_cls, insert_batch=32, seed=None):
+        """
+            Args:
+                buffer_size: size of the served buffer (informational)
+                address: see `parse_address`
+                element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                insert_batch: number of pushes sent per insert request
+                seed: unused, the service samples
+        """
+        super().__init__(buffer_size, seed)
+
+        self._element_cls = element_cls
+        self._insert_batch = insert_batch
+
+        self._pending = []
+
+        family, address = parse_address(address)
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.connect(address)
+
+        if family != socket.AF_UNIX:
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    @property
+    def len(self):
+        self.flush()
+        (length,) = _LEN_RESPONSE.unpack(self._request(_LEN))
+        return length
+
+    def _request(self, op, payload=b""):
+        """ Sends a request and waits for its response
+
+            Returns:
+                response payload
+
+            Raises:
+                ValueError, TimeoutError or RuntimeError raised by the service
+        """
+        send_frame(self._sock, op, payload)
+        frame = recv_frame(self._sock)
+
+        if frame is None:
+            raise RuntimeError("Replay service closed the connection")
+
+        status, response = frame
+
+        if status == _ERROR:
+            raise _ERRORS[response[0]](bytes(response[1:]).decode())
+
+        return response
+
+    def push(self, item):
+        """ Queues an element, sending the queue once it
+        reaches `insert_batch`
+                Args:
+                    item: Element of type `element_cls`
+        """
+        self._pending.append(item)
+
+        if len(self._pending) >= self._insert_batch:
+            self.flush()
+
+    def flush(self):
+        """ Sends all queued elements
+        """
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        self._request(_INSERT, encode_arrays(_stack_batch(pending)))
+
+    def extend(self, attrs):
+        """ Sends elements in one insert request, after the queued ones
+                Args:
+                    attrs: dict of every Element attr to np.ndarray [num, ...]
+        """
+        self.flush()
+        self._request(_INSERT, encode_arrays(attrs))
+
+    def _sample(self, method, batch_size, sample_less):
+        self.flush()
+
+        response = self._request(_SAMPLE, _SAMPLE_REQUEST.pack(batch_size,
+                                                               _SAMPLE_METHODS.index(method),
+                                                               sample_less))
+        attrs = decode_arrays(response)
+
+        # an empty batch of a list based buffer has no shapes
+        if not attrs:
+            return []
+
+        return self._element_cls.make_element_from_dict(attrs)
+
+    def random_sample(self, batch_size, sample_less=False):
+        """ See `ReplayBuffer.random_sample`
+
+            Returns:
+                stacked Element
+        """
+        return self._sample("random_sample", batch_size, sample_less)
+
+    def random_sample_and_pop(self, batch_size, sample_less=False):
+        """ See `ReplayBuffer.random_sample_and_pop`
+
+            Returns:
+                stacked Element
+        """
+        return self._sample("random_sample_and_pop", batch_size, sample_less)
+
+    def sample(self, batch_size, sample_less=False):
+        """ See `ReplayBuffer.sample`
+
+            Returns:
+                stacked Element
+        """
+        return self._sample("sample", batch_size, sample_less)
+
+    def sample_and_pop(self, batch_size, sample_less=False):
+        """ See `ReplayBuffer.sample_and_pop`
+
+            Returns:
+                stacked Element
+        """
+        return self._sample("sample_and_pop", batch_size, sample_less)
+
+    def close(self):
+        """ Sends queued elements and disconnects
+        """
+        if self._sock is None:
+            return
+
+        self.flush()
+        self._sock.close()
+        self._sock = None
+
+    def save_checkpoint_state(self, directory):
+        """ The service owns the elements, so
+        clients aren't checkpointed
+        """
+        pass
+
+    def restore_checkpoint_state(self, directory):
+        """ See `save_checkpoint_state`
+        """
+        pass
@@ -0,0 +1,236 @@
+from functools import partial
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+from advantage.buffers.replay_service import ReplayService, ReplayServer, ReplayClientBuffer, \
+    RateLimiter, encode_arrays, decode_arrays
+from advantage.buffers.buffer_stats import BufferStats
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from advantage.buffers.experience_replay_buffer import ExperienceReplayBuffer
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import DIMS, make_sarsa, stack_sarsas
+
+def push_values(address, values):
+    client = ReplayClientBuffer(64, address, Sarsa, insert_batch=4)
+    for value in values:
+        client.push(make_sarsa(value))
+    client.close()
+
+class TestWireFormat(unittest.TestCase):
+    """ Tests for encode_arrays/decode_arrays """
+
+    def test_round_trip(self):
+        arrays = {"state": np.arange(12, dtype=np.float32).reshape(3, 2, 2),
+                  "done": np.array([[True], [False], [True]]),
+                  "action": np.arange(3, dtype=np.int16),
+                  "empty": np.zeros((0, 4), dtype=np.uint8)}
+
+        decoded = decode_arrays(encode_arrays(arrays))
+
+        self.assertEqual(list(decoded), list(arrays))
+        for name, array in arrays.items():
+            self.assertEqual(decoded[name].dtype, array.dtype)
+            np.testing.assert_array_equal(decoded[name], array)
+
+class TestRateLimiter(unittest.TestCase):
+    """ Tests for the RateLimiter """
+
+    def test_unlimited(self):
+        limiter = RateLimiter(min_size_to_sample=2)
+
+        self.assertFalse(limiter.can_sample(1))
+        limiter.inserted()
+        limiter.inserted()
+        self.assertTrue(limiter.can_sample(100))
+        self.assertTrue(limiter.can_insert())
+
+    def test_ratio(self):
+        limiter = RateLimiter(samples_per_insert=2., min_size_to_sample=2, error_buffer=4.)
+
+        limiter.inserted()
+        limiter.inserted()
+
+        # diff is 4 and must stay in [0, 8]
+        self.assertTrue(limiter.can_insert())
+        limiter.inserted()
+        limiter.inserted()
+        self.assertFalse(limiter.can_insert())
+
+        self.assertTrue(limiter.can_sample(6))
+        limiter.sampled(6)
+        self.assertFalse(limiter.can_sample(3))
+        self.assertTrue(limiter.can_insert())
+
+    def test_sample_size(self):
+        limiter = RateLimiter(samples_per_insert=1., min_size_to_sample=1, error_buffer=4.)
+
+        limiter.check_sample_size(7)
+        with self.assertRaises(ValueError):
+            limiter.check_sample_size(8)
+
+        with self.assertRaises(ValueError):
+            RateLimiter(samples_per_insert=4., error_buffer=1.)
+
+    def test_batches(self):
+        limiter = RateLimiter(samples_per_insert=1., min_size_to_sample=2, error_buffer=2.)
+
+        # nothing can be sampled to make room yet
+        self.assertTrue(limiter.can_insert(10))
+        limiter.inserted(2)
+
+        # diff is 2 and must stay in [0, 4]
+        self.assertTrue(limiter.can_insert(2))
+        self.assertFalse(limiter.can_insert(3))
+
+        limiter.check_insert_size(4)
+        with self.assertRaises(ValueError):
+            limiter.check_insert_size(5)
+
+class TestReplayService(unittest.TestCase):
+    """ Tests for the ReplayService and ReplayClientBuffer """
+
+    def setUp(self):
+        self.context = multiprocessing.get_context("fork")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def start_service(self, make_buffer, address=None, **kwargs):
+        address = address or "unix:" + os.path.join(self.directory.name, "replay.sock")
+        service = ReplayService(make_buffer, Sarsa, address, context=self.context, **kwargs)
+        service.start()
+        self.addCleanup(service.stop)
+        return service
+
+    def test_push_and_sample(self):
+        service = self.start_service(partial(ColumnarReplayBuffer, 64, Sarsa, DIMS, seed=0))
+
+        client = ReplayClientBuffer(64, service.address, Sarsa, insert_batch=4)
+        self.addCleanup(client.close)
+
+        for value in range(10):
+            client.push(make_sarsa(value))
+
+        self.assertEqual(client.len, 10)
+
+        batch = client.sample(3)
+        self.assertIsInstance(batch, Sarsa)
+        np.testing.assert_array_equal(batch.reward[:, 0], [0, 1, 2])
+
+        popped = client.random_sample_and_pop(4)
+        self.assertEqual(popped.state.shape, (4, 2))
+        self.assertEqual(client.len, 6)
+
+        with self.assertRaises(ValueError):
+            client.random_sample(7)
+
+        self.assertEqual(client.random_sample(7, sample_less=True).reward.shape, (6, 1))
+
+    def test_client_not_instrumented(self):
+        service = self.start_service(partial(ColumnarReplayBuffer, 64, Sarsa, DIMS, seed=0))
+
+        client = ReplayClientBuffer(64, service.address, Sarsa)
+        self.addCleanup(client.close)
+
+        # the client can't report its size
+        with self.assertRaises(ValueError):
+            BufferStats().attach(client)
+
+    def test_actor_processes(self):
+        service = self.start_service(partial(ExperienceReplayBuffer, 64, element_cls=Sarsa, seed=0), address="127.0.0.1:0")
+
+        actors = [self.context.Process(target=push_values,
+                                       args=(service.address, range(10 * index, 10 * index + 10)))
+                  for index in range(3)]
+        for actor in actors:
+            actor.start()
+        for actor in actors:
+            actor.join()
+
+        client = ReplayClientBuffer(64, service.address, Sarsa)
+        self.addCleanup(client.close)
+
+        batch = client.random_sample(30)
+        self.assertEqual(sorted(batch.reward[:, 0]), list(range(30)))
+
+    def test_rate_limited_timeout(self):
+        service = self.start_service(partial(ColumnarReplayBuffer, 64, Sarsa, DIMS),
+                                     samples_per_insert=1.,
+                                     min_size_to_sample=4,
+                                     error_buffer=2.,
+                                     timeout=0.1)
+
+        client = ReplayClientBuffer(64, service.address, Sarsa, insert_batch=1)
+        self.addCleanup(client.close)
+
+        for value in range(4):
+            client.push(make_sarsa(value))
+
+        # diff must stay in [2, 6]
+        client.push(make_sarsa(4))
+        client.push(make_sarsa(5))
+        with self.assertRaises(TimeoutError):
+            client.push(make_sarsa(6))
+
+        client.random_sample(3)
+        with self.assertRaises(TimeoutError):
+            client.random_sample(2)
+
+    def test_rate_limited_batch_isnt_split(self):
+        service = self.start_service(partial(ColumnarReplayBuffer, 64, Sarsa, DIMS),
+                                     samples_per_insert=1.,
+                                     min_size_to_sample=4,
+                                     error_buffer=2.,
+                                     timeout=0.1)
+
+        client = ReplayClientBuffer(64, service.address, Sarsa)
+        self.addCleanup(client.close)
+
+        client.extend(stack_sarsas(range(4)))
+
+        # diff must stay in [2, 6], 3 more elements only fit partly
+        with self.assertRaises(TimeoutError):
+            client.extend(stack_sarsas(range(4, 7)))
+        self.assertEqual(client.len, 4)
+
+        with self.assertRaises(ValueError):
+            client.extend(stack_sarsas(range(5)))
+        self.assertEqual(client.len, 4)
+
+class TestReplayServer(unittest.TestCase):
+    """ Tests the ReplayServer in process """
+
+    def test_blocked_sample_waits_for_inserts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            address = "unix:" + os.path.join(directory, "replay.sock")
+            server = ReplayServer(ColumnarReplayBuffer(64, Sarsa, DIMS, seed=0),
+                                  Sarsa,
+                                  address,
+                                  RateLimiter(min_size_to_sample=4))
+
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+
+            learner = ReplayClientBuffer(64, address, Sarsa)
+            actor = ReplayClientBuffer(64, address, Sarsa, insert_batch=1)
+
+            batches = []
+            sampler = threading.Thread(target=lambda: batches.append(learner.random_sample(4)))
+            sampler.start()
+
+            for value in range(4):
+                actor.push(make_sarsa(value))
+
+            sampler.join()
+            self.assertEqual(sorted(batches[0].reward[:, 0]), [0, 1, 2, 3])
+
+            learner.close()
+            actor.close()
+            server.shutdown()
+            thread.join()
+            server.close()
+
+if __name__ == "__main__":
+    unittest.main()
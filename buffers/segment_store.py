@@ -0,0 +1,151 @@
+import json
+import os
+import numpy as np
+
+""" Incremental on-disk storage of Replay Buffer elements
+used by the checkpoint system.
+"""
+
+class SegmentStore:
+    """ Directory of append-only segment files. Each save writes the
+    elements pushed since the previous save as one new `.npz` segment
+    (one array per Element attr plus their insertion sequence numbers),
+    the sequence numbers of all live elements, and then atomically
+    replaces the manifest. Segments without live elements are deleted.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+    SEQS_KEY = "_seqs"
+
+    def __init__(self, directory):
+        """
+            Args:
+                directory: directory holding the segments
+        """
+        self._directory = directory
+
+    @property
+    def directory(self):
+        """ property for `_directory`
+        """
+        return self._directory
+
+    def _path(self, file_name):
+        return os.path.join(self._directory, file_name)
+
+    def read_manifest(self):
+        """ Reads the manifest
+
+                Returns:
+                    manifest dict or None if nothing was saved
+        """
+        manifest_path = self._path(self.MANIFEST_FILE)
+
+        if not os.path.exists(manifest_path):
+            return None
+
+        with open(manifest_path, "r") as manifest_file:
+            return json.load(manifest_file)
+
+    def _atomic_save(self, file_name, save_fn):
+        """ Saves to a temporary file with `save_fn`
+        and then moves it to `file_name`
+        """
+        tmp_path = self._path(file_name + ".tmp")
+
+        with open(tmp_path, "wb") as tmp_file:
+            save_fn(tmp_file)
+
+        os.replace(tmp_path, self._path(file_name))
+
+    def write(self, attrs, seqs, live_seqs, next_seq):
+        """ Writes a new segment and the manifest
+
+                Args:
+                    attrs: dict of attr name to np.ndarray [num_new, ...]
+                    seqs: np.ndarray of sequence numbers of the new elements
+                    live_seqs: np.ndarray of sequence numbers of all
+                        elements currently held by the buffer
+                    next_seq: next sequence number the buffer will assign
+        """
+        os.makedirs(self._directory, exist_ok=True)
+
+        manifest = self.read_manifest() or {"segments": [], "live": None, "next_seq": 0}
+
+        segments = manifest["segments"]
+
+        if seqs.shape[0]:
+            segment = {"file": "segment-%012d.npz" % seqs.min(),
+                       "first_seq": int(seqs.min()),
+                       "last_seq": int(seqs.max())}
+
+            arrays = dict(attrs)
+            arrays[self.SEQS_KEY] = seqs
+            self._atomic_save(segment["file"], lambda f: np.savez(f, **arrays))
+
+            segments.append(segment)
+
+        live_seqs = np.sort(live_seqs)
+
+        live_file = "live-%012d.npy" % next_seq
+        self._atomic_save(live_file, lambda f: np.save(f, live_seqs))
+
+        def has_live(segment):
+            first = np.searchsorted(live_seqs, segment["first_seq"], side="left")
+            return first < live_seqs.shape[0] and live_seqs[first] <= segment["last_seq"]
+
+        dead = [segment for segment in segments if not has_live(segment)]
+
+        old_live_file = manifest["live"]
+
+        manifest = {"segments": [segment for segment in segments if has_live(segment)],
+                    "live": live_file,
+                    "next_seq": int(next_seq)}
+
+        self._atomic_save(self.MANIFEST_FILE,
+                          lambda f: f.write(json.dumps(manifest).encode("utf-8")))
+
+        # only delete after the new manifest no longer references them
+        for segment in dead:
+            os.remove(self._path(segment["file"]))
+
+        if old_live_file and old_live_file != live_file:
+            os.remove(self._path(old_live_file))
+
+    def read(self):
+        """ Reads all live elements with one bulk read per segment
+
+                Returns:
+                    tuple of (dict of attr name to np.ndarray, np.ndarray of
+                        sequence numbers, next sequence number) with elements
+                        in insertion order. None if nothing was saved
+        """
+        manifest = self.read_manifest()
+
+        if manifest is None:
+            return None
+
+        live_seqs = np.load(self._path(manifest["live"]))
+
+        attr_parts = {}
+        seq_parts = []
+
+        for segment in manifest["segments"]:
+            with np.load(self._path(segment["file"])) as arrays:
+                seqs = arrays[self.SEQS_KEY]
+                keep = np.isin(seqs, live_seqs)
+
+                seq_parts.append(seqs[keep])
+                for name in arrays.files:
+                    if name != self.SEQS_KEY:
+                        attr_parts.setdefault(name, []).append(arrays[name][keep])
+
+        if not seq_parts:
+            return {}, np.zeros(0, dtype=np.int64), manifest["next_seq"]
+
+        seqs = np.concatenate(seq_parts)
+        order = np.argsort(seqs, kind="stable")
+
+        attrs = {name: np.concatenate(parts)[order] for name, parts in attr_parts.items()}
+
+        return attrs, seqs[order], manifest["next_seq"]
@@ -0,0 +1,112 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from advantage.buffers.aliased_replay_buffer import AliasedReplayBuffer
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from advantage.buffers.experience_replay_buffer import ExperienceReplayBuffer
+from advantage.buffers.prioritized_experience_replay_buffer import PrioritizedExperienceReplayBuffer
+from advantage.buffers.segment_store import SegmentStore
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import DIMS, make_sarsa
+
+def rewards(ebuffer):
+    batch = ebuffer.sample(ebuffer.len)
+    if isinstance(batch, list):
+        return sorted(float(sarsa.reward[0]) for sarsa in batch)
+    return sorted(batch.reward.ravel().tolist())
+
+class TestSegmentStore(unittest.TestCase):
+    """ Tests for incremental replay buffer checkpointing """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def segment_files(self):
+        directory = os.path.join(self.tmp_dir, ColumnarReplayBuffer.SEGMENTS_DIR)
+        return sorted(f for f in os.listdir(directory) if f.startswith("segment-"))
+
+    def test_incremental_segments(self):
+        ebuffer = ColumnarReplayBuffer(4, Sarsa, DIMS)
+
+        for i in range(3):
+            ebuffer.push(make_sarsa(float(i)))
+        ebuffer.save_checkpoint_state(self.tmp_dir)
+
+        # nothing new, no new segment
+        ebuffer.save_checkpoint_state(self.tmp_dir)
+        self.assertEqual(len(self.segment_files()), 1)
+
+        for i in range(3, 5):
+            ebuffer.push(make_sarsa(float(i)))
+        ebuffer.save_checkpoint_state(self.tmp_dir)
+        self.assertEqual(len(self.segment_files()), 2)
+
+        # first segment only holds evicted elements after this
+        for i in range(5, 8):
+            ebuffer.push(make_sarsa(float(i)))
+        ebuffer.save_checkpoint_state(self.tmp_dir)
+        self.assertEqual(len(self.segment_files()), 2)
+
+        restored = ColumnarReplayBuffer(4, Sarsa, DIMS)
+        restored.restore_checkpoint_state(self.tmp_dir)
+
+        self.assertEqual(restored.len, 4)
+        self.assertEqual(rewards(restored), [4., 5., 6., 7.])
+        np.testing.assert_array_equal(restored.sample(4).reward.ravel(), np.array([4., 5., 6., 7.]))
+
+        # restored buffer continues incrementally
+        restored.push(make_sarsa(8.))
+        restored.save_checkpoint_state(self.tmp_dir)
+
+        again = ColumnarReplayBuffer(4, Sarsa, DIMS)
+        again.restore_checkpoint_state(self.tmp_dir)
+        self.assertEqual(rewards(again), [5., 6., 7., 8.])
+
+    def test_popped_not_restored(self):
+        ebuffer = ColumnarReplayBuffer(8, Sarsa, DIMS, seed=0)
+
+        for i in range(6):
+            ebuffer.push(make_sarsa(float(i)))
+        ebuffer.save_checkpoint_state(self.tmp_dir)
+
+        ebuffer.random_sample_and_pop(2)
+        kept = rewards(ebuffer)
+        ebuffer.save_checkpoint_state(self.tmp_dir)
+
+        restored = ColumnarReplayBuffer(8, Sarsa, DIMS)
+        restored.restore_checkpoint_state(self.tmp_dir)
+        self.assertEqual(rewards(restored), kept)
+
+    def test_nothing_saved(self):
+        ebuffer = ColumnarReplayBuffer(4, Sarsa, DIMS)
+        ebuffer.restore_checkpoint_state(self.tmp_dir)
+        self.assertEqual(ebuffer.len, 0)
+        self.assertIsNone(SegmentStore(self.tmp_dir).read())
+
+    def test_other_buffers(self):
+        makers = [lambda: ExperienceReplayBuffer(4, element_cls=Sarsa),
+                  lambda: AliasedReplayBuffer(8, Sarsa, DIMS),
+                  lambda: PrioritizedExperienceReplayBuffer(4, Sarsa, DIMS, 0.6, 0.4, 0.001, 1e-6)]
+
+        for index, make_buffer in enumerate(makers):
+            directory = os.path.join(self.tmp_dir, str(index))
+
+            ebuffer = make_buffer()
+            for i in range(3):
+                ebuffer.push(make_sarsa(float(i)))
+            ebuffer.save_checkpoint_state(directory)
+            for i in range(3, 6):
+                ebuffer.push(make_sarsa(float(i)))
+            ebuffer.save_checkpoint_state(directory)
+
+            restored = make_buffer()
+            restored.restore_checkpoint_state(directory)
+            self.assertEqual(rewards(restored), rewards(ebuffer))
+
+
+unittest.main()
@@ -0,0 +1,149 @@
+import numpy as np
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from advantage.buffers.index_set import IndexSet
+
+""" Columnar Replay Buffer sampling contiguous windows of episodes
+"""
+
+class SequenceReplayBuffer(ColumnarReplayBuffer):
+    """ Columnar buffer whose slots are written sequentially, so each
+    episode is stored contiguously in the ring. Every slot records the id
+    of the episode it belongs to (`episode_ids`); a new episode starts
+    after a `done`.
+
+    Samples are windows of `sequence_length` consecutive transitions of one
+    episode, returned as one stacked Element with attrs of shape
+    [batch, sequence_length, ...]. The slots a valid window can start at
+    are kept in an `IndexSet`, updated on every push, so sampling is
+    O(batch). Episodes shorter than `sequence_length` are never sampled.
+
+    Popping removes the sampled windows' starts, overlapping windows
+    stay valid.
+    """
+
+    def __init__(self, buffer_size, element_cls, dims, sequence_length, seed=None, storage=None):
+        """
+            Args:
+                buffer_size: number of transitions to preallocate for
+                element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                dims: column dimensions from `Environment.dims`
+                sequence_length: number of transitions per sampled window
+                seed: seed for the sampling np.random.Generator
+                storage: per attr storage (see ColumnarReplayBuffer)
+
+            Raises:
+                ValueError: sequence_length doesn't fit the buffer
+        """
+        if not 0 < sequence_length <= buffer_size:
+            raise ValueError("sequence_length must be in [1, buffer_size]")
+
+        self._sequence_length = sequence_length
+
+        self._valid_starts = IndexSet(buffer_size)
+
+        self._episode_ids = np.full(buffer_size, -1, dtype=np.int64)
+        self._episode = 0
+        self._episode_length = 0
+
+        # next slot to write and total number of writes
+        self._write = 0
+        self._num_written = 0
+
+        super().__init__(buffer_size, element_cls, dims, seed, storage=storage)
+
+    @property
+    def sequence_length(self):
+        """ property for `_sequence_length`
+        """
+        return self._sequence_length
+
+    @property
+    def episode_ids(self):
+        """ property for `_episode_ids`
+        """
+        return self._episode_ids
+
+    @property
+    def nbytes(self):
+        return super().nbytes + self._episode_ids.nbytes + self._valid_starts.nbytes
+
+    @classmethod
+    def estimate_transition_bytes(cls, element_cls, dims, storage=None, **options):
+        # episode id and valid start IndexSet
+        return super().estimate_transition_bytes(element_cls, dims, storage) + 3 * np.dtype(np.int64).itemsize
+
+    def push(self, item):
+        """ Writes the next transition of the current episode
+                Args:
+                    item: Element of type `element_cls`
+        """
+        slot = self._write
+        self._write = (self._write + 1) % self._buffer_size
+        self._num_written += 1
+
+        # windows containing the overwritten slot
+        for offset in range(self._sequence_length):
+            self._valid_starts.remove((slot - offset) % self._buffer_size)
+
+        for name, column in self._columns.items():
+            column[slot] = getattr(item, name)
+
+        self._seqs[slot] = self._take_seq()
+        self._episode_ids[slot] = self._episode
+        self._episode_length += 1
+
+        if self._episode_length >= self._sequence_length:
+            self._valid_starts.add((slot - self._sequence_length + 1) % self._buffer_size)
+
+        if np.any(item.done):
+            self._episode += 1
+            self._episode_length = 0
+
+        self._cur_buffer_size = len(self._valid_starts)
+
+    def _windows(self, starts):
+        """ Slots of the windows beginning at `starts`
+
+                Args:
+                    starts: np.ndarray of start slots
+
+                Returns:
+                    np.ndarray [batch, sequence_length]
+        """
+        return (np.expand_dims(starts, axis=1) + np.arange(self._sequence_length)) % self._buffer_size
+
+    def _gather(self, slots):
+        return super()._gather(self._windows(slots))
+
+    def _remove(self, slots):
+        self._valid_starts.remove_many(slots)
+        self._cur_buffer_size = len(self._valid_starts)
+
+    def _random_slots(self, num):
+        return self._valid_starts.sample(self._rng, num)
+
+    def _written_slots(self):
+        """ Written slots, oldest first
+        """
+        num = min(self._num_written, self._buffer_size)
+        return (self._write - num + np.arange(num)) % self._buffer_size
+
+    def _ordered_slots(self, num):
+        # window starts oldest first; O(buffer_size)
+        slots = self._written_slots()
+        return slots[self._valid_starts.contains(slots)][:num]
+
+    def _live_slots(self):
+        return self._written_slots()
+
+    def _rows_since(self, seq):
+        slots = self._live_slots()
+        slots = slots[self._seqs[slots] >= seq]
+        return super()._gather(slots).unzip_to_dict(), self._seqs[slots]
+
+    def _load_rows(self, attrs, seqs):
+        # pushed one by one so episodes and windows are rebuilt
+        for index, seq in enumerate(seqs):
+            self._next_seq = seq
+            self.push(self._element_cls.make_element_from_dict_trusted({name: value[index]
+                                                                        for name, value in attrs.items()}))
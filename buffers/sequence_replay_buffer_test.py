@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+from advantage.buffers.sequence_replay_buffer import SequenceReplayBuffer
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import make_dims, make_sarsa
+
+DIMS = make_dims((2, 2))
+
+def push_episode(ebuffer, values):
+    for index, value in enumerate(values):
+        ebuffer.push(make_sarsa(float(value), done=index == len(values) - 1, dims=DIMS))
+
+class TestSequenceReplayBuffer(unittest.TestCase):
+    """ Tests for the various functionalities of the SequenceReplayBuffer """
+
+    def test_windows_within_episodes(self):
+        ebuffer = SequenceReplayBuffer(16, Sarsa, DIMS, 3, seed=0)
+
+        push_episode(ebuffer, [0, 1, 2, 3])
+        push_episode(ebuffer, [10, 11])
+        push_episode(ebuffer, [20, 21, 22])
+
+        # starts 0 and 1 of the first episode, 20 of the last
+        self.assertEqual(ebuffer.len, 3)
+        np.testing.assert_array_equal(ebuffer.episode_ids[:9], np.array([0, 0, 0, 0, 1, 1, 2, 2, 2]))
+
+        batch = ebuffer.random_sample(3)
+        self.assertEqual(batch.state.shape, (3, 3, 2, 2))
+        self.assertEqual(batch.reward.shape, (3, 3, 1))
+
+        starts = sorted(batch.reward[:, 0, 0].tolist())
+        self.assertEqual(starts, [0., 1., 20.])
+        np.testing.assert_array_equal(batch.reward[:, 1:, 0], batch.reward[:, :-1, 0] + 1)
+
+        with self.assertRaises(ValueError):
+            ebuffer.random_sample(4)
+
+    def test_wrap_invalidates_overwritten(self):
+        ebuffer = SequenceReplayBuffer(4, Sarsa, DIMS, 2)
+
+        push_episode(ebuffer, [0, 1, 2, 3, 4, 5])
+
+        # slots hold 4, 5, 2, 3
+        self.assertEqual(ebuffer.len, 3)
+
+        batch = ebuffer.sample(3)
+        np.testing.assert_array_equal(batch.reward[:, :, 0], np.array([[2., 3.], [3., 4.], [4., 5.]]))
+
+    def test_pop(self):
+        ebuffer = SequenceReplayBuffer(8, Sarsa, DIMS, 2, seed=1)
+
+        push_episode(ebuffer, [0, 1, 2, 3])
+
+        batch = ebuffer.random_sample_and_pop(2)
+        self.assertEqual(ebuffer.len, 1)
+
+        rest = ebuffer.sample_and_pop(1)
+        self.assertEqual(sorted(batch.reward[:, 0, 0].tolist() + rest.reward[:, 0, 0].tolist()),
+                         [0., 1., 2.])
+        self.assertEqual(ebuffer.len, 0)
+
+    def test_stack_keeps_time_axis(self):
+        ebuffer = SequenceReplayBuffer(8, Sarsa, DIMS, 2)
+
+        push_episode(ebuffer, [0, 1, 2])
+
+        stacked = Sarsa.stack(ebuffer.sample(2))
+        self.assertEqual(stacked.next_state.shape, (2, 2, 2, 2))
+
+
+unittest.main()
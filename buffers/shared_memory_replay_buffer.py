@@ -0,0 +1,391 @@
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+
+""" Columnar Replay Buffer living in shared memory so
+actor processes and a learner process share experience.
+"""
+
+# byte alignment of each array in the shared block
+_ALIGNMENT = 64
+
+class SharedMemoryReplayBuffer(ColumnarReplayBuffer):
+    """ Columnar buffer whose columns (and bookkeeping) live in one
+    `multiprocessing.shared_memory` block. The ring is split into one
+    segment per writer, so each actor process writes its own slots and
+    no locks are needed.
+
+    A writer copies an element into its next slot and then publishes it
+    by storing its new write count (`cursors`, one aligned int64 store).
+    Readers only look at published slots and skip the slot each writer
+    overwrites next. After copying a batch they re-read the cursors and
+    drop the slots a writer has since overwritten or started to overwrite
+    (seqlock style), so under heavy pushing a batch can be smaller than
+    requested. Pops are checked the same way, only a writer finishing a
+    whole push between that check and the store of the popped flags can
+    still overwrite a popped slot unnoticed.
+
+    The process creating the buffer (usually the learner) owns the block.
+    Actor processes call `attach` with a `handle` and push. Sampling and
+    popping are done by the owner only.
+    """
+
+    def __init__(self,
+                 buffer_size,
+                 element_cls,
+                 dims,
+                 num_writers=1,
+                 writer=0,
+                 name=None,
+                 seed=None):
+        """
+            Args:
+                buffer_size: total number of elements, split
+                    evenly between the writers
+                element_cls: the Element type pushed to the buffer (i.e. Sarsa)
+                dims: column dimensions from `Environment.dims`
+                num_writers: number of processes pushing elements
+                writer: index of the segment `push` writes to
+                name: name of an existing block to attach to, creates one if None
+                seed: seed for the sampling np.random.Generator
+
+            Raises:
+                ValueError: segments would have less than two slots
+        """
+        if buffer_size < 2 * num_writers:
+            raise ValueError("SharedMemoryReplayBuffer needs at least 2 slots per writer")
+
+        if not 0 <= writer < num_writers:
+            raise ValueError("writer must be in [0, %d)" % num_writers)
+
+        self._num_writers = num_writers
+        self._writer = writer
+        self._segment_size = buffer_size // num_writers
+
+        self._dims = dims
+        self._owner = name is None
+        self._shm = None
+
+        self._shm_name = name
+
+        super().__init__(buffer_size, element_cls, dims, seed)
+
+    @property
+    def name(self):
+        """ name of the shared memory block
+        """
+        return self._shm.name
+
+    @property
+    def num_writers(self):
+        """ property for `_num_writers`
+        """
+        return self._num_writers
+
+    @property
+    def len(self):
+        return self._shared_len()
+
+    def handle(self, writer):
+        """ Everything an actor process needs to `attach` (picklable)
+
+                Args:
+                    writer: segment the actor pushes to
+
+                Returns:
+                    tuple handle
+        """
+        return (self._shm.name,
+                self._buffer_size,
+                self._element_cls,
+                self._dims,
+                self._num_writers,
+                writer)
+
+    @classmethod
+    def attach(cls, handle):
+        """ Attaches to a buffer created by another process
+
+                Args:
+                    handle: returned by `handle`
+
+                Returns:
+                    SharedMemoryReplayBuffer
+        """
+        name, buffer_size, element_cls, dims, num_writers, writer = handle
+
+        return cls(buffer_size,
+                   element_cls,
+                   dims,
+                   num_writers=num_writers,
+                   writer=writer,
+                   name=name)
+
+    def _allocate_columns(self):
+        num_writers = self._num_writers
+
+        specs = [("cursors", (num_writers,), np.dtype(np.int64)),
+                 ("pop_counts", (num_writers,), np.dtype(np.int64)),
+                 ("reclaim_counts", (num_writers,), np.dtype(np.int64)),
+                 ("popped", (self._buffer_size,), np.dtype(np.bool_))]
+
+        specs += [(name, shape, np.dtype(dtype)) for name, (shape, dtype) in self._column_specs.items()]
+
+        offsets = []
+        size = 0
+        for _, shape, dtype in specs:
+            offsets.append(size)
+            nbytes = int(np.prod(shape)) * dtype.itemsize
+            size += -(-nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        if self._owner:
+            self._shm = SharedMemory(create=True, size=size)
+        else:
+            # processes started by multiprocessing share the owner's resource
+            # tracker, so the block is freed once, when the owner unlinks it
+            self._shm = SharedMemory(name=self._shm_name)
+
+        views = {name: np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=offset)
+                 for (name, shape, dtype), offset in zip(specs, offsets)}
+
+        self._cursors = views.pop("cursors")
+        self._pop_counts = views.pop("pop_counts")
+        self._reclaim_counts = views.pop("reclaim_counts")
+        self._popped = views.pop("popped")
+
+        return views
+
+    @property
+    def nbytes(self):
+        """ bytes of the shared block
+        """
+        return self._shm.size
+
+    @classmethod
+    def estimate_transition_bytes(cls, element_cls, dims, **options):
+        # popped flag
+        return super().estimate_transition_bytes(element_cls, dims) + np.dtype(np.bool_).itemsize
+
+    def _record_sample_age(self, slots):
+        """ Sequence numbers are local to each writer process,
+        so sample ages aren't tracked
+        """
+        pass
+
+    def close(self):
+        """ Detaches from the block. The owner also frees it.
+        """
+        if self._shm is None:
+            return
+
+        self._columns = {}
+        self._cursors = self._pop_counts = self._reclaim_counts = self._popped = None
+
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def push(self, item):
+        """ Writes an element into this process' segment
+        and then publishes it
+                Args:
+                    item: Element of type `element_cls`
+        """
+        self._write_row({name: getattr(item, name) for name in self._columns})
+
+    def extend(self, attrs):
+        """ Writes elements one at a time so each is published in order
+                Args:
+                    attrs: dict of every Element attr to np.ndarray [num, ...]
+        """
+        for index in range(next(iter(attrs.values())).shape[0]):
+            self._write_row({name: attrs[name][index] for name in self._columns})
+
+    def _write_row(self, row):
+        """ Writes one element into this process' segment and publishes it
+
+                Args:
+                    row: dict of attr name to value
+        """
+        writer = self._writer
+        cursor = int(self._cursors[writer])
+        slot = writer * self._segment_size + cursor % self._segment_size
+
+        if cursor >= self._segment_size and self._popped[slot]:
+            self._reclaim_counts[writer] += 1
+
+        for name, column in self._columns.items():
+            column[slot] = row[name]
+
+        self._popped[slot] = False
+
+        self._cursors[writer] = cursor + 1
+
+    def _windows(self):
+        """ Published slots of each writer from a snapshot of the cursors
+
+                Returns:
+                    tuple of (np.ndarray of slot counts, np.ndarray of the
+                        oldest slot offset in each segment, np.ndarray of
+                        the cursor snapshot)
+        """
+        cursors = self._cursors.copy()
+        wrapped = cursors >= self._segment_size
+
+        counts = np.where(wrapped, self._segment_size - 1, cursors)
+        starts = np.where(wrapped, (cursors + 1) % self._segment_size, 0)
+
+        return counts, starts, cursors
+
+    def _shared_len(self):
+        """ Number of published elements not popped
+        """
+        counts, _, cursors = self._windows()
+
+        popped = self._pop_counts - self._reclaim_counts
+
+        # a popped slot about to be overwritten is already outside its window
+        writers = np.flatnonzero(cursors >= self._segment_size)
+        next_slots = writers * self._segment_size + cursors[writers] % self._segment_size
+        excluded = np.count_nonzero(self._popped[next_slots])
+
+        return max(int(counts.sum() - popped.sum() + excluded), 0)
+
+    def _check_batch_size(self, batch_size, sample_less):
+        self._cur_buffer_size = self._shared_len()
+        return super()._check_batch_size(batch_size, sample_less)
+
+    def _index_to_slots(self, indices, counts, starts):
+        """ Maps indices into the concatenated windows to slots
+
+                Args:
+                    indices: np.ndarray in [0, counts.sum())
+                    counts: as from `_windows`
+                    starts: as from `_windows`
+
+                Returns:
+                    np.ndarray of slot indices
+        """
+        bounds = np.cumsum(counts)
+        writers = np.searchsorted(bounds, indices, side="right")
+        local = indices - (bounds[writers] - counts[writers])
+        return writers * self._segment_size + (starts[writers] + local) % self._segment_size
+
+    def _live_slots(self):
+        counts, starts, _ = self._windows()
+        slots = self._index_to_slots(np.arange(counts.sum()), counts, starts)
+        return slots[~self._popped[slots]]
+
+    def _random_slots(self, num, max_rounds=4):
+        """ Rejection samples distinct unpopped slots, falling
+        back to scanning all windows if too many are popped
+        """
+        counts, starts, _ = self._windows()
+        total = int(counts.sum())
+
+        slots = np.zeros(0, dtype=np.int64)
+
+        for _ in range(max_rounds):
+            missing = num - slots.shape[0]
+            if missing <= 0:
+                return slots[:num]
+
+            indices = self._rng.choice(total, size=min(total, 2 * missing), replace=False)
+            candidates = self._index_to_slots(indices, counts, starts)
+            candidates = candidates[~self._popped[candidates]]
+            candidates = candidates[np.isin(candidates, slots, invert=True)]
+
+            slots = np.concatenate([slots, candidates[:missing]])
+
+        if slots.shape[0] >= num:
+            return slots[:num]
+
+        rest = self._live_slots()
+        rest = rest[np.isin(rest, slots, invert=True)]
+        extra = self._rng.choice(rest, size=min(num - slots.shape[0], rest.shape[0]), replace=False)
+
+        return np.concatenate([slots, extra])
+
+    def _ordered_slots(self, num):
+        # oldest first within each writer's segment
+        return self._live_slots()[:num]
+
+    def _passed(self, slots, cursors):
+        """ Re-reads the cursors to find the slots a writer has
+        overwritten, or is overwriting, since `cursors`
+
+                Args:
+                    slots: np.ndarray of slots published at `cursors`
+                    cursors: cursor snapshot
+
+                Returns:
+                    np.ndarray of bool
+        """
+        writers = slots // self._segment_size
+
+        # write count of the element each slot held at `cursors`
+        last = cursors[writers] - 1
+        counts = last - (last - slots % self._segment_size) % self._segment_size
+
+        # the write at cursor c is to the slot of write c - segment_size
+        return self._cursors[writers] - counts >= self._segment_size
+
+    def _sample_slots(self, batch_size, sample_less, choose_slots, pop):
+        """ Samples slots chosen by `choose_slots`, dropping
+        those a writer passed while they were read
+
+                Args:
+                    batch_size: number of samples to collect
+                    sample_less: whether to allow sampling less than requested amount
+                    choose_slots: `_random_slots` or `_ordered_slots`
+                    pop: whether to remove the sampled elements
+
+                Returns:
+                    stacked Element
+        """
+        num = self._check_batch_size(batch_size, sample_less)
+
+        # slots are chosen from windows at these cursors or later
+        cursors = self._cursors.copy()
+        slots = choose_slots(num)
+
+        batch = self._gather(slots)
+        passed = self._passed(slots, cursors)
+
+        while passed.any():
+            slots = slots[~passed]
+            batch = self._gather(slots)
+            passed = self._passed(slots, cursors)
+
+        if pop:
+            self._remove(slots[~self._passed(slots, cursors)])
+
+        return batch
+
+    def random_sample(self, batch_size, sample_less=False):
+        return self._sample_slots(batch_size, sample_less, self._random_slots, pop=False)
+
+    def random_sample_and_pop(self, batch_size, sample_less=False):
+        return self._sample_slots(batch_size, sample_less, self._random_slots, pop=True)
+
+    def sample(self, batch_size, sample_less=False):
+        return self._sample_slots(batch_size, sample_less, self._ordered_slots, pop=False)
+
+    def sample_and_pop(self, batch_size, sample_less=False):
+        return self._sample_slots(batch_size, sample_less, self._ordered_slots, pop=True)
+
+    def _remove(self, slots):
+        self._popped[slots] = True
+        np.add.at(self._pop_counts, slots // self._segment_size, 1)
+
+    def save_checkpoint_state(self, directory):
+        """ Shared blocks only live as long as the run
+        that owns them, so they aren't checkpointed
+        """
+        pass
+
+    def restore_checkpoint_state(self, directory):
+        """ See `save_checkpoint_state`
+        """
+        pass
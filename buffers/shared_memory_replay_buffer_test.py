@@ -0,0 +1,95 @@
+import unittest
+import multiprocessing
+import numpy as np
+from advantage.buffers.shared_memory_replay_buffer import SharedMemoryReplayBuffer
+from advantage.elements.sarsa import Sarsa
+from advantage.buffers.testing import DIMS, make_sarsa
+
+def actor(handle, values):
+    ebuffer = SharedMemoryReplayBuffer.attach(handle)
+    for value in values:
+        ebuffer.push(make_sarsa(value))
+    ebuffer.close()
+
+class TestSharedMemoryReplayBuffer(unittest.TestCase):
+    """ Tests for the various functionalities of the SharedMemoryReplayBuffer """
+
+    def setUp(self):
+        self.ebuffer = SharedMemoryReplayBuffer(8, Sarsa, DIMS, num_writers=2, seed=0)
+
+    def tearDown(self):
+        self.ebuffer.close()
+
+    def test_actor_processes(self):
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=actor,
+                                     args=(self.ebuffer.handle(writer),
+                                           [float(10 * writer + i) for i in range(3)]))
+                     for writer in range(2)]
+
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        self.assertEqual(self.ebuffer.len, 6)
+
+        batch = self.ebuffer.random_sample(6)
+        self.assertEqual(sorted(batch.reward.ravel().tolist()), [0., 1., 2., 10., 11., 12.])
+        np.testing.assert_array_equal(batch.next_state, batch.state + 1)
+
+    def test_wrap_skips_next_slot(self):
+        for i in range(5):
+            self.ebuffer.push(make_sarsa(float(i)))
+
+        # segment of 4 slots, the slot written next isn't sampled
+        self.assertEqual(self.ebuffer.len, 3)
+        np.testing.assert_array_equal(self.ebuffer.sample(3).reward.ravel(), np.array([2., 3., 4.]))
+
+    def test_pop(self):
+        for i in range(3):
+            self.ebuffer.push(make_sarsa(float(i)))
+
+        batch = self.ebuffer.random_sample_and_pop(2)
+        self.assertEqual(self.ebuffer.len, 1)
+
+        rest = self.ebuffer.sample(1)
+        self.assertEqual(sorted(batch.reward.ravel().tolist() + rest.reward.ravel().tolist()),
+                         [0., 1., 2.])
+
+        with self.assertRaises(ValueError):
+            self.ebuffer.random_sample(2)
+
+        # overwriting popped slots makes them live again
+        for i in range(3, 7):
+            self.ebuffer.push(make_sarsa(float(i)))
+        self.assertEqual(self.ebuffer.len, 3)
+        np.testing.assert_array_equal(self.ebuffer.sample(3).reward.ravel(), np.array([4., 5., 6.]))
+
+    def test_drops_slots_overwritten_while_read(self):
+        for i in range(6):
+            self.ebuffer.push(make_sarsa(float(i)))
+
+        gather = self.ebuffer._gather
+
+        def racing_gather(slots):
+            # the writer pushes twice while the first batch is copied
+            self.ebuffer._gather = gather
+            self.ebuffer.push(make_sarsa(6.))
+            self.ebuffer.push(make_sarsa(7.))
+            return gather(slots)
+
+        self.ebuffer._gather = racing_gather
+
+        batch = self.ebuffer.random_sample_and_pop(3)
+
+        # 3 was overwritten by 7 and 4 is in the slot written next
+        np.testing.assert_array_equal(batch.reward.ravel(), [5.])
+        np.testing.assert_array_equal(batch.next_state, batch.state + 1)
+
+        # only 5 was popped
+        self.assertEqual(self.ebuffer.len, 2)
+        self.assertEqual(sorted(self.ebuffer.sample(2).reward.ravel().tolist()), [6., 7.])
+
+
+unittest.main()
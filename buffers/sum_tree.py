@@ -0,0 +1,143 @@
+import numpy as np
+
+""" Array-backed segment trees used by prioritized buffers.
+All operations are batched over np.ndarray's of leaf indices.
+"""
+
+class SegmentTree:
+    """ Complete binary tree stored in one array. Leaves start
+    at `_num_leaves` (a power of two) and each parent holds
+    `_operation` of its two children.
+    """
+
+    def __init__(self, capacity, operation, neutral):
+        """
+            Args:
+                capacity: number of leaves required
+                operation: numpy ufunc combining children (i.e. np.add)
+                neutral: neutral element of `operation`
+        """
+        self._capacity = capacity
+
+        num_leaves = 2
+        while num_leaves < capacity:
+            num_leaves *= 2
+
+        self._num_leaves = num_leaves
+        self._operation = operation
+        self._neutral = neutral
+        self._tree = np.full(2 * num_leaves, neutral, dtype=np.float64)
+
+    @property
+    def capacity(self):
+        """ property for `_capacity`
+        """
+        return self._capacity
+
+    @property
+    def nbytes(self):
+        """ bytes of the tree array
+        """
+        return self._tree.nbytes
+
+    @property
+    def root(self):
+        """ Reduction over all leaves
+        """
+        return self._tree[1]
+
+    def get(self, indices):
+        """ Fetches leaf values
+
+                Args:
+                    indices: np.ndarray of leaf indices
+
+                Returns:
+                    np.ndarray of values
+        """
+        return self._tree[np.asarray(indices) + self._num_leaves]
+
+    def update(self, indices, values):
+        """ Sets leaf values and recomputes their ancestors.
+        O(batch * log(capacity))
+
+                Args:
+                    indices: np.ndarray of leaf indices
+                    values: np.ndarray of new values
+        """
+        nodes = np.asarray(indices, dtype=np.int64) + self._num_leaves
+        if not nodes.shape[0]:
+            return
+
+        self._tree[nodes] = values
+
+        # all nodes are on the same level, so the root is reached by all at once
+        while nodes[0] > 1:
+            nodes = np.unique(nodes // 2)
+            self._tree[nodes] = self._operation(self._tree[2 * nodes],
+                                                self._tree[2 * nodes + 1])
+
+
+class SumTree(SegmentTree):
+    """ Segment tree of sums allowing O(log N) proportional sampling
+    """
+
+    def __init__(self, capacity):
+        super().__init__(capacity, np.add, 0.0)
+
+    @property
+    def total(self):
+        """ Sum of all leaves
+        """
+        return self.root
+
+    def find_prefix_sum(self, prefix_sums):
+        """ For each prefix sum finds the leaf `i` such that
+        sum(leaves[:i]) <= prefix_sum < sum(leaves[:i + 1]).
+        Descends all queries at once level by level.
+
+                Args:
+                    prefix_sums: np.ndarray of values in [0, total)
+
+                Returns:
+                    np.ndarray of leaf indices
+        """
+        values = np.array(prefix_sums, dtype=np.float64)
+        nodes = np.ones(values.shape, dtype=np.int64)
+
+        while nodes[0] < self._num_leaves:
+            left = 2 * nodes
+            left_sum = self._tree[left]
+            go_right = values >= left_sum
+            values = np.where(go_right, values - left_sum, values)
+            nodes = left + go_right
+
+        leaves = nodes - self._num_leaves
+        # guards against float round off selecting trailing empty leaves
+        return np.minimum(leaves, self._capacity - 1)
+
+
+class MinTree(SegmentTree):
+    """ Segment tree of minimums
+    """
+
+    def __init__(self, capacity):
+        super().__init__(capacity, np.minimum, np.inf)
+
+    @property
+    def min(self):
+        """ Minimum over all leaves
+        """
+        return self.root
+
+    def argmin(self):
+        """ Leaf holding the minimum. O(log N)
+
+                Returns:
+                    leaf index
+        """
+        node = 1
+        while node < self._num_leaves:
+            left = 2 * node
+            node = left if self._tree[left] <= self._tree[left + 1] else left + 1
+        return node - self._num_leaves
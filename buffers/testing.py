@@ -0,0 +1,32 @@
+import numpy as np
+from advantage.elements.sarsa import Sarsa
+
+""" Elements shared by the replay buffer tests
+"""
+
+def make_dims(state_col_dim=2):
+    """ `Environment.dims` of an MDP whose states have shape `state_col_dim`
+    """
+    return {"state_col_dim": state_col_dim,
+            "action_col_dim": 1,
+            "reward_col_dim": 1,
+            "next_state_col_dim": state_col_dim}
+
+DIMS = make_dims()
+
+def make_sarsa(value, done=False, dims=DIMS):
+    """ Sarsa whose state is filled with `value`, next_state with
+    `value + 1` and whose reward is `value`, so consecutive values
+    make up one trajectory
+    """
+    return Sarsa.make_element(state=np.full(dims["state_col_dim"], value, dtype=np.float32),
+                              action=np.array([1.], dtype=np.float32),
+                              reward=np.array([value], dtype=np.float32),
+                              done=np.array([done], dtype=np.bool_),
+                              next_state=np.full(dims["next_state_col_dim"], value + 1, dtype=np.float32))
+
+def stack_sarsas(values, dims=DIMS):
+    """ `extend` attrs of `make_sarsa` of each value
+    """
+    rows = [make_sarsa(float(value), dims=dims) for value in values]
+    return {name: np.stack([getattr(row, name) for row in rows]) for name in rows[0].unzip_to_dict()}
@@ -0,0 +1,331 @@
+from collections import deque
+import os
+import queue
+import re
+import threading
+import numpy as np
+
+""" Archives collected transitions to sharded files on a writer
+thread, so acting doesn't wait on disk writes
+"""
+
+class TransitionExporter:
+    """ Batches transitions into shards of `shard_size` and writes them
+    from a background thread to `directory`, named
+    `<prefix>-<index>.npz` or `<prefix>-<index>.tfrecord`:
+        `.npz`: one array [shard_size, ...] per Element attr, the format
+            read by DatasetLoader
+        `.tfrecord`: one tf.train.Example per transition with a flattened
+            feature per attr (floats, booleans as int64)
+
+    Batches wait for the writer in a queue of `queue_size` batches. When it
+    is full `export` blocks (BLOCK) or drops the batch and counts it (DROP).
+    Shard indices continue after the shards already in `directory`, and
+    past `max_shards` the oldest shards are deleted. `close` writes the
+    last, partial shard.
+
+    An exception raised by the writer is raised by the next `export`
+    or `close`, batches exported after it are discarded.
+    """
+
+    NPZ = "npz"
+    TFRECORD = "tfrecord"
+
+    BLOCK = "block"
+    DROP = "drop"
+
+    # seconds between checks for writer errors while blocked
+    _POLL_SEC = 0.1
+
+    # queued by `close` to stop the writer
+    _CLOSE = object()
+
+    def __init__(self,
+                 directory,
+                 shard_size=10000,
+                 file_format=NPZ,
+                 queue_size=64,
+                 policy=BLOCK,
+                 max_shards=None,
+                 prefix="transitions"):
+        """
+            Args:
+                directory: directory of the shards, made if it doesn't exist
+                shard_size: transitions per shard
+                file_format: NPZ or TFRECORD
+                queue_size: maximum batches waiting for the writer
+                policy: BLOCK or DROP, when the queue is full
+                max_shards: maximum shards kept, all if None
+                prefix: shard file name prefix
+
+            Raises:
+                ValueError: invalid argument
+        """
+        if shard_size < 1 or queue_size < 1:
+            raise ValueError("shard_size and queue_size must be at least 1")
+
+        if file_format not in (self.NPZ, self.TFRECORD):
+            raise ValueError("Unknown export format %s" % file_format)
+
+        if policy not in (self.BLOCK, self.DROP):
+            raise ValueError("Unknown queue policy %s" % policy)
+
+        if max_shards is not None and max_shards < 1:
+            raise ValueError("max_shards must be at least 1")
+
+        self._directory = directory
+        self._shard_size = shard_size
+        self._file_format = file_format
+        self._policy = policy
+        self._max_shards = max_shards
+        self._prefix = prefix
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._shards = deque(self._find_shards())
+        self._next_index = self._shard_index(self._shards[-1]) + 1 if self._shards else 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+
+        # written only by the writer thread
+        self._pending = []
+        self._num_pending = 0
+
+        self._num_exported = 0
+        self._num_dropped = 0
+
+        self._error = None
+        self._thread = None
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, config, checkpoint_dir_path):
+        """ Builds the TransitionExporter from the `Export` protobuf
+
+                Args:
+                    config: Export protobuf config
+                    checkpoint_dir_path: `Config` checkpoint directory
+
+                Returns:
+                    TransitionExporter
+        """
+        fields = config.DESCRIPTOR.fields_by_name
+        enum_name = lambda field: fields[field].enum_type.values_by_number[getattr(config, field)].name
+
+        return cls(os.path.join(checkpoint_dir_path, config.directory),
+                   config.shard_size,
+                   enum_name("format").lower(),
+                   config.queue_size,
+                   enum_name("policy").lower(),
+                   config.max_shards if config.HasField("max_shards") else None)
+
+    @property
+    def shards(self):
+        """ paths of the shards kept, oldest first
+        """
+        return list(self._shards)
+
+    @property
+    def num_exported(self):
+        """ number of transitions written to shards
+        """
+        return self._num_exported
+
+    @property
+    def num_dropped(self):
+        """ number of transitions dropped on a full queue
+        """
+        return self._num_dropped
+
+    def _shard_index(self, path):
+        return int(os.path.basename(path)[len(self._prefix) + 1:].split(".")[0])
+
+    def _find_shards(self):
+        """ Shards of a previous run in `directory`
+
+                Returns:
+                    list of paths in index order
+        """
+        pattern = re.compile(r"%s-\d+\.%s$" % (re.escape(self._prefix), self._file_format))
+
+        paths = [os.path.join(self._directory, name) for name in os.listdir(self._directory)
+                 if pattern.match(name)]
+
+        return sorted(paths, key=self._shard_index)
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run,
+                                        name="TransitionExporter",
+                                        daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        """ Blocks until there is room in the queue
+
+                Raises:
+                    the exception raised by the writer
+        """
+        while True:
+            self._raise_error()
+            try:
+                self._queue.put(item, timeout=self._POLL_SEC)
+                return
+            except queue.Full:
+                pass
+
+    def export(self, batch):
+        """ Queues transitions for the writer. Arrays are copied,
+        so the caller can reuse them.
+
+                Args:
+                    batch: stacked Element (i.e. SarsaBatch) or dict
+                        with attrs [N, ...]
+
+                Returns:
+                    False if the batch was dropped
+
+                Raises:
+                    ValueError: exporter was closed
+                    the exception raised by the writer
+        """
+        if self._closed:
+            raise ValueError("Can't export to a closed TransitionExporter")
+
+        self._raise_error()
+
+        attrs = batch if isinstance(batch, dict) else batch.unzip_to_dict()
+        chunk = {name: np.array(value) for name, value in attrs.items()}
+
+        num = next(iter(chunk.values())).shape[0] if chunk else 0
+
+        if not num:
+            return True
+
+        if self._thread is None:
+            self._start()
+
+        if self._policy == self.BLOCK:
+            self._put(chunk)
+            return True
+
+        try:
+            self._queue.put_nowait(chunk)
+            return True
+        except queue.Full:
+            self._num_dropped += num
+            return False
+
+    def close(self):
+        """ Writes the queued transitions and the last (partial) shard,
+        then stops the writer. Safe to call more than once.
+
+                Raises:
+                    the exception raised by the writer
+        """
+        if not self._closed and self._thread is not None:
+            self._put(self._CLOSE)
+            self._thread.join()
+            self._thread = None
+
+        self._closed = True
+
+        self._raise_error()
+
+    def _run(self):
+        """ Writer loop
+        """
+        while True:
+            chunk = self._queue.get()
+
+            if self._error is not None:
+                # keeps draining, so `export` never blocks on a dead writer
+                if chunk is self._CLOSE:
+                    return
+                continue
+
+            try:
+                if chunk is self._CLOSE:
+                    if self._num_pending:
+                        self._write_shard(self._take(self._num_pending))
+                    return
+
+                self._pending.append(chunk)
+                self._num_pending += next(iter(chunk.values())).shape[0]
+
+                while self._num_pending >= self._shard_size:
+                    self._write_shard(self._take(self._shard_size))
+
+            except Exception as error: # pylint: disable=broad-except
+                # reason-disabled: re-raised by `export` or `close`
+                self._error = error
+
+                if chunk is self._CLOSE:
+                    return
+
+    def _take(self, num):
+        """ Removes the first `num` pending transitions
+
+                Returns:
+                    dict of attr name to np.ndarray [num, ...]
+        """
+        attrs = {name: np.concatenate([chunk[name] for chunk in self._pending])
+                 for name in self._pending[0]}
+
+        self._pending = [{name: value[num:] for name, value in attrs.items()}]
+        self._num_pending -= num
+
+        if not self._num_pending:
+            self._pending = []
+
+        return {name: value[:num] for name, value in attrs.items()}
+
+    def _write_shard(self, attrs):
+        """ Writes one shard (atomically) and deletes
+        the oldest shards past `max_shards`
+        """
+        path = os.path.join(self._directory,
+                            "%s-%06d.%s" % (self._prefix, self._next_index, self._file_format))
+        tmp_path = path + ".tmp"
+
+        if self._file_format == self.NPZ:
+            with open(tmp_path, "wb") as tmp_file:
+                np.savez(tmp_file, **attrs)
+        else:
+            self._write_tfrecord(tmp_path, attrs)
+
+        os.replace(tmp_path, path)
+
+        self._next_index += 1
+        self._num_exported += next(iter(attrs.values())).shape[0]
+
+        self._shards.append(path)
+
+        while self._max_shards is not None and len(self._shards) > self._max_shards:
+            os.remove(self._shards.popleft())
+
+    @staticmethod
+    def _write_tfrecord(path, attrs):
+        """ Writes a tf.train.Example per transition
+        """
+        # only needed for TFRECORD shards
+        import tensorflow as tf
+
+        def feature(value):
+            value = np.ravel(value)
+
+            if value.dtype.kind in "biu":
+                return tf.train.Feature(int64_list=tf.train.Int64List(value=value.astype(np.int64)))
+
+            return tf.train.Feature(float_list=tf.train.FloatList(value=value.astype(np.float32)))
+
+        num = next(iter(attrs.values())).shape[0]
+
+        with tf.python_io.TFRecordWriter(path) as writer:
+            for index in range(num):
+                example = tf.train.Example(features=tf.train.Features(
+                    feature={name: feature(value[index]) for name, value in attrs.items()}))
+                writer.write(example.SerializeToString())
@@ -0,0 +1,137 @@
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+from advantage.buffers.transition_exporter import TransitionExporter
+from advantage.buffers.dataset_loader import DatasetLoader
+from advantage.buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from advantage.elements.sarsa import Sarsa
+from advantage.elements.sarsa_batch import SarsaBatch
+from advantage.buffers.testing import DIMS
+
+def make_batch(values):
+    values = np.asarray(values, dtype=np.float32)
+    return SarsaBatch.make_element_from_rollout(np.stack([values, values], axis=1),
+                                                np.ones_like(values),
+                                                values,
+                                                values % 5 == 4,
+                                                np.stack([values + 1, values + 1], axis=1))
+
+class TestTransitionExporter(unittest.TestCase):
+    """ Tests for the TransitionExporter """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_shards(self):
+        exporter = TransitionExporter(self.directory.name, shard_size=4)
+
+        for start in range(0, 10, 3):
+            exporter.export(make_batch(range(start, min(start + 3, 10))))
+
+        exporter.close()
+
+        self.assertEqual(exporter.num_exported, 10)
+        self.assertEqual([os.path.basename(path) for path in exporter.shards],
+                         ["transitions-000000.npz", "transitions-000001.npz", "transitions-000002.npz"])
+
+        with np.load(exporter.shards[0]) as shard:
+            np.testing.assert_array_equal(shard["reward"][:, 0], [0., 1., 2., 3.])
+            self.assertEqual(shard["done"].dtype, np.bool_)
+
+        # the last shard is partial
+        with np.load(exporter.shards[2]) as shard:
+            np.testing.assert_array_equal(shard["state"][:, 0], [8., 9.])
+
+        # readable by the DatasetLoader
+        ebuffer = ColumnarReplayBuffer(16, Sarsa, DIMS)
+        self.assertEqual(DatasetLoader(self.directory.name, Sarsa, DIMS).load_into(ebuffer), 10)
+
+    def test_export_copies(self):
+        exporter = TransitionExporter(self.directory.name, shard_size=2)
+
+        batch = make_batch([1., 2.])
+        exporter.export(batch)
+        batch.reward[:] = 0.
+
+        exporter.close()
+
+        with np.load(exporter.shards[0]) as shard:
+            np.testing.assert_array_equal(shard["reward"][:, 0], [1., 2.])
+
+    def test_rotation(self):
+        exporter = TransitionExporter(self.directory.name, shard_size=2, max_shards=2)
+        exporter.export(make_batch(range(7)))
+        exporter.close()
+
+        self.assertEqual([os.path.basename(path) for path in exporter.shards],
+                         ["transitions-000002.npz", "transitions-000003.npz"])
+        self.assertEqual(sorted(os.listdir(self.directory.name)),
+                         ["transitions-000002.npz", "transitions-000003.npz"])
+
+        # a later run continues the indices
+        exporter = TransitionExporter(self.directory.name, shard_size=2, max_shards=2)
+        exporter.export(make_batch(range(2)))
+        exporter.close()
+
+        self.assertEqual([os.path.basename(path) for path in exporter.shards],
+                         ["transitions-000003.npz", "transitions-000004.npz"])
+
+    def test_drop(self):
+        exporter = TransitionExporter(self.directory.name, shard_size=2, queue_size=1,
+                                      policy=TransitionExporter.DROP)
+
+        # holds the writer in its first shard write
+        release = threading.Event()
+        started = threading.Event()
+        write_shard = exporter._write_shard
+
+        def blocked_write_shard(attrs):
+            started.set()
+            release.wait()
+            write_shard(attrs)
+
+        exporter._write_shard = blocked_write_shard
+
+        self.assertTrue(exporter.export(make_batch([0., 1.])))
+        started.wait()
+
+        self.assertTrue(exporter.export(make_batch([2., 3.])))
+        self.assertFalse(exporter.export(make_batch([4., 5., 6.])))
+        self.assertEqual(exporter.num_dropped, 3)
+
+        release.set()
+        exporter.close()
+
+        self.assertEqual(exporter.num_exported, 4)
+
+    def test_writer_error(self):
+        exporter = TransitionExporter(self.directory.name, shard_size=1)
+
+        def failing_write_shard(attrs):
+            raise IOError("disk full")
+
+        exporter._write_shard = failing_write_shard
+
+        exporter.export(make_batch([0.]))
+
+        with self.assertRaises(IOError):
+            exporter.close()
+
+        with self.assertRaises(ValueError):
+            exporter.export(make_batch([1.]))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            TransitionExporter(self.directory.name, shard_size=0)
+
+        with self.assertRaises(ValueError):
+            TransitionExporter(self.directory.name, file_format="csv")
+
+        with self.assertRaises(ValueError):
+            TransitionExporter(self.directory.name, policy="wait")
+
+if __name__ == "__main__":
+    unittest.main()
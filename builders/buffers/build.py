@@ -1,16 +1,149 @@
 from functools import partial
+import inspect
+import numpy as np
+import tensorflow as tf
 from advantage.protos.buffers import buffers_pb2
-from advantage.utils.proto_parsers import parse_which_one, parse_which_one_cls
+from advantage.utils.proto_parsers import parse_which_one, parse_which_one_cls, parse_enum_to_str
+from advantage.buffers.eviction import FIFOEviction, ReservoirEviction, LowestPriorityEviction
+from advantage.buffers.buffer_stats import BufferStats
+from advantage.buffers.column_storage import SKIP, PACKED_BITS
+from advantage.loggers.logger import Logger, PolledLogElement
 from advantage.builders.buffers.builders import BufferBuilders
 import advantage.buffers as buffers
 
 """Build function for constructing the various Buffers
 """
 
-def build_buffer(buffers_config):
+_EVICTIONS = {
+    "FIFO": FIFOEviction,
+    "RESERVOIR": ReservoirEviction,
+    "LOWEST_PRIORITY": LowestPriorityEviction
+}
+
+def parse_eviction(eviction):
+    """ Converts eviction from proto
+    into an EvictionPolicy
+
+        Args:
+            eviction: enum value from parsed protobuf
+
+        Returns:
+            EvictionPolicy
+    """
+    return _EVICTIONS[parse_enum_to_str(buffers_pb2,
+                                        "eviction",
+                                        eviction)]()
+
+_STORAGES = {
+    "FLOAT32": np.float32,
+    "FLOAT16": np.float16,
+    "UINT8": np.uint8,
+    "INT16": np.int16,
+    "INT32": np.int32,
+    "PACKED_BITS": PACKED_BITS,
+    "SKIP": SKIP
+}
+
+def parse_storage(field_storages):
+    """ Converts repeated FieldStorage from proto
+    into the `storage` argument of columnar buffers
+
+        Args:
+            field_storages: repeated FieldStorage from parsed protobuf
+
+        Returns:
+            dict of attr name to np dtype, PACKED_BITS or SKIP
+    """
+    return {field_storage.field: _STORAGES[parse_enum_to_str(buffers_pb2,
+                                                             "storage",
+                                                             field_storage.storage)]
+            for field_storage in field_storages}
+
+# (name, stat read from a BufferStats, format string) logged for instrumented buffers
+_STATS_LOGS = (
+    ("push_rate", BufferStats.push_rate, "Replay buffer push rate is %.1f/s"),
+    ("sample_latency_p50", lambda stats: stats.sample_latency(50),
+     "Replay buffer sample latency p50 is %.6fs"),
+    ("sample_latency_p99", lambda stats: stats.sample_latency(99),
+     "Replay buffer sample latency p99 is %.6fs"),
+    ("occupancy", BufferStats.occupancy, "Replay buffer occupancy is %.3f"),
+    ("bytes_used", BufferStats.bytes_used, "Replay buffer bytes used is %d"),
+    ("evictions", lambda stats: stats.num_evictions, "Replay buffer evictions is %d"),
+    ("sample_age", BufferStats.sample_age, "Replay buffer mean sample age is %.1f pushes")
+)
+
+def instrument_buffer(buffer):
+    """ Attaches a BufferStats to `buffer` and adds its
+    stats to the Logger (stdout and tensorboard)
+
+        Args:
+            buffer: ReplayBuffer
+
+        Returns:
+            BufferStats
+
+        Raises:
+            ValueError: buffer doesn't report its size
+                (i.e. a ReplayClientBuffer)
+    """
+    stats = BufferStats()
+    stats.attach(buffer)
+
+    for name, read_stat, log_string in _STATS_LOGS:
+        Logger.add_logger(PolledLogElement(log_string,
+                                           "replay_buffer/" + name,
+                                           partial(read_stat, stats),
+                                           stdout=True,
+                                           tensorboard=True))
+    return stats
+
+def _build_in_budget(buffer_cls, budget, element_cls, dims, buffer_kwargs, *args, **kwargs):
+    """ Constructs a buffer holding as many elements as fit
+    in `budget` bytes. Passed to the builders instead of the
+    buffer class, `args` and `kwargs` are the builder's.
+
+        Args:
+            buffer_cls: the buffer class
+            budget: bytes of storage
+            element_cls: type of Element pushed to the buffer
+            dims: column dimensions from `Environment.dims`
+            buffer_kwargs: common arguments from `Buffers` (i.e. seed)
+
+        Returns:
+            a Buffer object
+
+        Raises:
+            ValueError: buffer can't be sized in bytes or
+                not even one element fits
+    """
+    options = inspect.signature(buffer_cls).bind_partial(None, *args, **kwargs).arguments
+    options = {name: value for name, value in options.items()
+               if name not in ("buffer_size", "element_cls", "dims")}
+
+    try:
+        transition_bytes = buffer_cls.estimate_transition_bytes(element_cls, dims, **options, **buffer_kwargs)
+    except NotImplementedError as error:
+        raise ValueError(str(error))
+
+    buffer_size = int(budget // transition_bytes)
+
+    if buffer_size < 1:
+        raise ValueError("bufferBytes of %d doesn't fit one element of %d bytes"
+                         % (budget, transition_bytes))
+
+    buffer = buffer_cls(buffer_size, *args, **kwargs, **buffer_kwargs)
+
+    tf.logging.info("%s holds %d elements of %.1f bytes (estimated %d)"
+                    % (buffer_cls.__name__, buffer_size, buffer.transition_bytes, transition_bytes))
+
+    return buffer
+
+def build_buffer(buffers_config, environment, element_cls):
     """ Builds a Buffer based on configuration
             Args:
                 buffers_config: configuration from protobuf
+                environment: `Environment` the elements are collected from
+                element_cls: type of Element pushed to the buffer
 
             Returns:
                 a Buffer object
@@ -30,10 +163,46 @@ def build_buffer(buffers_config):
     except AttributeError:
         raise ValueError("Buffer %s in configuration does not exist" % buffer_name)
 
-    buffer_obj = partial(buffer_obj,
-                         buffers_config.bufferSize)
+    seed = buffers_config.seed if buffers_config.HasField("seed") else None
+
+    buffer_kwargs = {"seed": seed}
+
+    eviction = parse_eviction(buffers_config.eviction)
+
+    if not isinstance(eviction, FIFOEviction):
+        if "eviction" not in inspect.signature(buffer_obj).parameters:
+            raise ValueError("Buffer %s only supports FIFO eviction" % buffer_name)
+        buffer_kwargs["eviction"] = eviction
+
+    if buffers_config.storage:
+        if "storage" not in inspect.signature(buffer_obj).parameters:
+            raise ValueError("Buffer %s doesn't support storage dtypes" % buffer_name)
+        buffer_kwargs["storage"] = parse_storage(buffers_config.storage)
+
+    if buffers_config.HasField("bufferBytes") == buffers_config.HasField("bufferSize"):
+        raise ValueError("Exactly one of bufferSize and bufferBytes must be set")
+
+    if buffers_config.HasField("bufferBytes"):
+        buffer_obj = partial(_build_in_budget,
+                             buffer_obj,
+                             buffers_config.bufferBytes,
+                             element_cls,
+                             environment.dims,
+                             buffer_kwargs)
+    else:
+        buffer_obj = partial(buffer_obj,
+                             buffers_config.bufferSize,
+                             **buffer_kwargs)
 
     specific_buffer_config = getattr(buffers_config,
                                      parse_which_one(buffers_config, "buffer"))
 
-    return buffer_builder(buffer_obj, specific_buffer_config)
+    buffer_obj = buffer_builder(buffer_obj,
+                                specific_buffer_config,
+                                environment,
+                                element_cls)
+
+    if buffers_config.instrument:
+        instrument_buffer(buffer_obj)
+
+    return buffer_obj
@@ -1,5 +1,9 @@
 
 
+from advantage.protos.buffers import experience_replay_buffer_pb2
+from advantage.utils.proto_parsers import parse_enum_to_str
+from advantage.buffers.codecs import ObservationCodec
+
 """Builders for constructing the various Buffers
 """
 
@@ -14,13 +18,173 @@ class BufferBuilders:
     # pylint: disable=C0103
     # reason-disabled: naming is done on purpose to select methods
     @staticmethod
-    def build_ExperienceReplayBuffer(buffer, config):
-        """ Constructs the ExperienceReplayBuffer
+    def build_ExperienceReplayBuffer(buffer, config, environment, element_cls):
+        """ Constructs the ExperienceReplayBuffer, with an
+        ObservationCodec if a codec is selected
                 Args:
                     buffer : the buffer class
                     config: specific buffer configuration
+                    environment: associated Environment
+                    element_cls: type of Element pushed to the buffer
 
                 Returns:
                     ExperienceReplayBuffer
         """
-        return buffer()
+        codec = parse_enum_to_str(experience_replay_buffer_pb2, "codec", config.codec)
+
+        if codec == "NO_CODEC":
+            return buffer(element_cls=element_cls)
+
+        return buffer(codec=ObservationCodec(codec,
+                                             config.level,
+                                             config.decode_threads,
+                                             expected_ratio=config.expected_compression_ratio),
+                      element_cls=element_cls)
+
+    # pylint: disable=C0103
+    # reason-disabled: naming is done on purpose to select methods
+    @staticmethod
+    def build_ColumnarReplayBuffer(buffer, config, environment, element_cls):
+        """ Constructs the ColumnarReplayBuffer
+                Args:
+                    buffer : the buffer class
+                    config: specific buffer configuration
+                    environment: associated Environment, used to size columns
+                    element_cls: type of Element pushed to the buffer
+
+                Returns:
+                    ColumnarReplayBuffer
+        """
+        return buffer(element_cls, environment.dims)
+
+    # pylint: disable=C0103
+    # reason-disabled: naming is done on purpose to select methods
+    @staticmethod
+    def build_PrioritizedExperienceReplayBuffer(buffer, config, environment, element_cls):
+        """ Constructs the PrioritizedExperienceReplayBuffer
+                Args:
+                    buffer : the buffer class
+                    config: specific buffer configuration
+                    environment: associated Environment, used to size columns
+                    element_cls: type of Element pushed to the buffer
+
+                Returns:
+                    PrioritizedExperienceReplayBuffer
+        """
+        return buffer(element_cls,
+                      environment.dims,
+                      config.alpha,
+                      config.beta,
+                      config.beta_increment,
+                      config.epsilon)
+
+    # pylint: disable=C0103
+    # reason-disabled: naming is done on purpose to select methods
+    @staticmethod
+    def build_MemmapReplayBuffer(buffer, config, environment, element_cls):
+        """ Constructs the MemmapReplayBuffer. Column files are opened
+        later by the checkpoint system under the checkpoint directory.
+                Args:
+                    buffer : the buffer class
+                    config: specific buffer configuration
+                    environment: associated Environment, used to size columns
+                    element_cls: type of Element pushed to the buffer
+
+                Returns:
+                    MemmapReplayBuffer
+        """
+        return buffer(element_cls,
+                      environment.dims,
+                      config.sub_dir)
+
+    # pylint: disable=C0103
+    # reason-disabled: naming is done on purpose to select methods
+    @staticmethod
+    def build_AliasedReplayBuffer(buffer, config, environment, element_cls):
+        """ Constructs the AliasedReplayBuffer
+                Args:
+                    buffer : the buffer class
+                    config: specific buffer configuration
+                    environment: associated Environment, used to size columns
+                    element_cls: type of Element pushed to the buffer
+
+                Returns:
+                    AliasedReplayBuffer
+        """
+        return buffer(element_cls,
+                      environment.dims,
+                      config.frame_stack)
+
+    # pylint: disable=C0103
+    # reason-disabled: naming is done on purpose to select methods
+    @staticmethod
+    def build_SharedMemoryReplayBuffer(buffer, config, environment, element_cls):
+        """ Constructs the SharedMemoryReplayBuffer owned by
+        this (learner) process. Actors attach with its `handle`.
+                Args:
+                    buffer : the buffer class
+                    config: specific buffer configuration
+                    environment: associated Environment, used to size columns
+                    element_cls: type of Element pushed to the buffer
+
+                Returns:
+                    SharedMemoryReplayBuffer
+        """
+        return buffer(element_cls,
+                      environment.dims,
+                      config.num_writers)
+
+    # pylint: disable=C0103
+    # reason-disabled: naming is done on purpose to select methods
+    @staticmethod
+    def build_SequenceReplayBuffer(buffer, config, environment, element_cls):
+        """ Constructs the SequenceReplayBuffer
+                Args:
+                    buffer : the buffer class
+                    config: specific buffer configuration
+                    environment: associated Environment, used to size columns
+                    element_cls: type of Element pushed to the buffer
+
+                Returns:
+                    SequenceReplayBuffer
+        """
+        return buffer(element_cls,
+                      environment.dims,
+                      config.sequence_length)
+
+    # pylint: disable=C0103
+    # reason-disabled: naming is done on purpose to select methods
+    @staticmethod
+    def build_ConcurrentReplayBuffer(buffer, config, environment, element_cls):
+        """ Constructs the ConcurrentReplayBuffer
+                Args:
+                    buffer : the buffer class
+                    config: specific buffer configuration
+                    environment: associated Environment, used to size columns
+                    element_cls: type of Element pushed to the buffer
+
+                Returns:
+                    ConcurrentReplayBuffer
+        """
+        return buffer(element_cls,
+                      environment.dims,
+                      config.num_shards)
+
+    # pylint: disable=C0103
+    # reason-disabled: naming is done on purpose to select methods
+    @staticmethod
+    def build_ReplayClientBuffer(buffer, config, environment, element_cls):
+        """ Constructs a ReplayClientBuffer connected to a
+        running ReplayService
+                Args:
+                    buffer : the buffer class
+                    config: specific buffer configuration
+                    environment: associated Environment
+                    element_cls: type of Element pushed to the buffer
+
+                Returns:
+                    ReplayClientBuffer
+        """
+        return buffer(config.address,
+                      element_cls,
+                      config.insert_batch)
@@ -1,6 +1,7 @@
 from advantage.protos import environments_pb2
 from advantage.utils.proto_parsers import parse_which_one_cls, parse_which_one
 from advantage.builders.environments.builders import EnvironmentBuilders
+from advantage.environments.vector_environment import VectorEnvironment
 import advantage.environments
 
 """Build function for constructing the various Models
@@ -32,4 +33,8 @@ def build_environment(environments_config):
     specific_env_config = getattr(environments_config,
                                   parse_which_one(environments_config, "environment"))
 
+    if environments_config.num_envs > 1:
+        return VectorEnvironment.from_factory(lambda: env_builder(env, specific_env_config),
+                                              environments_config.num_envs)
+
     return env_builder(env, specific_env_config)
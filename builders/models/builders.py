@@ -39,15 +39,23 @@ class ModelBuilders:
                     DeepQModel
         """
         from advantage.elements import Sarsa
+        from advantage.elements.running_normalizer import RunningNormalizer
 
         experience_replay_buffer = None
         sarsa_attrs_to_normalize = []
+        running_normalizer = None
         if is_training:
             buffers_config = config.buffer
-            experience_replay_buffer = build_buffer(buffers_config)
+            experience_replay_buffer = build_buffer(buffers_config,
+                                                    environment,
+                                                    Sarsa)
 
             sarsa_attrs_to_normalize = Sarsa.normalize_list_from_config(config.sarsa)
 
+            if config.running_normalization:
+                running_normalizer = RunningNormalizer.from_element(Sarsa.make_element_zero(**environment.dims),
+                                                                    sarsa_attrs_to_normalize)
+
         return model(config.improve_policy_modulo,
                      config.delay_improvement,
                      config.train_target_modulo,
@@ -55,4 +63,7 @@ class ModelBuilders:
                      experience_replay_buffer,
                      sarsa_attrs_to_normalize,
                      config.batch_size,
-                     config.sample_less)
+                     config.sample_less,
+                     config.n_step,
+                     config.prefetch_depth,
+                     running_normalizer)
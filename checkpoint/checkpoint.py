@@ -150,8 +150,43 @@ def checkpointable(cls, **exclude):
             self._tf_saver.save(self.restore_session,
                                 ckpt_full_path,
                                 global_step=improve_step)
+
+            for component in self._checkpoint_state_components():
+                component.save_checkpoint_state(self.checkpoint_dir_path)
+
             tf.logging.info("Checkpoint saved")
 
+        def _checkpoint_state_components(self):
+            """ Attributes of `wrapped` that save their own state
+            next to the TF checkpoint (i.e. replay buffers). They
+            implement `save_checkpoint_state(directory)` and
+            `restore_checkpoint_state(directory)`.
+
+                    Returns:
+                        list of components
+            """
+            return [value for value in vars(self._wrapped).values()
+                    if hasattr(value, "save_checkpoint_state")
+                    and hasattr(value, "restore_checkpoint_state")]
+
+        def _restore_checkpoint_states(self):
+            """ Restores the state of the components saved
+            by the last checkpoint (if any).
+                    Raises:
+                        CheckpointError
+            """
+            if not self.checkpoint_dir_path:
+                raise CheckpointError("Instance must set `checkpoint_dir_path`")
+
+            for component in self._checkpoint_state_components():
+                name = component.__class__.__name__
+                try:
+                    component.restore_checkpoint_state(self.checkpoint_dir_path)
+                except (ValueError, OSError) as error:
+                    raise CheckpointError("Failed to restore %s: %s" % (name, error))
+
+                tf.logging.warn("Restored %s" % name)
+
 
         def _try_restore(self, var_list):
             """ Restores from checkpoint into session.
@@ -245,6 +280,8 @@ def checkpointable(cls, **exclude):
 
             self._try_restore(var_list)
 
+            self._restore_checkpoint_states()
+
         def set_up(self):
             """ Replaces `wrapped`'s `set_up`'s attr.
             Runs `set_up` method of `wrapped` class and
@@ -1 +1,3 @@
 from advantage.elements.sarsa import Sarsa
+from advantage.elements.sarsa_batch import SarsaBatch
+from advantage.elements.element_view import ElementView
@@ -1,5 +1,6 @@
 from abc import ABCMeta
 from abc import abstractmethod
+import inspect
 import numpy as np
 import attr
 
@@ -11,11 +12,15 @@ Reinforcement learning paradigm. The internal module used in the attr module. Th
 by theElement class. So the client only has to import one module.
 """
 
+_setattr = object.__setattr__
+
 class NumpyElementMixin:
     """ Mixin for a Element that uses Numpy.ndarray
     attrs
     """
 
+    __slots__ = ()
+
     @staticmethod
     def _validate(dtype):
         def valid(instance, attribute, value):
@@ -42,6 +47,7 @@ class NumpyElementMixin:
 
             Args:
                 element_list: list of BufferElement's to reduce
+                    or an already stacked Element (i.e. from a columnar buffer)
                 normalize_attrs: attrs to normalize just in stack
 
             Returns:
@@ -56,13 +62,17 @@ class NumpyElementMixin:
                 Sugggestion: subclass Element")
 
         np_attrs = filter(lambda x: ("np_attr" in x.metadata), list(cls.__attrs_attrs__))
-        np_attrs_dict = {x.name: [] for x in np_attrs}
 
-        for element in element_list:
-            for name, name_list in np_attrs_dict.items():
-                name_list.append(getattr(element, name))
+        if isinstance(element_list, cls):
+            np_attrs_dict_stacked = {x.name: getattr(element_list, x.name) for x in np_attrs}
+        else:
+            np_attrs_dict = {x.name: [] for x in np_attrs}
+
+            for element in element_list:
+                for name, name_list in np_attrs_dict.items():
+                    name_list.append(getattr(element, name))
 
-        np_attrs_dict_stacked = {k: np.vstack(v) for k, v in np_attrs_dict.items()}
+            np_attrs_dict_stacked = {k: np.vstack(v) for k, v in np_attrs_dict.items()}
 
         if normalize_attrs:
             attrs_to_normalize = filter(lambda x: x.name in normalize_attrs, cls.__attrs_attrs__)
@@ -73,6 +83,63 @@ class NumpyElementMixin:
 
         return cls.make_element_from_dict(np_attrs_dict_stacked)
 
+    @classmethod
+    def stack_into(cls, element_list, out, normalize_attrs=()):
+        """ Same as `stack` but writes into caller owned arrays
+        (i.e. from a BatchArrayPool) instead of allocating new ones
+
+            Args:
+                element_list: list of BufferElement's to reduce
+                    or an already stacked Element (i.e. from a columnar buffer)
+                out: dict of every np_attr name to a np.ndarray with
+                    at least one row per element
+                normalize_attrs: attrs to normalize (in place) just in stack
+
+            Returns:
+                reduced Element, its attrs are views of the first rows of `out`
+
+            Raises:
+                ValueError: for missing attrs, too few rows in `out` or fails to stack
+        """
+        np_attrs = [x.name for x in cls.__attrs_attrs__ if "np_attr" in x.metadata]
+
+        is_stacked = hasattr(element_list, "unzip_to_dict")
+        num = getattr(element_list, np_attrs[0]).shape[0] if is_stacked else len(element_list)
+
+        np_attrs_dict_stacked = {}
+
+        for name in np_attrs:
+            stack = out[name][:num]
+
+            if stack.shape[0] != num:
+                raise ValueError("out has %d rows for %s but %d elements"
+                                 " were given" % (out[name].shape[0], name, num))
+
+            if is_stacked:
+                np.copyto(stack, getattr(element_list, name))
+            else:
+                np.stack([getattr(element, name) for element in element_list], out=stack)
+
+            np_attrs_dict_stacked[name] = stack
+
+        for attr_name in normalize_attrs:
+            cls.normalize_in_place(np_attrs_dict_stacked[attr_name])
+
+        # `out` fixes the dtypes
+        return cls.make_element_from_dict_trusted(np_attrs_dict_stacked)
+
+    @staticmethod
+    def normalize_in_place(stack, eps=0.01):
+        """ Same as `normalize` but overwrites `stack`
+
+                Args:
+                    stack: stack to normalize
+                    eps: min bound for variance
+        """
+        scale = np.maximum(stack.std(), np.sqrt(eps))
+        stack -= stack.mean()
+        stack /= scale
+
     @staticmethod
     def normalize(stack, eps=0.01):
         """ Normalize `stacked` element
@@ -89,13 +156,72 @@ class NumpyElementMixin:
 
 
 
+class BatchArrayPool:
+    """ Preallocated batch arrays for `NumpyElementMixin.stack_into`,
+    allocated once per batch size. `num_sets` sets of arrays are handed
+    out in turn for each batch size, so a batch stays valid until
+    `num_sets` more batches of its size were taken.
+    """
+
+    def __init__(self, row_specs, num_sets=1):
+        """
+            Args:
+                row_specs: dict of np_attr name to (shape, dtype) of one element
+                num_sets: number of batches of the same size in use at once
+
+            Raises:
+                ValueError: num_sets less than 1
+        """
+        if num_sets < 1:
+            raise ValueError("num_sets must be at least 1")
+
+        self._row_specs = row_specs
+        self._num_sets = num_sets
+
+        # batch size to (list of array sets, index of the next set)
+        self._sets = {}
+
+    @classmethod
+    def from_element(cls, element, num_sets=1):
+        """ Builds a pool for batches of an element's type
+
+                Args:
+                    element: one (i.e. zeroed out) Element
+                    num_sets: see constructor
+
+                Returns:
+                    BatchArrayPool
+        """
+        return cls({name: (value.shape, value.dtype) for name, value in element.unzip_to_dict().items()},
+                   num_sets)
+
+    def get(self, batch_size):
+        """ Next set of arrays for `batch_size` elements
+
+                Returns:
+                    dict of np_attr name to np.ndarray [batch_size, ...]
+        """
+        if batch_size not in self._sets:
+            self._sets[batch_size] = ([{name: np.empty((batch_size,) + shape, dtype=dtype)
+                                        for name, (shape, dtype) in self._row_specs.items()}
+                                       for _ in range(self._num_sets)], 0)
+
+        sets, index = self._sets[batch_size]
+        self._sets[batch_size] = (sets, (index + 1) % self._num_sets)
+
+        return sets[index]
+
 class NormalizingElementMixin:
     """Mixin for a Element that allows for Normalization of some or all
     of it's attributes. A lot RL algorithms utilizing Approximators require
     Normalization of their inputs
     This is for RUNNING Normalization (use NumpyElementMixin for batch-wise normalizing)
+    Sums of squares lose precision over long runs, RunningNormalizer is
+    numerically stable, per feature and checkpointed.
     """
 
+    __slots__ = ()
+
     @staticmethod
     def running_variance(sums, sums_sqr, num):
         """Computes running variance from running sum of data,
@@ -209,8 +335,14 @@ class Element(metaclass=ABCMeta):
     for other purposes as well, and do not require a buffer)
     There purpose is to serve as keepers of steps taken by the agent
     and the associated changes in the environment.
+
+    Elements are slotted (no per-instance `__dict__`) and frozen.
+    `make_element` validates the attrs, `make_element_trusted` skips
+    the validators for values built inside the framework.
     """
 
+    __slots__ = ()
+
     # decorate sublcass with `Element.element`
     # to set this correctly
     __attrs_attrs__ = []
@@ -221,7 +353,7 @@ class Element(metaclass=ABCMeta):
                 Args:
                     wrapped_cls: cls to decorate
         """
-        return attr.s(wrapped_cls, frozen=True)
+        return attr.s(wrapped_cls, frozen=True, slots=True)
 
     def unzip_to_tuple(self):
         """ Puts attributes to tuple
@@ -248,6 +380,53 @@ class Element(metaclass=ABCMeta):
         """
         return cls.make_element(**dictionary)
 
+    @classmethod
+    def make_element_trusted(cls, **kwargs):
+        """ Factory: Instantiates a Element of subclass 'cls' without
+        running the attr validators. Only for values known to be valid
+        (i.e. gathered from a buffer's columns), use `make_element` for
+        values coming from outside the framework.
+                Args:
+                    kwargs: every attr of 'cls'
+
+                Returns:
+                    instance of 'cls'
+
+                Raises:
+                    KeyError: missing attr
+        """
+        element = object.__new__(cls)
+
+        for attribute in cls.__attrs_attrs__:
+            _setattr(element, attribute.name, kwargs[attribute.name])
+
+        return element
+
+    @classmethod
+    def make_element_from_dict_trusted(cls, dictionary):
+        """ Same as `make_element_from_dict` but through `make_element_trusted`
+        """
+        return cls.make_element_trusted(**dictionary)
+
+    @classmethod
+    def default_attrs(cls, **kwargs_to_make_element_zero):
+        """ Attrs of one element as `make_element` fills in the ones
+        omitted (i.e. a one-step discount_exponent for Sarsa). Attrs
+        without a default are 'zeroed' out.
+                Args:
+                    kwargs_to_make_element_zero: args to pass to make_element_zero
+
+                Returns:
+                    dict of attr name to value
+        """
+        parameters = inspect.signature(cls.make_element).parameters
+        zero = cls.make_element_zero(**kwargs_to_make_element_zero).unzip_to_dict()
+
+        required = {name: value for name, value in zero.items()
+                    if name not in parameters or parameters[name].default is inspect.Parameter.empty}
+
+        return cls.make_element(**required).unzip_to_dict()
+
     @classmethod
     @abstractmethod
     def make_element_zero(cls, **kwargs):
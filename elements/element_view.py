@@ -0,0 +1,53 @@
+""" Read-only views of elements held in columnar storage
+"""
+
+class ElementView:
+    """ Zero-copy view of one element in a columnar Replay Buffer. It
+    exposes the Element's attr names and `unzip_to_tuple`/`unzip_to_dict`,
+    but no Element is constructed and no validators run: each attr is
+    a read-only np.ndarray view of the element's row in its column.
+
+    Attrs are in the dtype they are stored in (see the `storage` of
+    ColumnarReplayBuffer) and a view reflects later writes to its slot.
+    Use `make_element_from_dict` on a copy of `unzip_to_dict` to keep
+    an element around.
+    """
+
+    __slots__ = ("_columns", "_slot")
+
+    def __init__(self, columns, slot):
+        """
+            Args:
+                columns: dict of attr name (in the Element's attr order)
+                    to a read-only column indexed by slot
+                slot: slot of the element
+        """
+        self._columns = columns
+        self._slot = slot
+
+    @property
+    def slot(self):
+        """ property for `_slot`
+        """
+        return self._slot
+
+    def __getattr__(self, name):
+        try:
+            column = self._columns[name]
+        except KeyError:
+            raise AttributeError("ElementView has no attr %s" % name)
+
+        return column[self._slot]
+
+    def unzip_to_tuple(self):
+        """ Puts attributes to tuple
+        """
+        return tuple(column[self._slot] for column in self._columns.values())
+
+    def unzip_to_dict(self):
+        """ Puts attributes in dict
+        """
+        return {name: column[self._slot] for name, column in self._columns.items()}
+
+    def __repr__(self):
+        return "ElementView(slot=%d, %s)" % (self._slot, ", ".join(self._columns))
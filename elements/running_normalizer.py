@@ -0,0 +1,192 @@
+import os
+import threading
+import numpy as np
+
+""" Running, per feature normalization of Element attrs
+"""
+
+class RunningNormalizer:
+    """ Keeps the running mean and variance of each feature of some
+    Element attrs. Whole batches are merged in one vectorized update
+    with Chan et al.'s parallel form of Welford's algorithm, which stays
+    accurate after millions of elements (unlike sums of squares, see
+    NormalizingElementMixin).
+
+    Normalizers of different processes (i.e. actors) can be combined
+    with `merge`. The statistics are saved next to the TF checkpoint
+    (`save_checkpoint_state`), so normalized training resumes with them.
+    """
+
+    CHECKPOINT_FILE = "running_normalizer.npz"
+    COUNT_KEY = "_count"
+
+    def __init__(self, row_shapes, eps=0.01):
+        """
+            Args:
+                row_shapes: dict of attr name to its shape in one element
+                eps: min bound for variance
+        """
+        self._count = 0
+        self._means = {name: np.zeros(shape, dtype=np.float64) for name, shape in row_shapes.items()}
+        self._m2s = {name: np.zeros(shape, dtype=np.float64) for name, shape in row_shapes.items()}
+
+        self._eps = eps
+
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_element(cls, element, normalize_attrs, eps=0.01):
+        """ Builds a normalizer for attrs of an element's type
+
+                Args:
+                    element: one (i.e. zeroed out) Element
+                    normalize_attrs: attrs to normalize
+                    eps: min bound for variance
+
+                Returns:
+                    RunningNormalizer
+        """
+        return cls({name: getattr(element, name).shape for name in normalize_attrs}, eps)
+
+    @property
+    def count(self):
+        """ number of elements seen
+        """
+        return self._count
+
+    @property
+    def attrs(self):
+        """ names of the normalized attrs
+        """
+        return list(self._means)
+
+    def mean(self, name):
+        """ running mean of attr `name`, per feature
+        """
+        return self._means[name].copy()
+
+    def variance(self, name):
+        """ running (population) variance of attr `name`, per feature
+        """
+        return self._m2s[name] / max(self._count, 1)
+
+    def _merge_stats(self, count, means, m2s):
+        """ Merges the statistics of another set of elements (Chan et al.)
+
+                Args:
+                    count: number of elements
+                    means: dict of attr name to their mean
+                    m2s: dict of attr name to their sum of squared deviations
+        """
+        if not count:
+            return
+
+        total = self._count + count
+
+        for name, mean in self._means.items():
+            delta = means[name] - mean
+            mean += delta * (count / total)
+            self._m2s[name] += m2s[name] + delta ** 2 * (self._count * count / total)
+
+        self._count = total
+
+    def update(self, batch):
+        """ Adds a batch of elements to the statistics
+
+                Args:
+                    batch: stacked Element or dict with attrs [N, ...]
+        """
+        attrs = batch if isinstance(batch, dict) else batch.unzip_to_dict()
+
+        values = {name: np.asarray(attrs[name], dtype=np.float64) for name in self._means}
+        count = next(iter(values.values())).shape[0] if values else 0
+
+        if not count:
+            return
+
+        means = {name: value.mean(axis=0) for name, value in values.items()}
+        m2s = {name: ((value - means[name]) ** 2).sum(axis=0) for name, value in values.items()}
+
+        with self._lock:
+            self._merge_stats(count, means, m2s)
+
+    def merge(self, other):
+        """ Adds the statistics of another normalizer (i.e. one
+        updated by an actor process) to this one
+
+                Args:
+                    other: RunningNormalizer of the same attrs
+        """
+        with other._lock:
+            count = other._count
+            means = {name: mean.copy() for name, mean in other._means.items()}
+            m2s = {name: m2.copy() for name, m2 in other._m2s.items()}
+
+        with self._lock:
+            self._merge_stats(count, means, m2s)
+
+    def normalize_in_place(self, batch):
+        """ Normalizes the attrs of a batch with the running
+        statistics, overwriting its (float) arrays
+
+                Args:
+                    batch: stacked Element or dict with attrs [N, ...]
+        """
+        attrs = batch if isinstance(batch, dict) else batch.unzip_to_dict()
+
+        with self._lock:
+            stats = {name: (self._means[name].copy(), np.sqrt(np.maximum(self.variance(name), self._eps)))
+                     for name in self._means}
+
+        for name, (mean, std) in stats.items():
+            value = attrs[name]
+            # computed in float64 and cast back into `value`
+            value -= mean
+            value /= std
+
+    def save_checkpoint_state(self, directory):
+        """ Saves the statistics (atomically replacing the last save)
+
+                Args:
+                    directory: checkpoint directory
+        """
+        with self._lock:
+            arrays = {self.COUNT_KEY: np.array(self._count, dtype=np.int64)}
+            arrays.update({name + "/mean": mean.copy() for name, mean in self._means.items()})
+            arrays.update({name + "/m2": m2.copy() for name, m2 in self._m2s.items()})
+
+        os.makedirs(directory, exist_ok=True)
+
+        path = os.path.join(directory, self.CHECKPOINT_FILE)
+        tmp_path = path + ".tmp"
+
+        with open(tmp_path, "wb") as tmp_file:
+            np.savez(tmp_file, **arrays)
+
+        os.replace(tmp_path, path)
+
+    def restore_checkpoint_state(self, directory):
+        """ Restores the statistics saved by `save_checkpoint_state` (if any)
+
+                Args:
+                    directory: checkpoint directory
+
+                Raises:
+                    ValueError: saved statistics don't match the attrs
+        """
+        path = os.path.join(directory, self.CHECKPOINT_FILE)
+
+        if not os.path.exists(path):
+            return
+
+        with np.load(path) as saved:
+            arrays = {name: saved[name] for name in saved.files}
+
+        for name, mean in self._means.items():
+            if name + "/mean" not in arrays or arrays[name + "/mean"].shape != mean.shape:
+                raise ValueError("Saved normalizer statistics don't match attr %s" % name)
+
+        with self._lock:
+            self._count = int(arrays[self.COUNT_KEY])
+            self._means = {name: arrays[name + "/mean"] for name in self._means}
+            self._m2s = {name: arrays[name + "/m2"] for name in self._m2s}
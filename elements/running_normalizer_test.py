@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+import numpy as np
+from advantage.elements.running_normalizer import RunningNormalizer
+
+def make_normalizer():
+    return RunningNormalizer({"state": (3,), "reward": (1,)})
+
+class TestRunningNormalizer(unittest.TestCase):
+    """ Tests for the RunningNormalizer """
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.states = rng.normal(1e6, [1., 2., 3.], size=(1000, 3))
+        self.rewards = rng.normal(-2., 0.5, size=(1000, 1))
+
+    def update(self, normalizer, rows):
+        normalizer.update({"state": self.states[rows], "reward": self.rewards[rows]})
+
+    def test_batched_updates(self):
+        normalizer = make_normalizer()
+
+        for start in range(0, 1000, 64):
+            self.update(normalizer, slice(start, start + 64))
+
+        self.assertEqual(normalizer.count, 1000)
+        np.testing.assert_allclose(normalizer.mean("state"), self.states.mean(axis=0))
+        # large means don't cost precision
+        np.testing.assert_allclose(normalizer.variance("state"), self.states.var(axis=0), rtol=1e-9)
+        np.testing.assert_allclose(normalizer.variance("reward"), self.rewards.var(axis=0), rtol=1e-9)
+
+    def test_merge(self):
+        merged = make_normalizer()
+        actor = make_normalizer()
+
+        self.update(merged, slice(0, 300))
+        self.update(actor, slice(300, 1000))
+        merged.merge(actor)
+
+        self.assertEqual(merged.count, 1000)
+        np.testing.assert_allclose(merged.variance("state"), self.states.var(axis=0), rtol=1e-9)
+
+    def test_normalize_in_place(self):
+        normalizer = make_normalizer()
+        self.update(normalizer, slice(None))
+
+        batch = {"state": self.states.astype(np.float32), "reward": self.rewards.astype(np.float32)}
+        normalizer.normalize_in_place(batch)
+
+        self.assertEqual(batch["state"].dtype, np.float32)
+        # float32 states around 1e6 are only accurate to ~0.06
+        np.testing.assert_allclose(batch["state"].std(axis=0), np.ones(3), rtol=1e-2)
+        np.testing.assert_allclose(batch["reward"].mean(axis=0), np.zeros(1), atol=1e-3)
+
+    def test_checkpoint(self):
+        normalizer = make_normalizer()
+        self.update(normalizer, slice(0, 500))
+
+        with tempfile.TemporaryDirectory() as directory:
+            normalizer.save_checkpoint_state(directory)
+
+            restored = make_normalizer()
+            restored.restore_checkpoint_state(directory)
+
+            mismatched = RunningNormalizer({"state": (2,)})
+            with self.assertRaises(ValueError):
+                mismatched.restore_checkpoint_state(directory)
+
+        self.assertEqual(restored.count, 500)
+        np.testing.assert_array_equal(restored.mean("state"), normalizer.mean("state"))
+
+        # resumes where the saved statistics left off
+        self.update(restored, slice(500, 1000))
+        np.testing.assert_allclose(restored.variance("state"), self.states.var(axis=0), rtol=1e-9)
+
+    def test_restore_without_checkpoint(self):
+        normalizer = make_normalizer()
+
+        with tempfile.TemporaryDirectory() as directory:
+            normalizer.restore_checkpoint_state(directory)
+
+        self.assertEqual(normalizer.count, 0)
+
+if __name__ == "__main__":
+    unittest.main()
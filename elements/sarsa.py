@@ -13,6 +13,8 @@ class Sarsa(Element, NumpyElementMixin, NormalizingElementMixin):
             done: action resulted in game over
             next_state: the next state that action + state_transition led the agent to
             next_action: the next action chosen by the agent in this new state
+            discount_exponent: k of the gamma^k discounting the bootstrapped value
+                of next_state (1 for one-step, up to n for n-step transitions)
     """
     state = np_attr(np.float32)
     action = np_attr(np.float32)
@@ -20,6 +22,7 @@ class Sarsa(Element, NumpyElementMixin, NormalizingElementMixin):
     done = np_attr(np.bool)
     next_state = np_attr(np.float32)
     next_action = np_attr(np.float32)
+    discount_exponent = np_attr(np.float32)
 
     @staticmethod
     def proto_name_to_attr_dict():
@@ -46,8 +49,10 @@ class Sarsa(Element, NumpyElementMixin, NormalizingElementMixin):
                      reward,
                      done,
                      next_state,
-                     next_action=np.array([0.0], dtype=np.float32)):
+                     next_action=np.array([0.0], dtype=np.float32),
+                     discount_exponent=np.array([1.0], dtype=np.float32)):
         """ Makes Sarsa. next_action is defaulted to zero because it is rarely used.
+        discount_exponent is defaulted to a one-step transition.
                 Args:
                     the attr values
 
@@ -59,7 +64,8 @@ class Sarsa(Element, NumpyElementMixin, NormalizingElementMixin):
                    reward=reward,
                    done=done,
                    next_state=next_state,
-                   next_action=next_action)
+                   next_action=next_action,
+                   discount_exponent=discount_exponent)
 
     @classmethod
     def make_element_from_env(cls, env_dict):
@@ -70,18 +76,17 @@ class Sarsa(Element, NumpyElementMixin, NormalizingElementMixin):
                 Returns:
                     Sarsa
         """
-        state = env_dict["state"].astype(np.float32) if isinstance(env_dict["state"], np.ndarray) else np.array([env_dict["state"]], dtype=np.float32)
-        action = env_dict["action"].astype(np.floa32) if isinstance(env_dict["action"], np.ndarray) else np.array([env_dict["action"]], dtype=np.float32)
-        reward = env_dict["reward"].astype(np.float32) if isinstance(env_dict["reward"], np.ndarray) else np.array([env_dict["reward"]], dtype=np.float32)
-        done = np.array([env_dict["done"]], dtype=np.bool)
-        next_state = env_dict["next_state"].astype(np.float32) if isinstance(env_dict["next_state"], np.ndarray) else np.array([env_dict["next_state"]], dtype=np.float32)
-
-        return cls.make_element(state=state,
-                                action=action,
-                                reward=reward,
-                                done=done,
-                                next_state=next_state)
+        as_array = lambda value: (value.astype(np.float32) if isinstance(value, np.ndarray)
+                                  else np.array([value], dtype=np.float32))
 
+        # every attr is converted here, so the validators are skipped
+        return cls.make_element_trusted(state=as_array(env_dict["state"]),
+                                        action=as_array(env_dict["action"]),
+                                        reward=as_array(env_dict["reward"]),
+                                        done=np.array([env_dict["done"]], dtype=np.bool),
+                                        next_state=as_array(env_dict["next_state"]),
+                                        next_action=np.array([0.0], dtype=np.float32),
+                                        discount_exponent=np.array([1.0], dtype=np.float32))
 
     @classmethod
     def make_element_zero(cls, state_col_dim,
@@ -92,13 +97,17 @@ class Sarsa(Element, NumpyElementMixin, NormalizingElementMixin):
         """ Makes a 'zeroed' out Sarsa. Again next_action has default.
                 Args:
                     the column dimensions of the numpy arrays
-                        (done is always just a one element array)
+                        (done is always just a one element array).
+                        A tuple is used as the full shape (i.e. image states)
                 Returns:
                     Sarsa
         """
-        return cls(state=np.zeros((state_col_dim,), dtype=np.float32),
-                   action=np.zeros((action_col_dim,), dtype=np.float32),
-                   reward=np.zeros((reward_col_dim,), dtype=np.float32),
+        shape = lambda col_dim: col_dim if isinstance(col_dim, tuple) else (col_dim,)
+
+        return cls(state=np.zeros(shape(state_col_dim), dtype=np.float32),
+                   action=np.zeros(shape(action_col_dim), dtype=np.float32),
+                   reward=np.zeros(shape(reward_col_dim), dtype=np.float32),
                    done=np.array([False]),
-                   next_state=np.zeros((next_state_col_dim,), dtype=np.float32),
-                   next_action=np.zeros((next_action_col_dim,), dtype=np.float32))
+                   next_state=np.zeros(shape(next_state_col_dim), dtype=np.float32),
+                   next_action=np.zeros(shape(next_action_col_dim), dtype=np.float32),
+                   discount_exponent=np.zeros((1,), dtype=np.float32))
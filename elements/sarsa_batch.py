@@ -0,0 +1,172 @@
+import numpy as np
+from advantage.elements.base.element import Element, NumpyElementMixin
+from advantage.elements.sarsa import Sarsa
+
+np_attr = NumpyElementMixin.np_attr
+
+@Element.element
+class SarsaBatch(Element, NumpyElementMixin):
+    """ SarsaBatch holds N transitions as one [N, ...] array per
+    Sarsa attr (see Sarsa), so rollouts and training batches are
+    built without a Python object per transition.
+
+    Attrs are in the same order as Sarsa's, so `unzip_to_tuple`
+    matches a stacked Sarsa and `bellman_operator` accepts either.
+    """
+    state = np_attr(np.float32)
+    action = np_attr(np.float32)
+    reward = np_attr(np.float32)
+    done = np_attr(np.bool_)
+    next_state = np_attr(np.float32)
+    next_action = np_attr(np.float32)
+    discount_exponent = np_attr(np.float32)
+
+    # keys of the dicts returned by LearningAgent act_in_env
+    ENV_KEYS = ("state", "action", "reward", "done", "next_state")
+
+    def __len__(self):
+        return self.state.shape[0]
+
+    def __getitem__(self, index):
+        """ Selects transitions
+                Args:
+                    index: int, slice or np.ndarray of indices
+
+                Returns:
+                    SarsaBatch (of one transition for an int)
+        """
+        if isinstance(index, (int, np.integer)):
+            index = [index]
+
+        return self.make_element_from_dict({name: value[index]
+                                            for name, value in self.unzip_to_dict().items()})
+
+    @classmethod
+    def make_element(cls,
+                     state,
+                     action,
+                     reward,
+                     done,
+                     next_state,
+                     next_action=None,
+                     discount_exponent=None):
+        """ Makes SarsaBatch. next_action defaults to zeros and
+        discount_exponent to one-step transitions.
+                Args:
+                    the attr values, each [N, ...]
+
+                Returns:
+                    SarsaBatch
+        """
+        num = state.shape[0]
+
+        if next_action is None:
+            next_action = np.zeros((num, 1), dtype=np.float32)
+
+        if discount_exponent is None:
+            discount_exponent = np.ones((num, 1), dtype=np.float32)
+
+        return cls(state=state,
+                   action=action,
+                   reward=reward,
+                   done=done,
+                   next_state=next_state,
+                   next_action=next_action,
+                   discount_exponent=discount_exponent)
+
+    @classmethod
+    def make_element_zero(cls, num=0, **kwargs_to_make_element_zero):
+        """ Makes a 'zeroed' out SarsaBatch
+                Args:
+                    num: number of transitions
+                    kwargs_to_make_element_zero: column dimensions passed
+                        to Sarsa.make_element_zero
+
+                Returns:
+                    SarsaBatch
+        """
+        zero = Sarsa.make_element_zero(**kwargs_to_make_element_zero)
+
+        return cls.make_element_from_dict({name: np.zeros((num,) + value.shape, dtype=value.dtype)
+                                           for name, value in zero.unzip_to_dict().items()})
+
+    @staticmethod
+    def _column(values, dtype):
+        """ Converts rollout values to one array, scalars
+        per transition become a column of dimension 1
+        """
+        column = np.asarray(values, dtype=dtype)
+        return column.reshape(-1, 1) if column.ndim == 1 else column
+
+    @classmethod
+    def make_element_from_rollout(cls, states, actions, rewards, dones, next_states):
+        """ Makes a SarsaBatch from the per step values of a rollout,
+        converting each attr with one array copy
+                Args:
+                    states: sequence or np.ndarray of N states
+                    actions: N actions
+                    rewards: N rewards
+                    dones: N dones
+                    next_states: N next states
+
+                Returns:
+                    SarsaBatch
+        """
+        return cls.make_element(state=cls._column(states, np.float32),
+                                action=cls._column(actions, np.float32),
+                                reward=cls._column(rewards, np.float32),
+                                done=cls._column(dones, np.bool_),
+                                next_state=cls._column(next_states, np.float32))
+
+    @classmethod
+    def make_element_from_env(cls, env_dicts):
+        """ Makes a SarsaBatch from the dicts returned by LearningAgent
+        act_in_env (see Sarsa.make_element_from_env)
+                Args:
+                    env_dicts: list of env_dict
+
+                Returns:
+                    SarsaBatch
+        """
+        return cls.make_element_from_rollout(*([env_dict[key] for env_dict in env_dicts]
+                                                for key in cls.ENV_KEYS))
+
+    @classmethod
+    def make_element_from_sample(cls, batch, normalize_attrs=()):
+        """ Makes a SarsaBatch from a Replay Buffer sample
+                Args:
+                    batch: list of Sarsa, a stacked Sarsa or a SarsaBatch
+                    normalize_attrs: attrs to normalize just in this batch
+
+                Returns:
+                    SarsaBatch
+
+                Raises:
+                    ValueError: empty list
+        """
+        if isinstance(batch, list):
+            if not batch:
+                raise ValueError("Can't make a SarsaBatch from an empty sample")
+
+            attrs = {name: np.stack([getattr(sarsa, name) for sarsa in batch])
+                     for name in batch[0].unzip_to_dict()}
+        else:
+            attrs = batch.unzip_to_dict()
+
+        for name in normalize_attrs:
+            attrs[name] = cls.normalize(attrs[name]).astype(attrs[name].dtype, copy=False)
+
+        return cls.make_element_from_dict(attrs)
+
+    @classmethod
+    def concatenate(cls, batches):
+        """ Joins batches in order
+                Args:
+                    batches: list of SarsaBatch
+
+                Returns:
+                    SarsaBatch
+        """
+        return cls.make_element_from_dict({name: np.concatenate([getattr(batch, name)
+                                                                 for batch in batches])
+                                           for name in batches[0].unzip_to_dict()})
@@ -0,0 +1,112 @@
+import unittest
+import numpy as np
+from advantage.elements.base.element import BatchArrayPool
+from advantage.elements.sarsa import Sarsa
+from advantage.elements.sarsa_batch import SarsaBatch
+
+DIMS = {"state_col_dim": 2,
+        "action_col_dim": 1,
+        "reward_col_dim": 1,
+        "next_state_col_dim": 2}
+
+def make_env_dict(value, done=False):
+    return {"state": np.array([value, value]),
+            "action": 1,
+            "reward": float(value),
+            "done": done,
+            "next_state": np.array([value + 1, value + 1])}
+
+class TestSarsaBatch(unittest.TestCase):
+    """ Tests for SarsaBatch """
+
+    def setUp(self):
+        self.batch = SarsaBatch.make_element_from_env([make_env_dict(value, value == 3)
+                                                       for value in range(4)])
+
+    def test_make_element_from_env(self):
+        self.assertEqual(len(self.batch), 4)
+        self.assertEqual(self.batch.state.shape, (4, 2))
+        self.assertEqual(self.batch.state.dtype, np.float32)
+        np.testing.assert_array_equal(self.batch.reward, [[0.], [1.], [2.], [3.]])
+        np.testing.assert_array_equal(self.batch.done[:, 0], [False, False, False, True])
+        np.testing.assert_array_equal(self.batch.next_action, np.zeros((4, 1)))
+        np.testing.assert_array_equal(self.batch.discount_exponent, np.ones((4, 1)))
+
+    def test_matches_stacked_sarsa(self):
+        stacked = Sarsa.stack([Sarsa.make_element_from_env(make_env_dict(value, value == 3))
+                               for value in range(4)])
+
+        for batch_value, sarsa_value in zip(self.batch.unzip_to_tuple(), stacked.unzip_to_tuple()):
+            self.assertEqual(batch_value.dtype, sarsa_value.dtype)
+            np.testing.assert_array_equal(batch_value, sarsa_value)
+
+    def test_slicing(self):
+        self.assertEqual(len(self.batch[1:3]), 2)
+        np.testing.assert_array_equal(self.batch[1:3].reward[:, 0], [1., 2.])
+        np.testing.assert_array_equal(self.batch[-1].reward, [[3.]])
+        np.testing.assert_array_equal(self.batch[np.array([3, 0])].reward[:, 0], [3., 0.])
+
+    def test_concatenate(self):
+        batch = SarsaBatch.concatenate([self.batch[2:], self.batch[:2]])
+        np.testing.assert_array_equal(batch.reward[:, 0], [2., 3., 0., 1.])
+
+    def test_make_element_from_sample(self):
+        sarsas = [Sarsa.make_element_from_env(make_env_dict(value)) for value in range(4)]
+
+        from_list = SarsaBatch.make_element_from_sample(sarsas, normalize_attrs=("reward",))
+        self.assertAlmostEqual(float(from_list.reward.mean()), 0., places=6)
+        self.assertEqual(from_list.reward.dtype, np.float32)
+
+        from_stacked = SarsaBatch.make_element_from_sample(Sarsa.stack(sarsas))
+        np.testing.assert_array_equal(from_stacked.state, self.batch.state)
+
+        with self.assertRaises(ValueError):
+            SarsaBatch.make_element_from_sample([])
+
+    def test_make_element_zero(self):
+        zero = SarsaBatch.make_element_zero(3,
+                                            state_col_dim=2,
+                                            action_col_dim=1,
+                                            reward_col_dim=1,
+                                            next_state_col_dim=2)
+        self.assertEqual(zero.state.shape, (3, 2))
+        self.assertEqual(zero.done.shape, (3, 1))
+
+class TestStackInto(unittest.TestCase):
+    """ Tests for NumpyElementMixin.stack_into and the BatchArrayPool """
+
+    def setUp(self):
+        self.sarsas = [Sarsa.make_element_from_env(make_env_dict(value)) for value in range(4)]
+        self.pool = BatchArrayPool.from_element(Sarsa.make_element_zero(**DIMS), num_sets=2)
+
+    def test_matches_stack(self):
+        out = self.pool.get(4)
+        batch = SarsaBatch.stack_into(self.sarsas, out, normalize_attrs=("reward",))
+        expected = Sarsa.stack(self.sarsas, normalize_attrs=("reward",))
+
+        for name, value in expected.unzip_to_dict().items():
+            np.testing.assert_allclose(getattr(batch, name), value, rtol=1e-6)
+
+        # written into the pool's arrays
+        self.assertTrue(np.shares_memory(batch.state, out["state"]))
+        self.assertEqual(batch.reward.dtype, np.float32)
+
+    def test_stacked_input_and_spare_rows(self):
+        batch = SarsaBatch.stack_into(Sarsa.stack(self.sarsas[:3]), self.pool.get(8))
+        self.assertEqual(len(batch), 3)
+        np.testing.assert_array_equal(batch.reward[:, 0], [0., 1., 2.])
+
+        with self.assertRaises(ValueError):
+            SarsaBatch.stack_into(self.sarsas, self.pool.get(2))
+
+    def test_pool_reuse(self):
+        first = self.pool.get(4)
+        second = self.pool.get(4)
+
+        self.assertIsNot(first["state"], second["state"])
+        self.assertIs(self.pool.get(4)["state"], first["state"])
+        self.assertEqual(self.pool.get(2)["state"].shape, (2, 2))
+        self.assertEqual(first["done"].dtype, np.bool_)
+
+if __name__ == "__main__":
+    unittest.main()
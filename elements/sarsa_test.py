@@ -57,6 +57,7 @@ class TestSarsa(unittest.TestCase):
         np.testing.assert_array_equal(s.done, np.array([True]))
         np.testing.assert_array_equal(s.next_state, np.array([4.0]))
         np.testing.assert_array_equal(s.next_action, np.array([0.0]))
+        np.testing.assert_array_equal(s.discount_exponent, np.array([1.0]))
 
     def test_reduce(self):
         s1 = Sarsa.make_element(np.array([1.0], dtype=np.float32),
@@ -189,4 +190,52 @@ class TestSarsa(unittest.TestCase):
         np.testing.assert_array_equal(normalized.done, dones)
 
 
+    def test_slotted(self):
+        s = Sarsa.make_element_zero(state_col_dim=2,
+                                    action_col_dim=1,
+                                    reward_col_dim=1,
+                                    next_state_col_dim=2)
+
+        self.assertFalse(hasattr(s, "__dict__"))
+
+        with self.assertRaises(AttributeError):
+            s.state = np.array([1.0, 1.0], dtype=np.float32)
+
+    def test_make_element_trusted(self):
+        attrs = {"state": np.array([1.0], dtype=np.float32),
+                 "action": np.array([2.0], dtype=np.float32),
+                 "reward": np.array([3.0], dtype=np.float32),
+                 "done": np.array([True], dtype=np.bool),
+                 "next_state": np.array([4.0], dtype=np.float32),
+                 "next_action": np.array([0.0], dtype=np.float32),
+                 "discount_exponent": np.array([1.0], dtype=np.float32)}
+
+        s = Sarsa.make_element_trusted(**attrs)
+        self.assertEqual(s, Sarsa.make_element(**attrs))
+
+        # validators only run in make_element
+        attrs["state"] = np.array([1.0])
+        self.assertEqual(Sarsa.make_element_trusted(**attrs).state.dtype, np.float64)
+
+        with self.assertRaises(ValueError):
+            Sarsa.make_element(**attrs)
+
+        del attrs["next_action"]
+        with self.assertRaises(KeyError):
+            Sarsa.make_element_trusted(**attrs)
+
+    def test_make_element_from_env(self):
+        s = Sarsa.make_element_from_env({"state": np.array([1, 2]),
+                                         "action": np.array([1]),
+                                         "reward": 1.0,
+                                         "done": False,
+                                         "next_state": np.array([2, 3])})
+
+        self.assertEqual(s.action.dtype, np.float32)
+        np.testing.assert_array_equal(s.state, np.array([1.0, 2.0]))
+        np.testing.assert_array_equal(s.reward, np.array([1.0]))
+        np.testing.assert_array_equal(s.next_action, np.array([0.0]))
+        np.testing.assert_array_equal(s.discount_exponent, np.array([1.0]))
+
+
 unittest.main()
@@ -1,2 +1,3 @@
 from advantage.environments.environment import Environment
+from advantage.environments.vector_environment import BatchedEnvironment, VectorEnvironment
 from advantage.environments.gym_environment import GymEnvironment
@@ -40,6 +40,8 @@ class Environment(object, metaclass=ABCMeta):
             Returns:
                 dict : {'state_col_dim':, 'action_col_dim', ...}
                     key template -> '*_col_dim' [see GymEnvironment]
+                    values are ints or shape tuples for multi-dimensional
+                    properties
         """
         raise NotImplementedError()
 
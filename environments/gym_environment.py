@@ -9,13 +9,16 @@ class GymEnvironment(Environment):
         self._gym = gym.make(environment_name)
 
         state = self._gym.reset()
-        state_col_dim = state.shape[0] if isinstance(state, np.ndarray) else 1
+        state_col_dim = 1
+        if isinstance(state, np.ndarray):
+            # multi-dimensional states (i.e. images) report their full shape
+            state_col_dim = state.shape[0] if state.ndim == 1 else state.shape
         action = self._gym.action_space.sample()
         action_col_dim = action.shape[0] if isinstance(action, np.ndarray) else 1
         _, reward, __, ___ = self._gym.step(action)
         reward_col_dim = reward.shape[0] if isinstance(reward, np.ndarray) else 1
 
-        # TODO state/next_state is redundant
+        # state/next_state is redundant, AliasedReplayBuffer stores observations once
         self._dims = {"state_col_dim": state_col_dim, "action_col_dim": action_col_dim,\
                       "reward_col_dim": reward_col_dim, "next_state_col_dim": state_col_dim}
 
@@ -0,0 +1,201 @@
+from abc import abstractmethod
+import numpy as np
+from advantage.environments.environment import Environment
+
+class BatchedEnvironment(Environment):
+    """ Environment stepping `num_envs` MDPs in lockstep, so an agent
+    evaluates its policy once per step for all of them. Custom simulators
+    that step many MDPs natively (i.e. vectorized in NumPy) subclass it
+    directly and implement `_reset_all`/`_step_all`.
+
+    `reset` returns states [N, ...] and `step` takes N actions and returns
+    (next_states [N, ...], rewards [N], dones [N]). Episodes that end are
+    reset automatically: `next_states` holds the last state of a finished
+    episode and `states` the first state of the env's next one.
+
+    `dims` and `action_space` are those of one MDP. The return and length
+    of every finished episode are kept per env, see `pop_episode_stats`.
+    """
+
+    def __init__(self, num_envs):
+        """
+            Args:
+                num_envs: number of MDPs
+
+            Raises:
+                ValueError: num_envs less than 1
+        """
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1")
+
+        self._num_envs = num_envs
+
+        self._states = None
+
+        self._episode_returns = np.zeros(num_envs, dtype=np.float64)
+        self._episode_lengths = np.zeros(num_envs, dtype=np.int64)
+
+        # (env index, return, length) of finished episodes
+        self._finished_episodes = []
+
+    @property
+    def num_envs(self):
+        """ property for `_num_envs`
+        """
+        return self._num_envs
+
+    @property
+    def states(self):
+        """ current state of each MDP [N, ...], after auto-resets
+        """
+        return self._states
+
+    @property
+    def episode_returns(self):
+        """ return of each MDP's current episode so far
+        """
+        return self._episode_returns.copy()
+
+    @property
+    def episode_lengths(self):
+        """ steps of each MDP's current episode so far
+        """
+        return self._episode_lengths.copy()
+
+    @property
+    def tf_state_shape(self):
+        return [None] + list(self.reset().shape[1:])
+
+    @abstractmethod
+    def _reset_all(self):
+        """ Resets every MDP
+
+            Returns:
+                states: np.ndarray [N, ...]
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _step_all(self, actions):
+        """ Steps every MDP, resetting those whose episode ended
+
+            Args:
+                actions: N actions
+
+            Returns:
+                tuple of np.ndarray (next_states [N, ...], rewards [N],
+                dones [N], states [N, ...]) where `states` has the first
+                state of the next episode for the MDPs that are done
+        """
+        raise NotImplementedError()
+
+    def reset(self):
+        """ Resets every MDP and their episode stats
+
+            Returns:
+                states: np.ndarray [N, ...]
+        """
+        self._states = self._reset_all()
+
+        self._episode_returns[:] = 0.
+        self._episode_lengths[:] = 0
+
+        return self._states
+
+    def step(self, actions):
+        """ Steps every MDP (see class doc)
+
+            Args:
+                actions: N actions
+
+            Returns:
+                tuple of np.ndarray (next_states [N, ...], rewards [N], dones [N])
+        """
+        next_states, rewards, dones, self._states = self._step_all(actions)
+
+        self._episode_returns += rewards
+        self._episode_lengths += 1
+
+        for index in np.flatnonzero(dones):
+            self._finished_episodes.append((int(index),
+                                            float(self._episode_returns[index]),
+                                            int(self._episode_lengths[index])))
+
+        self._episode_returns[dones] = 0.
+        self._episode_lengths[dones] = 0
+
+        return next_states, rewards, dones
+
+    def pop_episode_stats(self):
+        """ Episodes finished since the last call
+
+            Returns:
+                list of (env index, return, length) in finishing order
+        """
+        finished, self._finished_episodes = self._finished_episodes, []
+        return finished
+
+class VectorEnvironment(BatchedEnvironment):
+    """ BatchedEnvironment over N `Environment`s of the same MDP, stepped
+    one after the other in this process. The gain comes from evaluating
+    the policy once per step for all of them.
+    """
+
+    def __init__(self, environments):
+        """
+            Args:
+                environments: list of Environment
+
+            Raises:
+                ValueError: no environments
+        """
+        if not environments:
+            raise ValueError("VectorEnvironment needs at least one environment")
+
+        self._environments = list(environments)
+
+        super().__init__(len(self._environments))
+
+    @classmethod
+    def from_factory(cls, make_environment, num_envs):
+        """ Builds `num_envs` environments with `make_environment`
+
+                Args:
+                    make_environment: callable returning a new Environment
+                    num_envs: number of environments
+
+                Returns:
+                    VectorEnvironment
+        """
+        return cls([make_environment() for _ in range(num_envs)])
+
+    @property
+    def environments(self):
+        """ property for `_environments`
+        """
+        return self._environments
+
+    @property
+    def dims(self):
+        return self._environments[0].dims
+
+    @property
+    def action_space(self):
+        return self._environments[0].action_space
+
+    def _reset_all(self):
+        return np.stack([environment.reset() for environment in self._environments])
+
+    def _step_all(self, actions):
+        transitions = [environment.step(action)
+                       for environment, action in zip(self._environments, actions)]
+
+        next_states = np.stack([next_state for next_state, _, __ in transitions])
+        rewards = np.array([reward for _, reward, __ in transitions], dtype=np.float64)
+        dones = np.array([bool(done) for _, __, done in transitions], dtype=np.bool_)
+
+        states = next_states.copy()
+        for index in np.flatnonzero(dones):
+            states[index] = self._environments[index].reset()
+
+        return next_states, rewards, dones, states
@@ -0,0 +1,126 @@
+import unittest
+import numpy as np
+from advantage.environments.environment import Environment
+from advantage.environments.vector_environment import BatchedEnvironment, VectorEnvironment
+
+class CountingEnvironment(Environment):
+    """ State counts the steps of the episode, which
+    ends after `length` steps with reward 1 per step
+    """
+
+    def __init__(self, length):
+        self._length = length
+        self._steps = 0
+
+    def step(self, action):
+        self._steps += 1
+        return (np.array([self._steps, action], dtype=np.float32),
+                1.0,
+                self._steps == self._length)
+
+    def reset(self):
+        self._steps = 0
+        return np.array([0., 0.], dtype=np.float32)
+
+    @property
+    def dims(self):
+        return {"state_col_dim": 2, "action_col_dim": 1,
+                "reward_col_dim": 1, "next_state_col_dim": 2}
+
+    @property
+    def action_space(self):
+        return None
+
+class NativeEnvironment(BatchedEnvironment):
+    """ Batched simulator whose MDPs all end after 2 steps
+    """
+
+    def __init__(self, num_envs):
+        super().__init__(num_envs)
+        self._steps = np.zeros(num_envs)
+
+    def _reset_all(self):
+        self._steps[:] = 0
+        return self._steps[:, None].copy()
+
+    def _step_all(self, actions):
+        self._steps += 1
+        next_states = self._steps[:, None].copy()
+        dones = self._steps == 2
+        self._steps[dones] = 0
+        return next_states, np.asarray(actions, dtype=np.float64), dones, self._steps[:, None].copy()
+
+    @property
+    def dims(self):
+        return {"state_col_dim": 1, "action_col_dim": 1,
+                "reward_col_dim": 1, "next_state_col_dim": 1}
+
+    @property
+    def action_space(self):
+        return None
+
+class TestVectorEnvironment(unittest.TestCase):
+    """ Tests for the VectorEnvironment """
+
+    def setUp(self):
+        self.env = VectorEnvironment([CountingEnvironment(length) for length in (2, 3)])
+
+    def test_reset(self):
+        states = self.env.reset()
+
+        self.assertEqual(self.env.num_envs, 2)
+        np.testing.assert_array_equal(states, np.zeros((2, 2)))
+        np.testing.assert_array_equal(self.env.states, states)
+        self.assertEqual(self.env.tf_state_shape, [None, 2])
+        self.assertEqual(self.env.dims["state_col_dim"], 2)
+
+    def test_step_auto_resets(self):
+        self.env.reset()
+
+        self.env.step([5, 6])
+        next_states, rewards, dones = self.env.step([7, 8])
+
+        self.assertEqual(next_states.shape, (2, 2))
+        np.testing.assert_array_equal(next_states, [[2., 7.], [2., 8.]])
+        np.testing.assert_array_equal(rewards, [1., 1.])
+        np.testing.assert_array_equal(dones, [True, False])
+
+        # the first env starts its next episode
+        np.testing.assert_array_equal(self.env.states, [[0., 0.], [2., 8.]])
+
+        _, __, dones = self.env.step([0, 0])
+        np.testing.assert_array_equal(dones, [False, True])
+
+    def test_episode_stats(self):
+        self.env.reset()
+
+        for _ in range(4):
+            self.env.step([0, 0])
+
+        self.assertEqual(self.env.pop_episode_stats(), [(0, 2.0, 2), (1, 3.0, 3), (0, 2.0, 2)])
+        self.assertEqual(self.env.pop_episode_stats(), [])
+
+        np.testing.assert_array_equal(self.env.episode_lengths, [0, 1])
+        np.testing.assert_array_equal(self.env.episode_returns, [0., 1.])
+
+    def test_native(self):
+        env = NativeEnvironment(3)
+        np.testing.assert_array_equal(env.reset(), np.zeros((3, 1)))
+
+        env.step([1., 2., 3.])
+        next_states, _, dones = env.step([1., 1., 1.])
+
+        np.testing.assert_array_equal(next_states, np.full((3, 1), 2.))
+        self.assertTrue(dones.all())
+        np.testing.assert_array_equal(env.states, np.zeros((3, 1)))
+        self.assertEqual(env.pop_episode_stats(), [(0, 2.0, 2), (1, 3.0, 2), (2, 4.0, 2)])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            VectorEnvironment([])
+
+        with self.assertRaises(ValueError):
+            NativeEnvironment(0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 from datetime import datetime
 import threading
+import numpy as np
 import tensorflow as tf
 
 """ Contains the acutal logger used that calls all the loggers
@@ -21,6 +22,11 @@ class LogElement:
         self._stdout = stdout
         self._tensorboard = tensorboard
 
+    def poll(self):
+        """ Called before each time the element is logged
+        """
+        pass
+
     def __str__(self):
         if self.var:
             return self._string % self.var
@@ -40,6 +46,28 @@ class LogElement:
         """
         return self._tensorboard
 
+class PolledLogElement(LogElement):
+    """ LogElement whose var is read from `read_var` once each time
+    it is logged, for values kept up to date elsewhere (i.e. buffer stats)
+    """
+    def __init__(self,
+                 string,
+                 var_name,
+                 read_var,
+                 stdout,
+                 tensorboard):
+        self._read_var = read_var
+        super().__init__(string, var_name, stdout, tensorboard)
+
+    def poll(self):
+        self.var = self._read_var()
+
+    def __str__(self):
+        # polled values are logged even when 0 (i.e. no evictions yet)
+        if self.var is None:
+            return ""
+        return self._string % self.var
+
 # pylint: disable=too-few-public-methods
 # reason-disable: dataclass
 class LogVarType:
@@ -69,6 +97,25 @@ def make_log_step(scope):
                                        dtype=tf.int32)
             return log_step, tf.assign(log_step, log_step + 1, name="increment_log_step")
 
+def _as_summary(tag, var):
+    """ Wraps scalar vars in a tf.Summary, Summary protos
+    (or serialized ones from `session.run`) are passed as is
+
+        Args:
+            tag: tag of the scalar summary
+            var: LogElement var
+
+        Returns:
+            summary or None if `var` isn't set
+    """
+    if var is None:
+        return None
+
+    if isinstance(var, (int, float, np.number)):
+        return tf.Summary(value=[tf.Summary.Value(tag=tag, simple_value=float(var))])
+
+    return var if var else None
+
 class Logger(threading.Thread):
     """ The logging manager that
     logs LogElement's in loggers periodically.
@@ -115,13 +162,17 @@ class Logger(threading.Thread):
                 step = self.session.run(self._log_step)
                 print("%d ------------%s------------" % (step, datetime.now()))
                 for log in self.loggers.values():
+                    log.poll()
+
                     if log.to_stdout:
                         log_str = str(log)
                         if log_str:
                             tf.logging.info(" " + log_str)
 
-                    if log.to_tensorboard and log.var:
-                        self._file_writer.add_summary(log.var, step)
+                    if log.to_tensorboard:
+                        summary = _as_summary(log.var_name, log.var)
+                        if summary:
+                            self._file_writer.add_summary(summary, step)
                 self._file_writer.flush()
 
             self.session.run(self._log_step_update)
@@ -5,6 +5,8 @@ import threading
 from advantage.checkpoint import CheckpointError
 from advantage.utils.proto_parsers import parse_hooks
 from advantage.builders import build_model, build_environment
+from advantage.buffers.dataset_loader import DatasetLoader
+from advantage.buffers.transition_exporter import TransitionExporter
 from advantage.utils.tf_utils import get_or_create_improve_step, create_improve_step_update_op
 from advantage.loggers.logger import Logger
 import advantage.loggers as loggers
@@ -25,7 +27,9 @@ class Train:
                  checkpoint_freq_sec,
                  config,
                  hooks,
-                 stopper):
+                 stopper,
+                 dataset_loader=None,
+                 transition_exporter=None):
         self._training_manager = TrainingManager(model,
                                                  improve_for_steps,
                                                  checkpoint_dir_path,
@@ -33,7 +37,9 @@ class Train:
                                                  checkpoint_freq_sec,
                                                  config,
                                                  hooks,
-                                                 stopper)
+                                                 stopper,
+                                                 dataset_loader,
+                                                 transition_exporter)
     def __enter__(self):
         self._training_manager.set_up()
         return self._training_manager
@@ -86,6 +92,17 @@ class Train:
             env = build_environment(config.environment)
 
         model = build_model(config.model, env, True)
+
+        dataset_loader = None
+        if config.HasField("dataset"):
+            from advantage.elements import Sarsa
+            dataset_loader = DatasetLoader.from_config(config.dataset, env, Sarsa)
+
+        transition_exporter = None
+        if config.HasField("export"):
+            transition_exporter = TransitionExporter.from_config(config.export,
+                                                                 config.checkpoint_dir_path)
+
         return cls(model,
                    config.improve_for_steps,
                    config.checkpoint_dir_path,
@@ -93,7 +110,9 @@ class Train:
                    config.checkpoint_freq_sec,
                    config,
                    parse_hooks(None),
-                   stopper)
+                   stopper,
+                   dataset_loader,
+                   transition_exporter)
 
 
 class TrainingManager:
@@ -107,7 +126,9 @@ class TrainingManager:
                  checkpoint_freq_sec,
                  config,
                  hooks,
-                 stopper):
+                 stopper,
+                 dataset_loader=None,
+                 transition_exporter=None):
         """
             Args:
                 model: constructed model
@@ -116,6 +137,10 @@ class TrainingManager:
                     will make if doesn't exist
                 checkpoint_modulo: period to checkpoint the model
                 hooks: list of TrainHook objects
+                dataset_loader: optional DatasetLoader seeding the
+                    model's replay buffer
+                transition_exporter: optional TransitionExporter archiving
+                    the collected transitions, closed in `shutdown`
         """
         self._model = model
 
@@ -123,6 +148,8 @@ class TrainingManager:
         self._model.checkpoint_file_prefix = checkpoint_file_prefix
         self._model.checkpoint_freq_sec = checkpoint_freq_sec
 
+        self._model.set_transition_exporter(transition_exporter)
+
         self._improve_for_steps = improve_for_steps
 
         self._config = config
@@ -133,6 +160,8 @@ class TrainingManager:
 
         self._stopper = stopper
 
+        self._dataset_loader = dataset_loader
+
         self._tf_increment_improve_step = None
         self._tf_improve_step = None
 
@@ -186,15 +215,38 @@ class TrainingManager:
         # performs variable initialization
         self._model.set_up_train()
 
+        if self._dataset_loader is not None:
+            self._load_dataset()
+
         self._logger.session = self._model.restore_session
 
         TrainHook.set_up_hooks(self._before_train_hooks)
         TrainHook.set_up_hooks(self._during_train_hooks)
         TrainHook.set_up_hooks(self._after_train_hooks)
 
+    def _load_dataset(self):
+        """ Loads the dataset into the model's replay buffer,
+        unless it was restored from a checkpoint
+        """
+        replay_buffer = getattr(self._model, "replay_buffer", None)
+
+        if replay_buffer is None:
+            raise ValueError("Model has no replay buffer to load the dataset into")
+
+        if replay_buffer.len:
+            tf.logging.warn("Replay buffer was restored, not loading the dataset")
+            return
+
+        loaded = self._dataset_loader.load_into(replay_buffer)
+
+        tf.logging.info("Loaded %d transitions from %d dataset shards"
+                        % (loaded, len(self._dataset_loader.shards)))
+
     def shutdown(self):
         """ Peforms any necessary shutdown procedures
         """
+        self._model.shutdown()
+
         self._thread_event.clear()
 
         self._thread_sleep_cond.acquire()
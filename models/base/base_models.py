@@ -25,6 +25,9 @@ class LearningModel(metaclass=ABCMeta):
 
         self._restore_session = None
 
+        # archives collected transitions, see `set_transition_exporter`
+        self._transition_exporter = None
+
     @property
     def graph(self):
         """ property for `_graph`
@@ -65,19 +68,57 @@ class LearningModel(metaclass=ABCMeta):
         """
         self._restore_session = session
 
+    @property
+    def transition_exporter(self):
+        """ property for `_transition_exporter`
+        """
+        return self._transition_exporter
+
+    def set_transition_exporter(self, exporter):
+        """ Sets `_transition_exporter`. A method rather than a setter,
+        so it reaches the model through `checkpointable`'s wrapper.
+
+                Args:
+                    exporter: TransitionExporter or None
+        """
+        self._transition_exporter = exporter
+
+    def export_transitions(self, batch):
+        """ Archives collected transitions, if an exporter is set
+
+                Args:
+                    batch: stacked Element (i.e. SarsaBatch)
+        """
+        if self._transition_exporter is not None:
+            self._transition_exporter.export(batch)
+
     def add_session(self, agent):
         """ Adds session to agent
         """
         agent.session = tf.Session(graph=self._graph)
         self._sessions.append(agent.session)
 
+    def shutdown(self):
+        """ Stops any background work of the model (i.e. worker
+        threads) before the final checkpoint. Called by `TrainingManager`.
+        Writes the transitions still queued for the exporter.
+        """
+        if self._transition_exporter is not None:
+            self._transition_exporter.close()
+
     def clean(self):
         """ Cleans up TensorFlow Graph
-        and Sessions.
+        and Sessions. Closes the replay buffer (if it has `close`, i.e.
+        frees shared memory), after the final checkpoint saved it.
         """
         for sess in self._sessions:
             sess.close()
 
+        replay_buffer = getattr(self, "replay_buffer", None)
+
+        if hasattr(replay_buffer, "close"):
+            replay_buffer.close()
+
     @abstractmethod
     def set_up_train(self):
         """ Builds model and setup all utilities for training
@@ -1,6 +1,11 @@
 from advantage.models.base.base_models import LearningModel
 from advantage.agents import DeepQAgent
-from advantage.elements import Sarsa
+from advantage.elements import Sarsa, SarsaBatch
+from advantage.elements.base.element import BatchArrayPool
+from advantage.environments.vector_environment import BatchedEnvironment
+from advantage.buffers import PrioritizedExperienceReplayBuffer, SequenceReplayBuffer
+from advantage.buffers.n_step_accumulator import NStepAccumulator
+from advantage.buffers.batch_prefetcher import BatchPrefetcher
 from advantage.checkpoint import checkpointable
 
 @checkpointable
@@ -19,7 +24,10 @@ class DeepQModel(LearningModel):
                  replay_buffer,
                  sarsa_attrs_to_normalize,
                  batch_size,
-                 sample_less):
+                 sample_less,
+                 n_step,
+                 prefetch_depth,
+                 running_normalizer=None):
 
         self._improve_policy_modulo = improve_policy_modulo
 
@@ -33,15 +41,40 @@ class DeepQModel(LearningModel):
 
         self._sarsa_attrs_to_normalize = sarsa_attrs_to_normalize
 
+        # normalizes with running statistics instead of per batch
+        self._running_normalizer = running_normalizer
+
         self._sample_less = sample_less
 
         self._delay_improvement = delay_improvement
 
         self._num_target_train_steps = 0
 
+        # num_traj // train_target_modulo at the last target training,
+        # batched environments can finish several trajectories per step
+        self._trained_trajs_block = 0
+
         if not isinstance(agent, DeepQAgent):
             raise ValueError("Agent must be of type DeepQAgent but is %s" % type(agent))
 
+        # trains on single transitions, not [batch, time] windows
+        if isinstance(replay_buffer, SequenceReplayBuffer):
+            raise ValueError("DeepQModel can't train from a SequenceReplayBuffer")
+
+        # aggregates n-step transitions between acting and the buffer
+        self._n_step_accumulator = None
+        if n_step > 1:
+            self._n_step_accumulator = NStepAccumulator(n_step, agent.discount_factor)
+
+        # assembles the next batches while the current one trains
+        self._prefetcher = None
+        if prefetch_depth > 0:
+            self._prefetcher = BatchPrefetcher(self._sample_batch, prefetch_depth)
+
+        # batches queued, being assembled and training at once
+        self._batch_pool = BatchArrayPool.from_element(Sarsa.make_element_zero(**environment.dims),
+                                                       num_sets=prefetch_depth + 2)
+
         super().__init__(graph,
                          environment,
                          model_scope,
@@ -73,28 +106,150 @@ class DeepQModel(LearningModel):
     def act_iteration(self):
         """ Runs the agent and collects Sarsas to put in the replay buffer
         """
+        if isinstance(self._environment, BatchedEnvironment):
+            return self._act_iteration_batched()
+
+        env_dicts = self._agent.act_for_trajs(self._train_target_modulo, training=True)
+
+        if self._n_step_accumulator is None:
+            env_dicts = list(env_dicts)
+            if env_dicts:
+                batch = SarsaBatch.make_element_from_env(env_dicts)
+                self._replay_buffer.extend(batch.unzip_to_dict())
+                self._update_running_normalizer(batch)
+                self.export_transitions(batch)
+            return {}
 
-        for env_dict in self._agent.act_for_trajs(self._train_target_modulo, training=True):
+        transitions = []
 
+        for env_dict in env_dicts:
             sarsa = Sarsa.make_element_from_env(env_dict)
 
-            self._replay_buffer.push(sarsa)
+            for transition in self._n_step_accumulator.push(sarsa):
+                self._replay_buffer.push(transition)
+                transitions.append(transition)
+
+        if transitions:
+            self._update_running_normalizer(transitions)
+
+            if self.transition_exporter is not None:
+                self.export_transitions(SarsaBatch.make_element_from_sample(transitions))
+
+        return {}
+
+    def _act_iteration_batched(self):
+        """ Same as `act_iteration` for a BatchedEnvironment, the agent
+        steps every MDP at once and each step is one SarsaBatch
+        """
+        for env_batch in self._agent.act_for_trajs_batched(self._train_target_modulo, training=True):
+            batch = SarsaBatch.make_element_from_rollout(*(env_batch[key] for key in SarsaBatch.ENV_KEYS))
+
+            if self._n_step_accumulator is None:
+                self._replay_buffer.extend(batch.unzip_to_dict())
+                self._update_running_normalizer(batch)
+                self.export_transitions(batch)
+                continue
+
+            transitions = []
+            attrs = batch.unzip_to_dict()
+
+            # each MDP is its own trajectory
+            for index in range(len(batch)):
+                sarsa = Sarsa.make_element_trusted(**{name: value[index] for name, value in attrs.items()})
+
+                for transition in self._n_step_accumulator.push(sarsa, trajectory=index):
+                    self._replay_buffer.push(transition)
+                    transitions.append(transition)
+
+            if transitions:
+                self._update_running_normalizer(transitions)
+
+                if self.transition_exporter is not None:
+                    self.export_transitions(SarsaBatch.make_element_from_sample(transitions))
 
         return {}
 
+    def _update_running_normalizer(self, batch):
+        """ Adds collected transitions to the running statistics (if any)
+
+                Args:
+                    batch: SarsaBatch or list of Sarsa
+        """
+        if self._running_normalizer is not None:
+            self._running_normalizer.update(SarsaBatch.make_element_from_sample(batch))
+
+    def _sample_batch(self):
+        """ Samples and stacks a training batch. Prioritized batches stay
+        in the buffer, their slots and importance-sampling weights are
+        returned to update priorities, other batches are popped.
+
+                Returns:
+                    tuple of (SarsaBatch, slots or None, weights or None)
+        """
+        if isinstance(self._replay_buffer, PrioritizedExperienceReplayBuffer):
+            batch, slots, weights = self._replay_buffer.prioritized_sample(self._batch_size,
+                                                                           sample_less=self._sample_less)
+        else:
+            batch = self._replay_buffer.random_sample_and_pop(self._batch_size,
+                                                              sample_less=self._sample_less)
+            slots, weights = None, None
+
+        num = len(batch) if isinstance(batch, list) else batch.reward.shape[0]
+
+        if self._running_normalizer is None:
+            return (SarsaBatch.stack_into(batch, self._batch_pool.get(num), self._sarsa_attrs_to_normalize),
+                    slots,
+                    weights)
+
+        sarsa = SarsaBatch.stack_into(batch, self._batch_pool.get(num))
+        self._running_normalizer.normalize_in_place(sarsa)
+
+        return sarsa, slots, weights
+
+    def _improve_target(self, sarsa, slots, weights):
+        """ Trains target on a batch, updating priorities from
+        the TD errors if the batch is prioritized
+        """
+        td_errors = self._agent.improve_target(sarsa, weights)
+
+        if slots is None:
+            return
+
+        if self._prefetcher is None:
+            self._replay_buffer.update_priorities(slots, td_errors)
+        else:
+            with self._prefetcher.lock:
+                self._replay_buffer.update_priorities(slots, td_errors)
+
+    def shutdown(self):
+        """ Stops the batch prefetcher and the transition exporter
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+
+        super().shutdown()
+
     def improve_iteration(self, info_dict):
         """ Determines whether to update policy or target based on step count """
 
         if self._agent.num_traj > self._delay_improvement:
-            if self._agent.num_traj % self._train_target_modulo == 0:
+            trajs_block = self._agent.num_traj // self._train_target_modulo
+
+            if trajs_block > self._trained_trajs_block:
+                self._trained_trajs_block = trajs_block
+
                 #print(self._agent.num_traj)
+                if self._prefetcher is not None:
+                    self._prefetcher.request(self._train_iterations)
+
                 for _ in range(self._train_iterations):
                     #print("BEGIN: ",self._batch_size, self._replay_buffer.len)
-                    batch = self._replay_buffer.random_sample_and_pop(self._batch_size,
-                                                                      sample_less=self._sample_less)
+                    if self._prefetcher is not None:
+                        batch = self._prefetcher.get()
+                    else:
+                        batch = self._sample_batch()
 
-                    normalized_sarsa = Sarsa.stack(batch, self._sarsa_attrs_to_normalize)
-                    self._agent.improve_target(normalized_sarsa)
+                    self._improve_target(*batch)
                     self._num_target_train_steps += 1
                 #print("END: ",self._batch_size, self._replay_buffer.len)
 
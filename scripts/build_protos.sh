@@ -6,5 +6,7 @@ protoc  advantage/protos/models/*.proto --python_out=.
 protoc  advantage/protos/models/base/*.proto --python_out=.
 protoc  advantage/protos/config.proto --python_out=.
 protoc  advantage/protos/environments.proto --python_out=.
+protoc  advantage/protos/dataset.proto --python_out=.
+protoc  advantage/protos/export.proto --python_out=.
 protoc  advantage/protos/elements/*.proto --python_out=.
 protoc  advantage/protos/buffers/*.proto --python_out=.
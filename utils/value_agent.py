@@ -15,7 +15,8 @@ def bellman_operator(session, policy, sarsa, gamma, state_plh_name):
             Args:
                 session: session
                 policy: tgt network
-                sarsa: Sarsa object
+                sarsa: Sarsa object, its `discount_exponent` k discounts
+                    the bootstrapped value by gamma^k (n-step transitions)
                 gamme: one-step discount factor
                 state_plh_name: the name of the placeholder of the state input to network
 
@@ -31,13 +32,19 @@ def bellman_operator(session, policy, sarsa, gamma, state_plh_name):
     if not isinstance(session, tf.Session):
         raise ValueError("Must pass in a tf.Session object")
 
-    states, actions, rewards, dones, next_states, _ = sarsa.unzip_to_tuple()
+    states, actions, rewards, dones, next_states = (sarsa.state,
+                                                    sarsa.action,
+                                                    sarsa.reward,
+                                                    sarsa.done,
+                                                    sarsa.next_state)
 
     q_values = policy.inference(session, {state_plh_name: next_states})
 
     max_qs = np.expand_dims(np.amax(q_values, axis=1), axis=1)
 
-    return states, actions, rewards + gamma * np.invert(dones) * max_qs
+    discounts = np.power(gamma, sarsa.discount_exponent)
+
+    return states, actions, rewards + discounts * np.invert(dones) * max_qs
 
 @attr.s
 class Epsilon: